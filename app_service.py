@@ -4,16 +4,21 @@ from epub_processor import EpubProcessor
 # ocr_service는 epub_processor 내부에서 사용되므로 직접적인 의존성은 줄어들 수 있음
 # 필요한 경우 ocr_service의 특정 기능(예: 환경변수 설정)만 가져올 수 있음
 from ocr_service import os as ocr_os
+from ocr_service import vision_client_provider # 인증 정보 변경 시 클라이언트 풀 재생성용
+from ocr_service import process_images_in_folder
 from exceptions import ApplicationBaseException, ConfigError, FileOperationError, OCRError, EpubProcessingError # 사용자 정의 예외 임포트
 
 class ApplicationService:
     def __init__(self):
+        self.last_run_summary = None # 마지막 EPUB 생성의 RunSummary (OCR 실패 페이지 등을 호출자에게 보여 주기 위함)
         app_logger.info("ApplicationService 초기화됨.")
 
     def set_google_credentials(self, credentials_path):
         """Google Cloud 인증 정보를 환경 변수에 설정합니다."""
         if credentials_path and ocr_os.path.exists(credentials_path):
-            ocr_os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
+            if ocr_os.environ.get('GOOGLE_APPLICATION_CREDENTIALS') != credentials_path:
+                ocr_os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
+                vision_client_provider.reload()
             app_logger.info(f"GOOGLE_APPLICATION_CREDENTIALS 환경 변수 설정됨: {credentials_path}")
             return True
         elif not credentials_path:
@@ -41,8 +46,10 @@ class ApplicationService:
                                               OCR 수행 시 필요.
 
         Returns:
-            bool: 성공 여부.
+            bool: 성공 여부. OCR에 실패해 본문을 비운 페이지가 있어도 EPUB이 만들어지면 True이며,
+                  그 페이지 번호는 self.last_run_summary.failed_pages로 확인합니다.
         """
+        self.last_run_summary = None
         app_logger.info(f"EPUB 생성 요청 수신: 입력='{input_source}', 출력='{output_epub_path}', 이미지폴더={is_image_folder_mode}")
 
         # OCR이 필요한 경우 (PDF 모드 또는 이미지 폴더 모드에서 일러스트가 아닌 이미지)에만 인증 설정
@@ -63,7 +70,12 @@ class ApplicationService:
                 is_image_folder=is_image_folder_mode
             )
             processor.create_epub(title=title, author=author)
-            app_logger.info(f"EPUB 생성 성공: {output_epub_path}")
+            self.last_run_summary = processor.run_summary
+            if processor.run_summary.failed_pages:
+                app_logger.warning(f"EPUB 생성 완료, 단 OCR 실패 페이지 {sorted(processor.run_summary.failed_pages)}는 본문이 비어 있음: "
+                                   f"{output_epub_path}")
+            else:
+                app_logger.info(f"EPUB 생성 성공: {output_epub_path}")
             return True
         except (ConfigError, OCRError, EpubProcessingError, FileOperationError) as app_exc:
             # 이미 정의된 애플리케이션 예외는 그대로 전달
@@ -74,5 +86,33 @@ class ApplicationService:
             app_logger.error(f"EPUB 생성 중 ApplicationService에서 오류 발생: {e}", exc_info=True)
             raise ApplicationBaseException(f"EPUB 생성 중 예상치 못한 오류: {e}")
 
+    def ocr_images_in_folder(self, input_folder, output_folder, credentials_path=None, recursive=None):
+        """
+        이미지 폴더의 이미지를 병렬로 OCR해 이미지마다 텍스트 파일로 저장합니다.
+        파일별 실패는 작업을 멈추지 않고 반환하는 요약에 모입니다.
+
+        Args:
+            input_folder (str): 이미지 폴더.
+            output_folder (str): 텍스트 파일을 저장할 폴더.
+            credentials_path (str, optional): Google Cloud 인증 파일 경로.
+            recursive (bool, optional): 하위 폴더도 처리할지 여부. None이면 설정의 ocr_folder_recursive 값.
+
+        Returns:
+            FolderRunSummary: 처리/건너뜀 수와 실패한 파일 목록(failures).
+        """
+        app_logger.info(f"폴더 OCR 요청 수신: 입력='{input_folder}', 출력='{output_folder}'")
+        self.set_google_credentials(credentials_path)
+        try:
+            summary = process_images_in_folder(input_folder, output_folder, recursive=recursive)
+        except (ConfigError, OCRError, FileOperationError) as app_exc:
+            app_logger.error(f"애플리케이션 예외 발생: {app_exc.message}", exc_info=True)
+            raise
+        except Exception as e:
+            app_logger.error(f"폴더 OCR 중 ApplicationService에서 오류 발생: {e}", exc_info=True)
+            raise ApplicationBaseException(f"폴더 OCR 중 예상치 못한 오류: {e}")
+        if summary.failures:
+            app_logger.warning(f"폴더 OCR 완료, 단 이미지 {len(summary.failures)}개 실패: {input_folder}")
+        return summary
+
 # 애플리케이션 서비스의 단일 인스턴스 (필요에 따라)
 # app_service_instance = ApplicationService()
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+EpubProcessor._extract_and_ocr_pages의 페이지 조립 단계 마이크로 벤치마크.
+OCR 엔진을 입력 즉시 결과를 돌려주는 함수로 바꾸고 (Vision API 호출 없음), 이미지 폴더 페이지 수를 늘려 가며
+조립에 걸린 시간을 측정합니다. 페이지당 시간이 페이지 수와 관계없이 일정하면 선형으로 확장되는 것입니다.
+OCR 엔진 외에는 config.json 설정 그대로 측정하고, 기본값이 꺼져 있는 단계
+(작업 저널, 중복 페이지 감지, 일러스트 자동 분류, 일러스트 재압축)는 켠 상태로 따로 측정합니다.
+
+사용법: python bench_page_assembly.py [최대 페이지 수 (기본 10000)]
+"""
+import io
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from PIL import Image
+import epub_processor
+from config_manager import config_manager
+from logger import app_logger
+from epub_processor import EpubProcessor
+
+# 일러스트로 지정할 페이지 비율 (외부 일러스트 중복 확인 경로 포함)
+ILLUSTRATION_EVERY = 10
+
+# 앞 페이지를 그대로 복사해 중복 페이지로 만들 비율 (중복 검사의 픽셀 확인 경로 포함)
+DUPLICATE_EVERY = 20
+
+# 측정할 설정: (이름, 기본 설정에 덮어쓸 값)
+BENCH_CONFIGS = [
+    ("기본 설정", {}),
+    ("작업 저널 켬", {"job_journal_enabled": True}),
+    ("중복 페이지 감지 켬", {"page_dedup_enabled": True}),
+    ("일러스트 자동 분류 켬", {"illustration_auto_detect": True}),
+    ("일러스트 재압축 켬", {"illustration_recompress": True}),
+]
+
+def _instant_ocr(items, on_result=None, **kwargs):
+    """OCR 엔진 대역: 입력을 모두 소비하고 페이지마다 고정 텍스트를 돌려줍니다."""
+    results = []
+    for item in items:
+        result = {'id': item.id, 'text': f"page {item.id}", 'retries': 0}
+        if on_result is not None:
+            on_result(result)
+        results.append(result)
+    return results
+
+def _make_image_folder(folder, page_count):
+    """서로 다른 작은 페이지 이미지를 만듭니다 (페이지마다 지각 해시가 달라 중복 검사 색인이 실제로 쓰임)."""
+    random_source = random.Random(0)
+    paths = []
+    data = None
+    for index in range(page_count):
+        if data is None or index % DUPLICATE_EVERY:
+            buffer = io.BytesIO()
+            Image.frombytes("L", (32, 32), random_source.randbytes(32 * 32)).save(buffer, "PNG")
+            data = buffer.getvalue()
+        path = os.path.join(folder, f"{index:06d}.png")
+        with open(path, "wb") as image_file:
+            image_file.write(data)
+        paths.append(path)
+    return paths
+
+def measure(page_count, work_dir):
+    """page_count 페이지 이미지 폴더의 조립 시간(초)을 반환합니다."""
+    folder = tempfile.mkdtemp(dir=work_dir)
+    paths = _make_image_folder(folder, page_count)
+    processor = EpubProcessor(paths, os.path.join(folder, "bench.epub"),
+                              illustration_images=paths[::ILLUSTRATION_EVERY], is_image_folder=True)
+    try:
+        start_time = time.perf_counter()
+        items = processor._extract_and_ocr_pages()
+        elapsed = time.perf_counter() - start_time
+    finally:
+        processor._cleanup()
+    assert len(items) == page_count and [item.page_num for item in items] == list(range(1, page_count + 1))
+    return elapsed
+
+def main(max_pages=10000):
+    app_logger.setLevel(logging.WARNING) # 페이지별 로그가 측정을 가리지 않게 함
+    epub_processor.ocr_pil_images_batch = _instant_ocr
+    epub_processor.ocr_pil_images_async = _instant_ocr
+    default_config = dict(config_manager.config)
+    work_dir = tempfile.mkdtemp(prefix="bench_assembly_")
+    try:
+        for name, overrides in BENCH_CONFIGS:
+            config_manager.config.clear()
+            config_manager.config.update(default_config, **overrides)
+            print(f"[{name}]")
+            page_count = 1250
+            while page_count <= max_pages:
+                elapsed = measure(page_count, work_dir)
+                print(f"{page_count:>6} 페이지: {elapsed:.3f}초 (페이지당 {elapsed / page_count * 1e6:.1f}µs)")
+                page_count *= 2
+    finally:
+        config_manager.config.clear()
+        config_manager.config.update(default_config)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,185 @@
+"""
+OCR 요청의 동시 실행 수를 조절하는 적응형(AIMD) 동시성 제한기를 정의합니다.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from google.api_core import exceptions as google_exceptions
+from logger import app_logger
+from config_manager import config_manager
+
+# 서버 과부하(쿼터 초과/429, 기한 초과)를 뜻하는 예외. 이 예외가 보이면 동시성을 줄입니다.
+OVERLOAD_ERROR_TYPES = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.DeadlineExceeded,
+)
+
+def iter_exception_chain(exc):
+    """예외와 그 원인(__cause__/__context__)들을 차례로 반환합니다. OCRError로 감싼 원본 예외를 찾을 때 사용합니다."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+def is_overload_error(exc):
+    """예외 체인에 쿼터 초과/429 또는 기한 초과 오류가 포함되어 있는지 확인합니다."""
+    return any(isinstance(e, OVERLOAD_ERROR_TYPES) for e in iter_exception_chain(exc))
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD(Additive Increase, Multiplicative Decrease) 방식의 동시성 제한기.
+    지연 시간이 기준치 근처로 유지되면 한 번에 1씩 동시성을 늘리고,
+    쿼터 초과/429 또는 기한 초과 오류가 발생하면 동시성을 비율만큼 줄입니다.
+    동시성은 [min_limit, max_limit] 범위를 벗어나지 않으며, 변경될 때마다 이유와 함께 로그에 남깁니다.
+    """
+    def __init__(self, max_limit, min_limit=1, initial_limit=None, adaptive=True,
+                 decrease_factor=0.5, latency_tolerance=1.5, name="OCR"):
+        """
+        Args:
+            max_limit (int): 동시성 상한 (예: 설정의 max_ocr_workers).
+            min_limit (int): 동시성 하한.
+            initial_limit (int, optional): 초기 동시성. None이면 상한에서 시작하고, 과부하 오류가 보일 때만 줄입니다.
+            adaptive (bool): False이면 동시성을 max_limit으로 고정합니다.
+            decrease_factor (float): 과부하 오류 시 동시성에 곱할 비율.
+            latency_tolerance (float): 기준 지연 시간 대비 이 배수 이내면 지연 시간이 안정적이라고 판단.
+            name (str): 로그에 표시할 이름.
+        """
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        self.adaptive = adaptive
+        if not adaptive or initial_limit is None:
+            initial_limit = self.max_limit
+        self.limit = max(self.min_limit, min(int(initial_limit), self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.name = name
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._successes_since_change = 0
+        self._smoothed_latency = None
+        self._baseline_latency = None
+        self._last_decrease_time = 0.0
+        self._async_waiters = [] # (이벤트 루프, future). 슬롯이 반환되면 깨워 다시 확인하게 함
+        app_logger.info(f"{self.name} 동시성 제한기 초기화: 현재 {self.limit} (범위 {self.min_limit}~{self.max_limit}, 적응형={adaptive})")
+
+    @contextmanager
+    def slot(self):
+        """
+        동시 실행 슬롯 하나를 점유하는 컨텍스트 관리자.
+        블록이 정상 종료되면 소요 시간을, 예외로 끝나면 해당 예외를 제한기에 반영합니다.
+        """
+        start_time = self.acquire()
+        try:
+            yield
+        except BaseException as exc:
+            self.release(start_time, error=exc)
+            raise
+        else:
+            self.release(start_time)
+
+    def acquire(self):
+        """슬롯이 빌 때까지 기다린 후 점유합니다. release()에 넘길 시작 시각을 반환합니다."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """slot()의 비동기 버전. 슬롯이 빌 때까지 이벤트 루프를 막지 않고 기다립니다."""
+        start_time = await self.acquire_async()
+        try:
+            yield
+        except BaseException as exc:
+            self.release(start_time, error=exc)
+            raise
+        else:
+            self.release(start_time)
+
+    async def acquire_async(self):
+        """acquire()의 비동기 버전. 스레드에서 acquire()하는 다른 경로(모자이크 요청 등)와 같은 슬롯을 나눠 씁니다."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return time.monotonic()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, start_time, error=None):
+        """슬롯을 반환하고, 결과(지연 시간 또는 오류)에 따라 동시성을 조정합니다."""
+        latency = time.monotonic() - start_time
+        with self._condition:
+            self._in_flight -= 1
+            if self.adaptive:
+                if error is not None:
+                    if is_overload_error(error):
+                        self._on_overload(start_time, error)
+                else:
+                    self._on_success(latency)
+            self._condition.notify_all()
+            async_waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in async_waiters:
+            loop.call_soon_threadsafe(_wake_waiter, waiter)
+
+    def _on_success(self, latency):
+        # 호출자가 self._condition을 보유하고 있어야 함
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency = 0.8 * self._smoothed_latency + 0.2 * latency
+        if self._baseline_latency is None or self._smoothed_latency < self._baseline_latency:
+            self._baseline_latency = self._smoothed_latency
+
+        if self._smoothed_latency > self._baseline_latency * self.latency_tolerance:
+            # 지연 시간이 늘어나는 중이면 현재 동시성 유지
+            self._successes_since_change = 0
+            return
+        self._successes_since_change += 1
+        # 현재 동시성만큼의 요청이 안정적으로 끝났으면(한 "윈도우") 1 증가
+        if self._successes_since_change >= self.limit and self.limit < self.max_limit:
+            self._change_limit(self.limit + 1,
+                               f"지연 시간 안정 (평균 {self._smoothed_latency:.2f}s, 기준 {self._baseline_latency:.2f}s)")
+
+    def _on_overload(self, start_time, error):
+        # 호출자가 self._condition을 보유하고 있어야 함
+        # 직전 감소 이전에 시작된 요청의 오류는 같은 과부하 구간으로 보고 다시 줄이지 않음
+        if start_time < self._last_decrease_time:
+            return
+        new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        self._last_decrease_time = time.monotonic()
+        # 과부하가 해소된 뒤 지연 시간 기준을 다시 잡도록 초기화
+        self._baseline_latency = None
+        self._smoothed_latency = None
+        if new_limit != self.limit:
+            self._change_limit(new_limit, f"과부하 오류 감지 ({type(error).__name__}: {error})")
+        else:
+            self._successes_since_change = 0
+
+    def _change_limit(self, new_limit, reason):
+        # 호출자가 self._condition을 보유하고 있어야 함
+        app_logger.info(f"{self.name} 동시성 조정: {self.limit} -> {new_limit} (이유: {reason})")
+        self.limit = new_limit
+        self._successes_since_change = 0
+
+def _wake_waiter(waiter):
+    if not waiter.done(): # 기다리던 작업이 취소되었으면 무시
+        waiter.set_result(None)
+
+def create_ocr_limiter(max_limit=None):
+    """
+    설정(max_ocr_workers 등)을 바탕으로 OCR 요청용 동시성 제한기를 만듭니다.
+    max_limit이 주어지면 max_ocr_workers 대신 상한으로 사용합니다 (asyncio 엔진의 max_in_flight_requests).
+    """
+    return AdaptiveConcurrencyLimiter(
+        max_limit=max_limit or config_manager.get("max_ocr_workers"),
+        min_limit=config_manager.get("ocr_min_workers"),
+        adaptive=config_manager.get("ocr_adaptive_concurrency"),
+    )
@@ -8,7 +8,72 @@ DEFAULT_CONFIG = {
     "default_epub_title": "제목 없음",
     "default_epub_author": "저자 미상",
     "default_epub_language": "jp",
-    "max_ocr_workers": 4, # OCR 병렬 처리 시 최대 워커 수
+    "max_ocr_workers": 4, # OCR 병렬 처리 시 최대 워커 수 (적응형 동시성 제한기의 상한)
+    "ocr_min_workers": 1, # 적응형 동시성 제한기의 하한
+    "ocr_adaptive_concurrency": True, # True이면 지연 시간/과부하 오류에 따라 동시성을 자동 조정 (AIMD)
+    "vision_client_pool_size": 2, # 재사용할 Google Vision API 클라이언트(채널) 수
+    "ocr_use_batch_annotate": False, # True이면 여러 페이지를 batch_annotate_images 요청 하나로 묶어 전송
+    "ocr_batch_max_images": 16, # batch_annotate_images 요청당 최대 이미지 수 (API 제한 16)
+    "ocr_batch_max_bytes": 10 * 1024 * 1024, # 요청당 최대 이미지 바이트 합계 (base64 인코딩 후 API 요청 크기 제한 이내)
+    "ocr_engine": "thread", # EPUB 생성 시 OCR 엔진: "thread"(ThreadPoolExecutor) 또는 "asyncio"
+    "ocr_use_process_pool": False, # True이면 페이지 디코딩·전처리·인코딩(CPU 단계)을 별도 프로세스 풀에서 실행 (기본값은 스레드 풀)
+    "ocr_cpu_workers": None, # CPU 단계 워커(프로세스) 수. None이면 CPU 코어 수
+    "max_in_flight_requests": 32, # asyncio 엔진에서 동시에 진행할 최대 OCR 요청 수
+    "ocr_retry_max_attempts": 5, # 일시적 오류(UNAVAILABLE, RESOURCE_EXHAUSTED 등) 시 최초 시도를 포함한 최대 시도 횟수
+    "ocr_retry_initial_delay": 1.0, # 첫 재시도 전 최대 대기 시간(초), 이후 지수적으로 증가 (지터 적용)
+    "ocr_retry_max_delay": 30.0, # 재시도 간 최대 대기 시간(초)
+    "ocr_job_deadline_seconds": None, # OCR 작업 전체 기한(초). None이면 제한 없음
+    "ocr_circuit_breaker_window": 20, # 서킷 브레이커가 오류율을 계산할 최근 호출 수
+    "ocr_circuit_breaker_failure_rate": 0.5, # 이 오류율 이상이면 서킷 브레이커가 열림
+    "ocr_circuit_breaker_cooldown_seconds": 30.0, # 서킷 브레이커가 열린 뒤 시험 호출까지 대기 시간(초)
+    "ocr_circuit_breaker_max_failed_trials": 3, # 시험 호출이 이 횟수만큼 연속 실패하면 작업을 중단
+    "ocr_language_hints": [], # Vision API 언어 힌트 (예: ["ja"]). OCR 캐시 키에도 포함됨
+    "ocr_cache_enabled": False, # True이면 같은 이미지 바이트에 대한 OCR 결과를 디스크 캐시에서 재사용 (기본값 꺼짐)
+    "ocr_cache_path": None, # OCR 캐시 SQLite 파일 경로. None이면 config.json과 같은 폴더의 cache/ocr_cache.sqlite3
+    "ocr_cache_max_mb": 512, # OCR 캐시 최대 크기(MB). 넘으면 오래 사용되지 않은 항목부터 삭제 (LRU)
+    "ocr_encode_format": "png", # OCR 업로드용 인코딩 형식: "png"(무손실), "jpeg", "webp" (모두 그레이스케일)
+    "ocr_encode_quality": 85, # JPEG/WebP 인코딩 품질 (1~100)
+    "ocr_target_dpi": None, # 이 DPI로 축소해 업로드. None이면 렌더링 해상도 그대로
+    "ocr_max_longest_side": None, # 업로드 이미지 긴 변의 최대 픽셀 수. None이면 제한 없음
+    "ocr_binarize": False, # True이면 Otsu 이진화 후 업로드
+    "ocr_max_payload_kb": 8192, # 업로드 이미지 최대 크기(KB). 넘으면 품질/해상도를 단계적으로 낮춤. None이면 제한 없음
+    "pdf_ocr_mode": "image", # process_pdf 기본 모드: "image"(로컬 래스터화 후 페이지 이미지 업로드) 또는 "file"(PDF/TIFF를 Vision 파일 주석으로 직접 전송)
+    "ocr_file_chunk_pages": 5, # 파일 주석 모드에서 요청 하나에 담을 페이지 수 (동기 API 최대 5)
+    "ocr_file_transport": "vision", # 파일 주석 모드 전송: "vision"(Google Vision API) 또는 "local"(오프라인 테스트용 대체 전송, pdftotext 사용)
+    "ocr_mosaic_enabled": False, # True이면 작은 이미지 여러 개를 캔버스 하나에 배치해 DOCUMENT_TEXT_DETECTION 요청 하나로 OCR하고 단어 좌표로 결과를 나눔
+    "ocr_mosaic_canvas_size": 2048, # 모자이크 캔버스 한 변의 최대 픽셀 수
+    "ocr_mosaic_gap": 40, # 모자이크 타일 사이 여백(픽셀). 서로 다른 타일의 글자가 한 단어로 합쳐지지 않게 함
+    "ocr_mosaic_max_tile_side": 512, # 이 픽셀 수 이하의 가로/세로를 가진 이미지만 모자이크로 보냄
+    "ocr_mosaic_max_tiles": 50, # 캔버스 하나에 넣을 최대 타일 수 (요청 하나 실패 시 영향 범위 제한)
+    "blank_page_detection": False, # True이면 OCR 전에 빈 페이지(백지, 간지 등)를 감지해 Vision API 요청 생략 (기본값 꺼짐)
+    "blank_page_dry_run": False, # True이면 빈 페이지를 감지해 보고만 하고 OCR은 그대로 수행 (임계치 조정용)
+    "blank_page_max_ink_ratio": 0.0003, # 빈 페이지로 볼 최대 잉크 픽셀 비율 (축소된 그레이스케일 이미지 기준)
+    "blank_page_max_components": 2, # 빈 페이지로 볼 최대 연결 요소(글자·얼룩 덩어리) 수
+    "blank_page_max_stddev": 4.0, # 빈 페이지로 볼 최대 밝기 표준편차. 넘으면 흐린 글씨 등 내용이 있다고 보고 OCR
+    "illustration_auto_detect": False, # True이면 OCR 전에 채도·에지 밀도·텍스트 줄 투영으로 전면 일러스트 페이지를 자동 분류 (수동 지정이 우선)
+    "illustration_min_confidence": 0.75, # 일러스트로 자동 분류할 최소 점수 (0.0~1.0). 높을수록 보수적
+    "page_dedup_enabled": False, # True이면 지각 해시(pHash)로 중복 후보를 찾고 원본 해상도 픽셀 비교로 확인된 페이지만 대표 페이지의 OCR 결과를 나눠 줌
+    "page_dedup_max_distance": 12, # 중복 후보로 볼 최대 해밍 거리 (256비트 중). 0이면 해시가 완전히 같은 페이지만
+    "page_dedup_max_mismatch": 0.02, # 같은 페이지로 확인할 최대 잉크 불일치 비율 (2픽셀 이내에 상대 잉크가 없는 잉크 픽셀의 비율)
+    "pdf_text_layer_check": False, # True이면 PDF의 텍스트 레이어(pdftotext)를 먼저 확인해 품질이 충분한 페이지는 OCR 생략. 품질 점수는 깨진 문자만 걸러내므로, 스캔 PDF에 잘못 인식된 숨은 텍스트 레이어가 있으면 그 텍스트가 그대로 쓰임
+    "pdf_text_layer_min_score": 0.9, # 텍스트 레이어를 사용할 최소 품질 점수 (0.0~1.0, 정상 문자 비율 × 글자 수 계수)
+    "pdf_text_layer_min_chars": 20, # 이보다 글자 수가 적은 페이지는 품질 점수를 비례해 낮춤 (쪽번호만 있는 스캔 페이지 등)
+    "job_journal_enabled": False, # True이면 페이지별 OCR 결과를 출력 EPUB 옆의 .journal 파일에 기록해, 중단된 작업을 같은 입력으로 다시 실행할 때 이어서 처리
+    "ocr_output_flush_seconds": 2.0, # process_pdf가 페이지 순서대로 쓰는 텍스트 출력 파일을 flush하는 간격(초). 0이면 페이지마다 flush
+    "ocr_folder_recursive": False, # 이미지 폴더 일괄 처리 시 하위 폴더도 처리 (출력 폴더에 같은 폴더 구조로 저장)
+    "epub_writer": "ebooklib", # EPUB 출력 백엔드: "streaming"(챕터/이미지를 만들어지는 대로 압축 파일에 씀) 또는 "ebooklib"(책 전체를 메모리에 모은 뒤 한 번에 씀). streaming은 ebooklib 0.20에서만 쓰고 다른 버전에서는 ebooklib 방식으로 대체
+    "epub_chapter_max_kb": None, # 연속된 텍스트 페이지를 합친 챕터(XHTML) 하나의 최대 크기(KB). 넘으면 다음 챕터로 나눔. None이면 제한 없음
+    "epub_chapter_max_pages": None, # 텍스트 챕터 하나에 합칠 최대 페이지 수. None이면 제한 없음
+    "illustration_recompress": False, # True이면 EPUB에 넣기 전에 일러스트를 축소·재압축 (손실 압축이므로 기본값은 꺼짐. 원본보다 작아지지 않으면 원본 사용)
+    "illustration_format": "jpeg", # 재압축 형식: "jpeg" 또는 "webp" (투명도가 있는 이미지는 JPEG 대신 PNG)
+    "illustration_quality": 85, # 일러스트 JPEG/WebP 품질 (1~100)
+    "illustration_max_longest_side": 2048, # 일러스트 긴 변의 최대 픽셀 수. None이면 축소하지 않음
+    "illustration_progressive": True, # True이면 JPEG를 프로그레시브로 인코딩
+    "illustration_strip_metadata": True, # True이면 EXIF/XMP/주석 제거 (회전 정보는 픽셀에 적용, 색상 프로필은 유지)
+    "illustration_encode_workers": None, # 일러스트 재압축 스레드 수. None이면 CPU 코어 수
+    "pdf_render_dpi": 200, # PDF 래스터화 DPI (pdf2image 기본값 200)
+    "pdf_render_window_pages": 8, # PDF를 한 번에 래스터화할 페이지 수 (스트리밍 래스터화 윈도우)
+    "pdf_render_queue_size": 16, # 래스터화된 뒤 OCR을 기다리는 페이지의 최대 수 (메모리 사용량 상한)
     "temp_dir_base": None, # None이면 시스템 기본 임시 폴더 사용, 경로 지정 가능
     "log_level": "INFO" # 로깅 레벨 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
 }
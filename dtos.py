@@ -1,26 +1,87 @@
 from dataclasses import dataclass, field
 from typing import Optional, List, Any
+from PIL import Image
 from PIL.Image import Image as PILImage # PIL.Image.Image 타입을 명시적으로 사용
 
-@dataclass
 class PageDataSource:
     """
-    EPUB 생성을 위한 원본 페이지/이미지 소스 정보를 담는 데이터 클래스.
+    EPUB 생성을 위한 원본 페이지/이미지 소스에 대한 지연 로딩 핸들.
     EpubProcessor의 _load_pages_from_pdf, _load_images_from_folder에서 생성됨.
+    디코딩된 이미지를 들고 다니지 않고 파일 경로(또는 PDF 경로와 페이지 번호)만 보관하다가,
+    load_image()가 호출될 때(보통 OCR 워커 안에서) 디코딩하고 release()로 즉시 해제합니다.
+    페이지 수천 개를 다룰 때 객체당 오버헤드를 줄이기 위해 __slots__를 사용합니다.
     """
-    path: str  # 원본 파일 경로 (PDF의 경우 "pdf_page_1" 등 내부 식별자, 이미지 폴더의 경우 실제 파일 경로)
-    pil_image: PILImage # 로드된 PIL 이미지 객체
-    original_index: int # 원본 리스트에서의 순서 (0부터 시작)
+    __slots__ = ('path', 'original_index', 'image_path', 'pdf_path', 'pdf_page_number', 'pdf_dpi', '_image')
+
+    def __init__(self, path: str, original_index: int, image_path: Optional[str] = None,
+                 pdf_path: Optional[str] = None, pdf_page_number: Optional[int] = None, pdf_dpi: Optional[int] = None):
+        self.path = path  # 원본 파일 경로 (PDF의 경우 "pdf_page_1" 등 내부 식별자, 이미지 폴더의 경우 실제 파일 경로)
+        self.original_index = original_index # 원본 리스트에서의 순서 (0부터 시작)
+        self.image_path = image_path # 디코딩할 이미지 파일 경로 (이미지 폴더의 원본 파일 또는 PDF에서 래스터화된 파일)
+        self.pdf_path = pdf_path # image_path가 없을 때 이 PDF의 pdf_page_number 페이지를 직접 래스터화
+        self.pdf_page_number = pdf_page_number # PDF 내 페이지 번호 (1부터 시작)
+        self.pdf_dpi = pdf_dpi # PDF 페이지를 직접 래스터화할 때의 DPI (설정의 pdf_render_dpi). None이면 pdf2image 기본값
+        self._image = None
+
+    def load_image(self) -> PILImage:
+        """이미지를 디코딩해 반환합니다. release() 전까지는 같은 객체를 재사용합니다."""
+        if self._image is None:
+            if self.image_path:
+                with Image.open(self.image_path) as img:
+                    img.load()
+                    # 파일 핸들을 바로 닫을 수 있도록 디코딩된 복사본을 보관 (원본 포맷 정보 유지)
+                    self._image = img.copy()
+                    self._image.format = img.format
+            elif self.pdf_path and self.pdf_page_number:
+                from pdf2image import convert_from_path # PDF 페이지 핸들을 디코딩할 때만 필요
+                dpi_kwargs = {'dpi': self.pdf_dpi} if self.pdf_dpi else {}
+                self._image = convert_from_path(self.pdf_path, first_page=self.pdf_page_number,
+                                                last_page=self.pdf_page_number, **dpi_kwargs)[0]
+            else:
+                raise ValueError(f"페이지 '{self.path}'에 디코딩할 이미지 소스가 없습니다.")
+        return self._image
+
+    def release(self) -> None:
+        """디코딩된 이미지를 해제합니다. 다시 필요하면 load_image()가 새로 디코딩합니다."""
+        if self._image is not None:
+            self._image.close()
+            self._image = None
+
+    def __repr__(self):
+        return (f"PageDataSource(path={self.path!r}, original_index={self.original_index!r}, "
+                f"image_path={self.image_path!r}, pdf_page_number={self.pdf_page_number!r})")
 
-@dataclass
 class OcrInputItem:
     """
-    OCR 처리를 위해 ocr_service에 전달될 개별 이미지 정보를 담는 데이터 클래스.
+    OCR 처리를 위해 ocr_service에 전달될 개별 이미지 정보를 담는 클래스.
     EpubProcessor의 _determine_ocr_and_illust_items에서 생성됨.
+    이미 디코딩된 PIL 이미지(image) 또는 지연 로딩 핸들(source) 중 하나를 가지며,
+    OCR 워커는 load_image()로 이미지를 얻고 인코딩이 끝나면 release()로 해제합니다.
     """
-    id: Any # 페이지 번호, 파일 경로 등 OCR 결과와 매칭할 수 있는 고유 식별자
-    image: PILImage # OCR을 수행할 PIL 이미지 객체
-    original_path: str # 원본 파일 경로 또는 식별자 (로깅 및 추적용)
+    __slots__ = ('id', 'image', 'original_path', 'source')
+
+    def __init__(self, id: Any, image: Optional[PILImage], original_path: str, source: Optional[PageDataSource] = None):
+        self.id = id # 페이지 번호, 파일 경로 등 OCR 결과와 매칭할 수 있는 고유 식별자
+        self.image = image # OCR을 수행할 PIL 이미지 객체 (source를 사용하는 경우 None)
+        self.original_path = original_path # 원본 파일 경로 또는 식별자 (로깅 및 추적용)
+        self.source = source # 지연 로딩 핸들 (image가 None일 때 사용)
+
+    def load_image(self) -> PILImage:
+        """OCR할 이미지를 반환합니다. 지연 로딩 핸들이면 이 시점에 디코딩합니다."""
+        if self.image is not None:
+            return self.image
+        if self.source is None:
+            raise ValueError(f"OCR 아이템 '{self.id}'에 이미지가 없습니다.")
+        return self.source.load_image()
+
+    def release(self) -> None:
+        """디코딩된 이미지에 대한 참조를 해제합니다."""
+        self.image = None
+        if self.source is not None:
+            self.source.release()
+
+    def __repr__(self):
+        return f"OcrInputItem(id={self.id!r}, original_path={self.original_path!r})"
 
 @dataclass
 class ProcessedPageItem:
@@ -33,4 +94,96 @@ class ProcessedPageItem:
     id: str # EPUB 아이템 ID (예: "page_1", "img_pdf_1")
     original_path: str # 원본 파일 경로 또는 식별자
     content: Optional[str] = None  # type이 'text'일 경우 OCR 결과 텍스트
-    path: Optional[str] = None  # type이 'image'일 경우 임시 저장된 이미지 파일 경로
\ No newline at end of file
+    path: Optional[str] = None  # type이 'image'일 경우 임시 저장된 이미지 파일 경로
+
+@dataclass
+class RunSummary:
+    """
+    EPUB 생성 한 번(실행 단위)에 대한 통계.
+    EpubProcessor가 실행마다 새로 만들고, 작업이 끝나면 summary_lines()의 내용을 로그에 남깁니다.
+    """
+    source_pages: int = 0 # 입력 페이지/이미지 수
+    ocr_pages: int = 0 # OCR 대상으로 보낸 페이지 수
+    failed_pages: List[int] = field(default_factory=list) # 재시도 후에도 OCR에 실패해 본문을 비워 둔 페이지 번호
+    blank_pages: int = 0 # OCR 대상 중 빈 페이지로 판정되어 Vision API 요청을 생략한 페이지 수
+    duplicate_pages: int = 0 # 앞선 페이지와 중복으로 판정되어 OCR 없이 대표 페이지의 결과를 재사용한 페이지 수 (절약한 OCR 요청 수)
+    duplicate_groups: int = 0 # 페이지가 둘 이상인 중복 그룹 수
+    dedup_hash_seconds: float = 0.0 # 중복 검사용 지각 해시 계산에 쓴 시간
+    dedup_verify_seconds: float = 0.0 # 중복 후보를 원본 해상도 픽셀로 비교하는 데 쓴 시간
+    dedup_rejected: int = 0 # 해시는 가까웠지만 픽셀 비교에서 다른 페이지로 확인되어 OCR한 후보 수
+    mosaic_tiles: int = 0 # 모자이크 캔버스에 모아 OCR한 작은 이미지 수
+    mosaic_requests: int = 0 # 모자이크 OCR 요청 수 (캔버스 수)
+    resumed_pages: int = 0 # 이전 실행의 작업 저널에서 OCR 결과를 복원해 Vision API 요청을 생략한 페이지 수
+    journaled_pages: int = 0 # 이번 실행에서 작업 저널에 기록한 페이지 수
+    overlapped_pages: int = 0 # OCR이 아직 진행 중일 때 EPUB 챕터로 조립된 페이지 수
+    text_layer_pages: int = 0 # PDF 텍스트 레이어를 그대로 써서 OCR(및 래스터화)을 생략한 페이지 수
+    illustration_pages: int = 0 # 일러스트로 처리된 페이지 수 (외부 일러스트, 자동 분류 포함)
+    auto_illustration_pages: int = 0 # 분류기가 일러스트로 판정해 OCR 없이 이미지로 넣은 페이지 수
+    classify_seconds: float = 0.0 # 일러스트 자동 분류에 쓴 시간
+    reencodes_skipped: int = 0 # 페이지를 다시 인코딩해 저장하지 않은 횟수 (OCR 대상 페이지, 기존 파일을 그대로 쓴 일러스트)
+    reencode_bytes_avoided: int = 0 # 재인코딩·복사했다면 쓰였을 디스크 I/O의 추정치 (기존 파일 크기 기준)
+    materialized_files: int = 0 # EPUB에 넣기 위해 새로 인코딩해 디스크에 쓴 일러스트 수
+    materialized_bytes: int = 0
+    materialize_seconds: float = 0.0
+    recompressed_illustrations: int = 0 # EPUB에 넣기 전에 재압축(축소 포함)한 일러스트 수
+    illustration_source_bytes: int = 0 # 재압축 대상 일러스트의 원본 크기 합계
+    illustration_output_bytes: int = 0 # 재압축 후 EPUB에 넣은 크기 합계 (원본이 더 작아 그대로 쓴 경우 원본 크기)
+    illustration_encode_seconds: float = 0.0 # 일러스트 재압축 작업 시간 합계 (워커 스레드 합산)
+    text_chapters: int = 0 # EPUB에 쓴 텍스트 챕터(XHTML 파일) 수 (크기 제한으로 나뉜 챕터 포함)
+    largest_chapter_bytes: int = 0 # 가장 큰 텍스트 챕터의 XHTML 크기 (UTF-8 바이트)
+    chapter_seconds: float = 0.0 # 텍스트 챕터 HTML 생성과 쓰기에 걸린 시간 합계
+    epub_seconds: float = 0.0 # create_epub 전체 경과 시간 (OCR과 겹쳐 진행된 조립 포함)
+
+    def summary_lines(self) -> List[str]:
+        lines = [f"페이지 {self.source_pages}개 (OCR {self.ocr_pages}개, 텍스트 레이어 {self.text_layer_pages}개, "
+                 f"일러스트 {self.illustration_pages}개)"]
+        if self.failed_pages:
+            lines.append(f"OCR 실패 {len(self.failed_pages)}개 페이지 (본문 비움): {sorted(self.failed_pages)}")
+        if self.overlapped_pages:
+            lines.append(f"OCR 진행 중 EPUB 조립: {self.overlapped_pages}개 페이지")
+        if self.resumed_pages:
+            lines.append(f"작업 저널에서 이어서 처리: 완료된 페이지 {self.resumed_pages}개 복원 (OCR 요청 생략), "
+                         f"이번 실행에서 {self.journaled_pages}개 기록")
+        if self.blank_pages:
+            lines.append(f"빈 페이지 {self.blank_pages}개는 OCR 요청 생략 (OCR 대상에 포함)")
+        if self.mosaic_tiles:
+            lines.append(f"모자이크 OCR: 작은 이미지 {self.mosaic_tiles}개를 요청 {self.mosaic_requests}건으로 처리 "
+                         f"(요청 {self.mosaic_tiles - self.mosaic_requests}건 절약)")
+        if self.auto_illustration_pages:
+            lines.append(f"일러스트 자동 분류 {self.auto_illustration_pages}개: OCR 요청 생략, 분류 {self.classify_seconds:.2f}초")
+        if self.duplicate_pages:
+            dedup_ratio = self.duplicate_pages / float(self.ocr_pages + self.duplicate_pages) * 100
+            lines.append(f"중복 페이지 {self.duplicate_pages}개 ({self.duplicate_groups}개 그룹, 중복률 {dedup_ratio:.1f}%): "
+                         f"대표 페이지 OCR 결과 재사용으로 OCR 요청 {self.duplicate_pages}건 절약, "
+                         f"해시 계산 {self.dedup_hash_seconds:.2f}초, 픽셀 확인 {self.dedup_verify_seconds:.2f}초")
+        if self.dedup_rejected:
+            lines.append(f"중복 후보 {self.dedup_rejected}개는 픽셀 비교 결과 다른 페이지로 확인되어 OCR 수행")
+        lines.append(f"재인코딩 생략 {self.reencodes_skipped}회: 디스크 쓰기 약 {self.reencode_bytes_avoided / 1024:.1f}KB 절약")
+        lines.append(f"일러스트 신규 인코딩 {self.materialized_files}회: "
+                     f"{self.materialized_bytes / 1024:.1f}KB, {self.materialize_seconds:.2f}초")
+        if self.text_chapters:
+            lines.append(f"텍스트 챕터 {self.text_chapters}개: 가장 큰 챕터 {self.largest_chapter_bytes / 1024:.1f}KB, "
+                         f"챕터 생성 {self.chapter_seconds:.2f}초 (EPUB 생성 전체 {self.epub_seconds:.2f}초)")
+        if self.illustration_source_bytes:
+            lines.append(f"일러스트 재압축 {self.recompressed_illustrations}개: "
+                         f"{self.illustration_source_bytes / 1024:.1f}KB -> {self.illustration_output_bytes / 1024:.1f}KB, "
+                         f"작업 시간 {self.illustration_encode_seconds:.2f}초")
+        return lines
+
+@dataclass
+class FolderRunSummary:
+    """
+    이미지 폴더 일괄 OCR(ocr_service.process_images_in_folder) 한 번에 대한 통계.
+    파일별 실패는 작업을 멈추지 않고 failures에 모입니다.
+    """
+    processed_files: int = 0 # OCR해 텍스트 파일을 쓴 이미지 수
+    skipped_files: int = 0 # 입력보다 오래되지 않은 출력이 이미 있어 건너뛴 이미지 수
+    failures: List[Any] = field(default_factory=list) # [(이미지 경로, 오류 메시지)]
+    elapsed_seconds: float = 0.0
+
+    def summary_lines(self) -> List[str]:
+        lines = [f"이미지 {self.processed_files + self.skipped_files + len(self.failures)}개: 처리 {self.processed_files}개, "
+                 f"건너뜀 {self.skipped_files}개 (최신 출력 있음), 실패 {len(self.failures)}개, {self.elapsed_seconds:.2f}초"]
+        for image_path, message in self.failures:
+            lines.append(f"실패: {image_path}: {message}")
+        return lines
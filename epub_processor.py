@@ -1,18 +1,29 @@
+import html
 import os
 import shutil
 import time
 import tempfile
+import threading
+from typing import Iterable, Iterator
 from ebooklib import epub
 from PIL import Image
-from pdf2image import convert_from_path
 from logger import app_logger
 from config_manager import config_manager # ConfigManager 임포트
-from ocr_service import ocr_pil_images_batch # 새로운 배치 OCR 함수 사용
+from ocr_service import ocr_pil_images_batch, ocr_pil_images_async, iter_pdf_pages, get_pdf_page_count # 배치 OCR 함수 (스레드/asyncio 엔진), 스트리밍 래스터화
+from pdf_text_layer import find_text_layer_pages # PDF 텍스트 레이어 사전 확인 (OCR 생략)
+from epub_writer import create_epub_writer # EPUB 출력 백엔드 (스트리밍 OCF zip 쓰기)
+from job_journal import open_job_journal # 페이지별 OCR 결과 저널 (중단된 작업 이어서 처리)
+from page_analysis import create_page_deduplicator, create_illustration_classifier, load_analysis_thumbnail # 중복 페이지 감지, 일러스트 자동 분류
+from illustration_encoding import create_illustration_encoder, create_illustration_executor # EPUB용 일러스트 재압축 (병렬)
+from pipeline_stages import PageReorderBuffer # 페이지 순서 재정렬 (OCR과 EPUB 조립 중첩)
 from exceptions import EpubProcessingError, FileOperationError, OCRError # 사용자 정의 예외 임포트
-from dtos import PageDataSource, OcrInputItem, ProcessedPageItem # DTO 임포트
+from dtos import PageDataSource, OcrInputItem, ProcessedPageItem, RunSummary # DTO 임포트
+
+# 다시 인코딩하지 않고 그대로 EPUB에 넣을 수 있는 이미지 형식 (EPUB 코어 미디어 타입)
+EPUB_IMAGE_FORMATS = ("JPEG", "PNG", "GIF")
 
 class EpubProcessor:
-    def __init__(self, input_source, output_epub_path, illustration_pages=None, illustration_images=None, is_image_folder=False, language=None):
+    def __init__(self, input_source, output_epub_path, illustration_pages=None, illustration_images=None, is_image_folder=False, language=None, ocr_engine=None):
         """
         EPUB 생성기 초기화
 
@@ -20,167 +31,428 @@ class EpubProcessor:
             input_source (str or list): 원본 PDF 파일 경로 또는 이미지 파일 경로 리스트
             output_epub_path (str): 생성될 EPUB 파일 경로
             illustration_pages (list, optional): PDF 내 일러스트 페이지 번호 목록 (1부터 시작). Defaults to None.
+                                                 일러스트 자동 분류(illustration_auto_detect)보다 우선합니다.
             illustration_images (list, optional): 별도 일러스트 이미지 파일 경로 목록. Defaults to None.
             is_image_folder (bool): input_source가 이미지 파일 리스트인지 여부. Defaults to False.
+            ocr_engine (str, optional): OCR 엔진 ("thread" 또는 "asyncio"). None이면 설정의 ocr_engine 사용.
         """
         self.language = language if language else config_manager.get("default_epub_language")
+        self.ocr_engine = ocr_engine if ocr_engine else config_manager.get("ocr_engine")
         self.input_source = input_source
         self.output_epub_path = output_epub_path
         self.illustration_pages = set(illustration_pages) if illustration_pages else set()
         self.illustration_images = [os.path.normpath(p) for p in illustration_images] if illustration_images else []
+        self._illustration_image_set = set(self.illustration_images) # 페이지마다 지정 여부를 확인하기 위한 집합
         self.is_image_folder = is_image_folder
+        self.run_summary = RunSummary()
+        self._summary_lock = threading.Lock() # OCR 스레드·워커 스레드에서 run_summary 카운터를 갱신할 때 사용
+        self.text_layer_pages = {} # {PDF 페이지 번호: 텍스트}. 텍스트 레이어가 쓸 만해 OCR 없이 처리할 페이지
+        self.page_deduplicator = None
+        self.illustration_classifier = None
+        self.duplicate_pages = {} # {페이지 번호: (대표 페이지 번호, 원본 경로)}. 대표 페이지의 OCR 결과를 재사용할 페이지
+        self.journal = None
+        self.journaled_pages = {} # {페이지 번호: 텍스트}. 이전 실행의 작업 저널에서 복원해 OCR하지 않을 페이지
+        self.illustration_encoder = None # EPUB에 넣기 전에 일러스트를 재압축할 정책 (illustration_recompress가 False이면 None)
         try:
             self.temp_dir = tempfile.mkdtemp(prefix="epub_proc_")
         except Exception as e:
             app_logger.error(f"임시 디렉토리 생성 실패: {e}", exc_info=True)
             raise FileOperationError(f"임시 디렉토리 생성에 실패했습니다: {e}")
-        app_logger.info(f"EpubProcessor 초기화: 입력='{input_source}', EPUB='{output_epub_path}', 임시폴더='{self.temp_dir}', 이미지폴더모드={is_image_folder}")
+        app_logger.info(f"EpubProcessor 초기화: 입력='{input_source}', EPUB='{output_epub_path}', 임시폴더='{self.temp_dir}', 이미지폴더모드={is_image_folder}, OCR엔진={self.ocr_engine}")
         app_logger.info(f"일러스트 페이지 (PDF 내): {self.illustration_pages}")
         app_logger.info(f"일러스트 이미지 (외부 파일): {self.illustration_images}")
 
-    def _load_pages_from_pdf(self):
+    def _load_pages_from_pdf(self) -> Iterator[PageDataSource]:
         """
-        PDF 파일에서 페이지들을 PIL 이미지 객체 리스트로 로드합니다.
+        PDF 파일의 페이지들을 윈도우 단위로 임시 폴더에 래스터화하면서 페이지 핸들을 하나씩 반환하는 제너레이터.
+        핸들은 래스터화된 파일 경로만 보관하며, 이미지는 필요한 시점(OCR 워커 등)에 디코딩됩니다.
+        텍스트 레이어를 그대로 쓸 페이지(일러스트 지정 페이지 제외)는 래스터화하지 않고 PDF 페이지 핸들만 반환합니다.
         """
         app_logger.info(f"'{self.input_source}' (PDF)에서 페이지 추출 시작...")
+        skipped_pages = {n for n in self.text_layer_pages if n not in self.illustration_pages}
+        last_skipped_page = max(skipped_pages, default=0)
+        render_dpi = config_manager.get("pdf_render_dpi") # 래스터화된 파일이 없는 페이지도 같은 해상도로 디코딩
+        def unrendered_page(page_number):
+            return PageDataSource(path=f"pdf_page_{page_number}", original_index=page_number - 1,
+                                  pdf_path=self.input_source, pdf_page_number=page_number, pdf_dpi=render_dpi)
         try:
-            pil_images = convert_from_path(self.input_source, output_folder=self.temp_dir, fmt='jpeg', paths_only=False)
-            return [PageDataSource(path=f"pdf_page_{i+1}", pil_image=pil_img, original_index=i) for i, pil_img in enumerate(pil_images)]
+            render_pages = None
+            if skipped_pages:
+                render_pages = [n for n in range(1, get_pdf_page_count(self.input_source) + 1) if n not in skipped_pages]
+            next_page = 1
+            for page_number, rendered_path in iter_pdf_pages(self.input_source, pages=render_pages, output_folder=self.temp_dir, fmt='jpeg', paths_only=True):
+                for skipped_page in range(next_page, page_number):
+                    yield unrendered_page(skipped_page)
+                yield PageDataSource(path=f"pdf_page_{page_number}", original_index=page_number - 1, image_path=rendered_path,
+                                     pdf_path=self.input_source, pdf_page_number=page_number, pdf_dpi=render_dpi)
+                next_page = page_number + 1
+            for skipped_page in range(next_page, last_skipped_page + 1):
+                yield unrendered_page(skipped_page)
         except Exception as e:
             app_logger.error(f"PDF '{self.input_source}' 페이지 추출 중 오류: {e}", exc_info=True)
             raise FileOperationError(f"PDF '{self.input_source}'에서 페이지를 추출하는 중 오류가 발생했습니다: {e}")
 
-    def _load_images_from_folder(self):
+    def _load_images_from_folder(self) -> Iterator[PageDataSource]:
         """
-        이미지 폴더(self.input_source가 경로 리스트일 경우)에서 이미지들을 로드합니다.
+        이미지 폴더(self.input_source가 경로 리스트일 경우)의 이미지들에 대한 페이지 핸들을 하나씩 반환하는 제너레이터.
+        파일을 미리 열거나 디코딩하지 않으며, 이미지는 필요한 시점(OCR 워커 등)에 디코딩됩니다.
         """
         app_logger.info(f"이미지 리스트에서 페이지 처리 시작 (총 {len(self.input_source)}개)...")
-        loaded_images = []
         for i, img_path in enumerate(self.input_source): # self.input_source는 이미지 파일 경로 리스트
-            try:
-                normalized_path = os.path.normpath(img_path)
-                loaded_images.append(PageDataSource(path=normalized_path, pil_image=Image.open(normalized_path), original_index=i))
-            except FileNotFoundError:
+            normalized_path = os.path.normpath(img_path)
+            if not os.path.isfile(normalized_path):
                 app_logger.error(f"이미지 파일 로드 실패 (파일 없음): '{img_path}'")
                 raise FileOperationError(f"이미지 파일 '{img_path}'를 찾을 수 없습니다.")
-            except Exception as e:
-                app_logger.error(f"이미지 파일 로드 실패 '{img_path}': {e}", exc_info=True)
-                raise FileOperationError(f"이미지 파일 '{img_path}'을 로드하는 중 오류가 발생했습니다: {e}")
-        return loaded_images
+            yield PageDataSource(path=normalized_path, original_index=i, image_path=normalized_path)
 
-    def _determine_ocr_and_illust_items(self, source_page_data_list: list[PageDataSource]) -> tuple[list[OcrInputItem], list[ProcessedPageItem]]:
+    def _determine_ocr_and_illust_items(self, source_pages: Iterable[PageDataSource],
+                                        page_slots: PageReorderBuffer) -> Iterator[OcrInputItem]:
         """
-        로드된 페이지/이미지 리스트를 기반으로 OCR 대상과 일러스트 아이템을 결정합니다.
-        결정된 아이템들은 임시 폴더에 이미지로 저장됩니다.
+        로드된 페이지/이미지를 하나씩 받아 OCR 대상과 일러스트 아이템을 결정하는 제너레이터.
+        OCR 대상은 OcrInputItem으로 반환(yield)하고, OCR이 필요 없는 아이템(일러스트 등)은 page_slots[페이지 번호]에 넣습니다.
+        OCR 엔진이 소비하는 속도에 맞춰 페이지를 읽으므로 전체 페이지를 한 번에 메모리에 올리지 않습니다.
+        앞서 OCR 대상이 된 페이지와 지각 해시가 거의 같은 페이지는 OCR하지 않고 self.duplicate_pages에 기록해,
+        대표 페이지의 결과를 나중에 그대로 나눠 줍니다.
+        페이지를 다시 인코딩하지 않습니다. OCR 대상은 워커에서 요청용으로 한 번만 인코딩되고,
+        일러스트는 기존 파일(pdf2image 출력 또는 원본 이미지)을 그대로 쓰되 EPUB에 넣을 수 없는 형식일 때만 임시 폴더에 저장합니다.
         """
-        ocr_target_items = []
-        processed_items_list = [] # ProcessedPageItem 리스트
-
-        for i, page_data in enumerate(source_page_data_list):
+        for i, page_data in enumerate(source_pages):
             page_number_for_processing = i + 1 # EPUB 내 순서 및 ID 생성을 위한 내부 번호
-            pil_image = page_data.pil_image
             original_path = page_data.path # 이미 _load_images_from_folder 또는 _load_pages_from_pdf 에서 정규화된 경로 또는 내부 식별자
-
-            # 임시 폴더에 이미지 저장 (모든 페이지/이미지에 대해)
-            temp_image_filename = f"page_{page_number_for_processing}.jpg"
-            temp_image_path = os.path.join(self.temp_dir, temp_image_filename)
-            try:
-                pil_image.save(temp_image_path, "JPEG")
-            except Exception as e:
-                app_logger.error(f"임시 이미지 파일 저장 실패 '{temp_image_path}': {e}", exc_info=True)
-                raise FileOperationError(f"임시 이미지 파일 '{temp_image_filename}' 저장 중 오류: {e}")
+            self._count(source_pages=1)
 
             is_designated_illust = False
             item_id_prefix = "page_" # 기본 ID 접두사
             if not self.is_image_folder and page_number_for_processing in self.illustration_pages:
                 is_designated_illust = True
                 item_id_prefix = "img_pdf_"
-            elif self.is_image_folder and original_path in self.illustration_images:
+            elif self.is_image_folder and original_path in self._illustration_image_set:
                 is_designated_illust = True
                 item_id_prefix = "img_folder_designated_"
 
             if is_designated_illust:
                 app_logger.info(f"아이템 {page_number_for_processing} ('{original_path}')는 일러스트로 처리.")
-                processed_items_list.append(ProcessedPageItem(
-                    type='image', path=temp_image_path,
-                    id=f'{item_id_prefix}{page_number_for_processing}',
-                    page_num=page_number_for_processing, original_path=original_path
-                ))
+                self._append_illustration_item(page_data, page_number_for_processing, item_id_prefix, page_slots)
+            elif not self.is_image_folder and page_number_for_processing in self.text_layer_pages:
+                app_logger.info(f"아이템 {page_number_for_processing} ('{original_path}')는 텍스트 레이어 사용 (OCR 생략).")
+                self._count(text_layer_pages=1)
+                page_slots[page_number_for_processing] = ProcessedPageItem(
+                    type='text', content=self.text_layer_pages[page_number_for_processing],
+                    page_num=page_number_for_processing, id=f'page_{page_number_for_processing}',
+                    original_path=original_path
+                )
             else:
-                app_logger.info(f"아이템 {page_number_for_processing} ('{original_path}') OCR 대상으로 추가.")
-                ocr_target_items.append(OcrInputItem(id=page_number_for_processing, image=pil_image, original_path=original_path))
-        
-        return ocr_target_items, processed_items_list
+                thumbnail = self._analysis_thumbnail(page_data)
+                if (thumbnail is not None and self.illustration_classifier is not None
+                        and self.illustration_classifier.classify(page_number_for_processing, thumbnail)):
+                    # 수동 지정(GUI)되지 않은 페이지만 자동 분류 대상
+                    app_logger.info(f"아이템 {page_number_for_processing} ('{original_path}')는 일러스트로 자동 분류.")
+                    self._count(auto_illustration_pages=1)
+                    self._append_illustration_item(page_data, page_number_for_processing, "img_auto_", page_slots)
+                elif (thumbnail is not None and self.page_deduplicator is not None
+                        and self._record_duplicate(page_data, page_number_for_processing, thumbnail)):
+                    continue
+                elif page_number_for_processing in self.journaled_pages:
+                    app_logger.info(f"아이템 {page_number_for_processing} ('{original_path}')는 작업 저널에서 복원 (OCR 생략).")
+                    self._count(resumed_pages=1)
+                    page_slots[page_number_for_processing] = ProcessedPageItem(
+                        type='text', content=self.journaled_pages[page_number_for_processing],
+                        page_num=page_number_for_processing, id=f'page_{page_number_for_processing}',
+                        original_path=original_path
+                    )
+                else:
+                    app_logger.info(f"아이템 {page_number_for_processing} ('{original_path}') OCR 대상으로 추가.")
+                    self._record_skipped_reencode(page_data)
+                    self._count(ocr_pages=1)
+                    yield OcrInputItem(id=page_number_for_processing, image=None, original_path=original_path, source=page_data)
+
+    def _append_illustration_item(self, page_data: PageDataSource, page_number: int, item_id_prefix: str,
+                                  page_slots: PageReorderBuffer):
+        """페이지를 일러스트 아이템으로 page_slots에 넣습니다."""
+        if self.illustration_encoder is not None and page_data.image_path:
+            illust_path = page_data.image_path # 재압축 단계가 원본 파일에서 바로 읽음 (임시 JPEG 저장을 거치지 않음)
+        else:
+            illust_path = self._illustration_file_for(page_data, page_number)
+        self._count(illustration_pages=1)
+        self._illustrated_paths.add(page_data.path)
+        self._place_illustration(page_slots, ProcessedPageItem(
+            type='image', path=illust_path,
+            id=f'{item_id_prefix}{page_number}',
+            page_num=page_number, original_path=page_data.path
+        ))
+
+    def _place_illustration(self, page_slots: PageReorderBuffer, item: ProcessedPageItem):
+        """일러스트 아이템을 page_slots에 넣습니다. 재압축이 켜져 있으면 스레드 풀에서 재압축을 마친 뒤 넣습니다."""
+        if self.illustration_encoder is None:
+            page_slots[item.page_num] = item
+        else:
+            self._illustration_executor.submit(self._encode_illustration, page_slots, item)
+
+    def _encode_illustration(self, page_slots: PageReorderBuffer, item: ProcessedPageItem):
+        """일러스트 재압축 작업 (스레드 풀에서 실행). 실패하면 원본 파일을 그대로 사용합니다."""
+        try:
+            result = self.illustration_encoder.encode_file(item.path, os.path.join(self.temp_dir, f"illust_{item.id}"))
+            item.path = result.path
+        except Exception as e:
+            app_logger.warning(f"일러스트 재압축 실패 '{item.path}' (원본 사용): {e}")
+        page_slots[item.page_num] = item
+
+    def _analysis_thumbnail(self, page_data: PageDataSource):
+        """
+        일러스트 자동 분류와 중복 검사에 함께 쓸 축소 이미지를 한 번 디코딩합니다.
+        둘 다 꺼져 있거나 디코딩에 실패하면 None (해당 페이지는 그대로 OCR 대상).
+        """
+        if self.illustration_classifier is None and self.page_deduplicator is None:
+            return None
+        try:
+            return load_analysis_thumbnail(page_data.image_path)
+        except Exception as e:
+            app_logger.warning(f"페이지 분석용 이미지 로드 실패 '{page_data.path}' (분석 생략): {e}")
+            return None
+
+    def _record_duplicate(self, page_data: PageDataSource, page_number: int, thumbnail) -> bool:
+        """앞서 OCR 대상이 된 페이지와 같은 페이지이면 self.duplicate_pages에 기록해 대표 페이지의 텍스트를 나눠 받고 True를 반환합니다."""
+        representative = self.page_deduplicator.find_representative(page_number, thumbnail, page_data.image_path)
+        if representative is None:
+            return False
+        app_logger.info(f"아이템 {page_number} ('{page_data.path}')는 {representative} 페이지와 중복. OCR 결과 재사용.")
+        self.duplicate_pages[page_number] = (representative, page_data.path)
+        self._count(duplicate_pages=1)
+        with self._slots_lock: # 대표 페이지의 OCR이 끝났으면 바로 넣고, 아니면 결과가 올 때 넣음
+            text = self._text_by_id.get(representative)
+            if text is None:
+                self._waiting_duplicates.setdefault(representative, []).append((page_number, page_data.path))
+        if text is not None:
+            self._place_duplicate(page_number, text, page_data.path)
+        return True
+
+    def _illustration_file_for(self, page_data: PageDataSource, page_number: int) -> str:
+        """
+        일러스트 페이지를 EPUB에 넣을 이미지 파일 경로를 반환합니다.
+        기존 파일이 EPUB에서 바로 쓸 수 있는 형식이면 그대로 사용하고, 아니면 임시 폴더에 JPEG로 한 번 저장합니다.
+        """
+        try:
+            with Image.open(page_data.image_path) as img:
+                source_format = img.format
+        except Exception as e:
+            app_logger.error(f"일러스트 이미지 확인 실패 '{page_data.image_path}': {e}", exc_info=True)
+            raise FileOperationError(f"일러스트 이미지 '{page_data.path}'를 여는 중 오류: {e}")
+        if source_format in EPUB_IMAGE_FORMATS:
+            self._record_skipped_reencode(page_data)
+            return page_data.image_path
+
+        temp_image_filename = f"page_{page_number}.jpg"
+        temp_image_path = os.path.join(self.temp_dir, temp_image_filename)
+        start_time = time.perf_counter()
+        try:
+            img = page_data.load_image()
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            img.save(temp_image_path, "JPEG")
+        except Exception as e:
+            app_logger.error(f"임시 이미지 파일 저장 실패 '{temp_image_path}': {e}", exc_info=True)
+            raise FileOperationError(f"임시 이미지 파일 '{temp_image_filename}' 저장 중 오류: {e}")
+        finally:
+            page_data.release()
+        self._count(materialized_files=1, materialized_bytes=os.path.getsize(temp_image_path),
+                    materialize_seconds=time.perf_counter() - start_time)
+        return temp_image_path
+
+    def _count(self, **amounts):
+        """
+        실행 통계(run_summary)의 카운터들을 늘립니다 (예: self._count(ocr_pages=1)).
+        페이지 결정과 OCR 결과 처리는 OCR 스레드와 OCR 워커 스레드에서 동시에 실행되므로 잠금 안에서 갱신합니다.
+        챕터 통계처럼 create_epub을 호출한 스레드에서만 갱신하는 값은 직접 더합니다.
+        """
+        with self._summary_lock:
+            for name, amount in amounts.items():
+                setattr(self.run_summary, name, getattr(self.run_summary, name) + amount)
+
+    def _record_skipped_reencode(self, page_data: PageDataSource):
+        """페이지를 다시 인코딩해 저장하지 않은 것을 실행 통계에 기록합니다. 절약량은 이미 있는 원본 파일 크기로 추정합니다."""
+        try:
+            bytes_avoided = os.path.getsize(page_data.image_path)
+        except OSError:
+            bytes_avoided = 0
+        self._count(reencodes_skipped=1, reencode_bytes_avoided=bytes_avoided)
 
     def _extract_and_ocr_pages(self) -> list[ProcessedPageItem]:
         """
         입력 소스에서 페이지를 로드하고, OCR을 수행하며, 최종 컨텐츠 리스트를 준비합니다.
         """
+        return list(self._iter_processed_pages())
+
+    def _iter_processed_pages(self) -> Iterator[ProcessedPageItem]:
+        """
+        입력 소스에서 페이지를 로드해 OCR하면서, 앞선 페이지가 모두 준비된 페이지부터 페이지 순서로 반환(yield)하는 제너레이터.
+        OCR은 별도 스레드에서 진행되므로, 호출자(create_epub)는 뒤쪽 페이지를 OCR하는 동안 앞쪽 페이지로 챕터를 만들 수 있습니다.
+        """
+        self.run_summary = RunSummary()
+        self.text_layer_pages = {}
+        self.page_deduplicator = create_page_deduplicator()
+        self.illustration_classifier = create_illustration_classifier()
+        self.duplicate_pages = {}
+        self._illustrated_paths = set()
+        self.illustration_encoder = create_illustration_encoder()
+        self._illustration_executor = create_illustration_executor() if self.illustration_encoder is not None else None
+        self.journal = open_job_journal(self.output_epub_path, self.input_source, self.illustration_pages, self.illustration_images)
+        self.journaled_pages = self.journal.completed_pages if self.journal is not None else {}
+        if not self.is_image_folder and config_manager.get("pdf_text_layer_check"):
+            self.text_layer_pages = find_text_layer_pages(self.input_source)
         if not self.is_image_folder:
-            source_page_data_list = self._load_pages_from_pdf()
+            source_pages = self._load_pages_from_pdf()
         else:
-            source_page_data_list = self._load_images_from_folder()
+            source_pages = self._load_images_from_folder()
 
+        # 페이지 로드 → OCR/일러스트 결정 → OCR이 하나의 스트림으로 연결되어, 페이지가 준비되는 대로 OCR이 시작됨.
+        # 일러스트 등은 _determine_ocr_and_illust_items가 스트림을 소비하면서, OCR 결과는 끝나는 대로 각 페이지 번호 자리에 넣고,
+        # page_slots가 앞선 페이지가 모두 준비된 페이지부터 순서대로 내보냄
+        page_slots = PageReorderBuffer()
+        original_paths = {} # 결과 매핑용 {OCR 아이템 id: original_path}
+        self._text_by_id = dict(self.journaled_pages) # 중복 페이지에 나눠 줄 대표 페이지 텍스트 (저널에서 복원한 결과 포함)
+        self._waiting_duplicates = {} # {대표 페이지 번호: [(중복 페이지 번호, 원본 경로)]}. 대표 페이지의 OCR을 기다리는 중복 페이지
+        self._slots_lock = threading.Lock()
+        self._page_slots = page_slots
+        stop_requested = threading.Event()
+        def iter_ocr_input_items():
+            try:
+                for ocr_item in self._determine_ocr_and_illust_items(source_pages, page_slots):
+                    if stop_requested.is_set():
+                        raise EpubProcessingError("EPUB 생성이 중단되어 페이지 처리를 멈춥니다.")
+                    original_paths[ocr_item.id] = ocr_item.original_path
+                    yield ocr_item
+            except (FileOperationError, EpubProcessingError): # 페이지 로드/임시 파일 저장 중 발생한 오류는 그대로 전달
+                raise
+            except Exception as e:
+                app_logger.error(f"OCR/일러스트 아이템 결정 중 오류: {e}", exc_info=True)
+                raise EpubProcessingError(f"페이지 처리 중 오류 발생: {e}")
+
+        def place_result(result):
+            # 페이지가 끝나는 대로 저널에 기록하고 자리에 넣음. 오류 결과는 저널에 기록하지 않아 다음 실행에서 다시 OCR
+            if self.journal is not None and not result.get('error'):
+                self.journal.record(result['id'], result['text'])
+            if result.get('error'): # 실패한 페이지는 본문을 비워 두고 요약에 남김 (오류 문구를 책에 넣지 않음)
+                with self._summary_lock:
+                    self.run_summary.failed_pages.append(result['id'])
+            if result.get('blank'): # 빈 페이지로 판정되어 OCR 요청을 생략한 페이지 (빈 텍스트)
+                self._count(blank_pages=1)
+            page_slots[result['id']] = ProcessedPageItem(
+                type='text', content=result['text'],
+                page_num=result['id'], id=f'page_{result["id"]}', # 텍스트 페이지 ID 규칙
+                original_path=original_paths.get(result['id'], "Unknown")
+            )
+            with self._slots_lock:
+                self._text_by_id[result['id']] = result['text']
+                waiting = self._waiting_duplicates.pop(result['id'], [])
+            for page_number, original_path in waiting:
+                self._place_duplicate(page_number, result['text'], original_path)
+
+        def run_ocr():
+            try:
+                self._run_ocr_stage(iter_ocr_input_items(), place_result)
+                self._place_external_illustrations(page_slots)
+                self._finish_illustration_encoding()
+                page_slots.close()
+            except BaseException as e:
+                page_slots.fail(e)
+            finally:
+                if self._illustration_executor is not None: # 실패한 경우 남은 재압축 작업 취소
+                    self._illustration_executor.shutdown(wait=True, cancel_futures=True)
+
+        ocr_thread = threading.Thread(target=run_ocr, name="epub-ocr", daemon=True)
+        ocr_thread.start()
         try:
-            ocr_input_items, processed_page_items = self._determine_ocr_and_illust_items(source_page_data_list)
-        except FileOperationError: # _determine_ocr_and_illust_items 내부에서 발생한 FileOperationError는 그대로 전달
+            for item in page_slots:
+                if ocr_thread.is_alive():
+                    self.run_summary.overlapped_pages += 1
+                yield item
+        finally:
+            stop_requested.set() # 소비자가 먼저 끝나면(오류 등) 남은 페이지를 더 읽지 않게 함
+            ocr_thread.join()
+        app_logger.info(f"EPUB 조립 재정렬 버퍼: 최대 {page_slots.peak_buffered}개 페이지 대기, "
+                        f"OCR 진행 중 조립 {self.run_summary.overlapped_pages}개 페이지.")
+
+    def _run_ocr_stage(self, ocr_input_items, on_result):
+        """OCR 대상 아이템 스트림을 설정된 엔진으로 OCR합니다. 결과는 끝나는 대로 on_result로 전달됩니다."""
+        try:
+            # 두 엔진 모두 [{'id': 식별자, 'text': 추출된 텍스트}] 반환
+            if self.ocr_engine == "asyncio":
+                ocr_results = ocr_pil_images_async(ocr_input_items, on_result=on_result)
+            else:
+                ocr_results = ocr_pil_images_batch(ocr_input_items, on_result=on_result)
+        except (OCRError, FileOperationError, EpubProcessingError): # ocr_service 및 페이지 로드에서 발생한 오류는 그대로 전달
             raise
-        except Exception as e:
-            app_logger.error(f"OCR/일러스트 아이템 결정 중 오류: {e}", exc_info=True)
-            raise EpubProcessingError(f"페이지 처리 중 오류 발생: {e}")
+        except Exception as e: # ocr_pil_images_batch의 예상치 못한 다른 오류
+            app_logger.error(f"배치 OCR 호출 중 예상치 못한 오류: {e}", exc_info=True)
+            raise OCRError(f"배치 OCR 처리 중 오류: {e}")
+        finally:
+            if self.journal is not None: # 실패해도 기록된 페이지는 남겨 다음 실행에서 이어서 처리
+                self.journal.close()
+                self.run_summary.journaled_pages = self.journal.recorded
 
-        if ocr_input_items:
-            try:
-                ocr_results = ocr_pil_images_batch(ocr_input_items) # [{'id': 식별자, 'text': 추출된 텍스트}] 반환
-            except OCRError: # ocr_service에서 발생한 OCRError는 그대로 전달
-                raise
-            except Exception as e: # ocr_pil_images_batch의 예상치 못한 다른 오류
-                app_logger.error(f"배치 OCR 호출 중 예상치 못한 오류: {e}", exc_info=True)
-                raise OCRError(f"배치 OCR 처리 중 오류: {e}")
-                
-            for result in ocr_results:
-                # ocr_input_items에서 original_path를 찾아 매핑
-                ocr_item_origin = next((item for item in ocr_input_items if item.id == result['id']), None)
-                original_path_for_text = ocr_item_origin.original_path if ocr_item_origin else "Unknown"
-                
-                processed_page_items.append(ProcessedPageItem(
-                    type='text', content=result['text'],
-                    page_num=result['id'], id=f'page_{result["id"]}', # 텍스트 페이지 ID 규칙
-                    original_path=original_path_for_text
-                ))
+        ocr_results = ocr_results or []
+        self.run_summary.mosaic_tiles = sum(1 for result in ocr_results if 'mosaic' in result)
+        self.run_summary.mosaic_requests = len({result['mosaic'] for result in ocr_results if 'mosaic' in result})
+        # 대표 페이지 결과가 오지 않은 중복 페이지 (정상적으로는 없음)
+        for representative, waiting in self._waiting_duplicates.items():
+            for page_number, original_path in waiting:
+                self._place_duplicate(page_number, "", original_path)
+        self._waiting_duplicates = {}
+        if self.page_deduplicator is not None:
+            self.run_summary.duplicate_groups = self.page_deduplicator.duplicate_groups()
+            self.run_summary.dedup_hash_seconds = self.page_deduplicator.hash_seconds
+            self.run_summary.dedup_verify_seconds = self.page_deduplicator.verify_seconds
+            self.run_summary.dedup_rejected = self.page_deduplicator.rejected_candidates
+        if self.illustration_classifier is not None:
+            self.run_summary.classify_seconds = self.illustration_classifier.seconds
+
+    def _finish_illustration_encoding(self):
+        """진행 중인 일러스트 재압축이 모두 끝날 때까지 기다리고, 재압축 전후 크기를 실행 통계에 기록합니다."""
+        encoder = self.illustration_encoder
+        if encoder is None:
+            return
+        self._illustration_executor.shutdown(wait=True)
+        encoder.log_summary()
+        self.run_summary.recompressed_illustrations = encoder.recompressed_files
+        self.run_summary.illustration_source_bytes = encoder.source_bytes
+        self.run_summary.illustration_output_bytes = encoder.output_bytes
+        self.run_summary.illustration_encode_seconds = encoder.total_seconds
+
+    def _place_duplicate(self, page_number: int, text: str, original_path: str):
+        """중복 페이지에 대표 페이지의 텍스트를 넣습니다."""
+        self._page_slots[page_number] = ProcessedPageItem(
+            type='text', content=text,
+            page_num=page_number, id=f'page_{page_number}',
+            original_path=original_path
+        )
 
-        # 외부 일러스트 이미지 추가
+    def _place_external_illustrations(self, page_slots: PageReorderBuffer):
+        """외부 일러스트 이미지를 원본 페이지 다음 번호 자리에 넣습니다."""
+        source_page_count = self.run_summary.source_pages # 원본 페이지 수 (일러스트 + OCR 페이지)
         for idx, img_path in enumerate(self.illustration_images):
             if os.path.exists(img_path):
                 normalized_img_path = os.path.normpath(img_path) # 이미 __init__에서 정규화되었지만, 일관성을 위해 다시 호출
                 # 이미지 폴더 모드에서 이미 폴더 내 일러스트로 지정된 경우 중복 방지
-                if self.is_image_folder and normalized_img_path in [item.original_path for item in processed_page_items if item.type == 'image']:
+                if self.is_image_folder and normalized_img_path in self._illustrated_paths:
                     app_logger.info(f"외부 일러스트 '{img_path}'는 이미 폴더 내 지정 일러스트로 처리됨. 중복 추가 안함.")
                     continue
                 
-                temp_ext_img_name = f"ext_illust_{idx}{os.path.splitext(img_path)[1]}" # img_path 사용
-                temp_ext_img_path = os.path.join(self.temp_dir, temp_ext_img_name)
-                try:
-                    shutil.copy(img_path, temp_ext_img_path)
-                    app_logger.info(f"외부 일러스트 이미지 추가: {img_path} -> {temp_ext_img_path}")
-                    processed_page_items.append(ProcessedPageItem(
-                        type='image', path=temp_ext_img_path,
-                        id=f'img_ext_{idx}', page_num=len(source_page_data_list) + idx + 1, # 페이지 번호는 기존 페이지 수 이후로
-                        original_path=normalized_img_path # 정규화된 경로 저장
-                    ))
-                except Exception as e:
-                    app_logger.warning(f"외부 일러스트 파일 복사 실패 '{img_path}': {e}")
-                    # 오류를 발생시키지 않고 경고만 로깅 후 계속 진행할 수 있음
+                # 임시 폴더로 복사하지 않고 원본 파일을 그대로 EPUB에 넣음
+                app_logger.info(f"외부 일러스트 이미지 추가: {img_path}")
+                external_page_number = source_page_count + idx + 1 # 페이지 번호는 기존 페이지 수 이후로
+                self._place_illustration(page_slots, ProcessedPageItem(
+                    type='image', path=normalized_img_path,
+                    id=f'img_ext_{idx}', page_num=external_page_number,
+                    original_path=normalized_img_path # 정규화된 경로 저장
+                ))
+                self._count(illustration_pages=1, reencode_bytes_avoided=os.path.getsize(normalized_img_path))
             else:
                 app_logger.warning(f"외부 일러스트 이미지 파일을 찾을 수 없음: {img_path}")
 
-        # 페이지 번호 기준으로 정렬
-        processed_page_items.sort(key=lambda item: item.page_num)
-        return processed_page_items
-
     def create_epub(self, title="Sample Ebook", author="Unknown Author"):
         """
         추출된 텍스트와 이미지를 사용하여 EPUB 파일을 생성
+        챕터와 이미지는 만들어지는 대로 출력 백엔드(epub_writer 설정)에 넘겨, 스트리밍 백엔드에서는 바로 압축 파일에 쓰고 해제합니다.
         """
         app_logger.info(f"EPUB 생성 시작: '{self.output_epub_path}'")
         book = epub.EpubBook()
@@ -189,18 +461,45 @@ class EpubProcessor:
         book.set_language(self.language)
         book.add_author(author)
 
-        extracted_data = self._extract_and_ocr_pages()
+        start_time = time.perf_counter()
+        writer = create_epub_writer(self.output_epub_path, book)
+        try:
+            # 앞쪽 페이지부터 준비되는 대로 챕터를 만들어, EPUB 조립이 뒤쪽 페이지의 OCR과 겹쳐 진행됨
+            self._write_book_items(book, writer, self._iter_processed_pages())
+        except BaseException:
+            writer.abort()
+            raise
+        self.run_summary.epub_seconds = time.perf_counter() - start_time
+        app_logger.info(f"EPUB 파일 생성 완료: '{self.output_epub_path}'")
+        if self.journal is not None and not self.run_summary.failed_pages: # 실패한 페이지가 있으면 다음 실행에서 그 페이지만 다시 OCR
+            self.journal.discard()
+        for line in self.run_summary.summary_lines():
+            app_logger.info(f"실행 요약: {line}")
+        if self.run_summary.failed_pages:
+            app_logger.error(f"OCR에 실패한 페이지 {len(self.run_summary.failed_pages)}개는 EPUB에 빈 페이지로 들어갔습니다: "
+                             f"{sorted(self.run_summary.failed_pages)}")
+        self._cleanup()
 
+    def _write_book_items(self, book, writer, extracted_data):
+        """
+        페이지 아이템을 챕터/이미지로 만들어 writer에 넘기고, 목차와 읽기 순서를 설정한 뒤 EPUB 쓰기를 마칩니다.
+        연속된 텍스트 페이지는 한 챕터로 합치되, 설정의 epub_chapter_max_kb/epub_chapter_max_pages를 넘으면 다음 챕터로 나눕니다.
+        """
+        max_chapter_kb = config_manager.get("epub_chapter_max_kb")
+        max_chapter_bytes = int(max_chapter_kb) * 1024 if max_chapter_kb else None
+        max_chapter_pages = config_manager.get("epub_chapter_max_pages")
         new_chapters_for_toc = []
         new_spine_order = ['nav'] # 목차(nav)를 가장 먼저 추가
 
         current_text_group_content_html = []
         current_text_group_start_item = None
+        current_text_group_bytes = 0 # 현재 그룹 페이지 HTML의 UTF-8 바이트 수
 
         def add_merged_text_chapter_to_book(start_item, content_list):
             if not start_item or not content_list:
                 return
 
+            start_time = time.perf_counter()
             merged_content_html = "".join(content_list)
             # 병합된 챕터의 제목은 첫 페이지 기준.
             merged_chapter_title = f'Page {start_item.page_num}'
@@ -213,27 +512,43 @@ class EpubProcessor:
             epub_merged_chapter = epub.EpubHtml(title=merged_chapter_title, file_name=f'{merged_item_id}.xhtml', lang=self.language)
             epub_merged_chapter.content = final_html_content
             
-            book.add_item(epub_merged_chapter)
+            chapter_bytes = len(final_html_content.encode('utf-8'))
+            writer.add_item(epub_merged_chapter)
             new_chapters_for_toc.append(epub_merged_chapter)
             new_spine_order.append(epub_merged_chapter)
+            self.run_summary.text_chapters += 1
+            self.run_summary.largest_chapter_bytes = max(self.run_summary.largest_chapter_bytes, chapter_bytes)
+            self.run_summary.chapter_seconds += time.perf_counter() - start_time
             app_logger.info(f"병합된 텍스트 챕터 추가: {merged_chapter_title} ({merged_item_id}.xhtml), 원본 페이지 {len(content_list)}개 포함")
 
         for item_data in extracted_data: # ProcessedPageItem 객체
             if item_data.type == 'text':
-                if not current_text_group_start_item:
-                    current_text_group_start_item = item_data
-                
-                # 각 원본 페이지의 부제목과 내용을 그룹에 추가
+                # 각 원본 페이지의 부제목과 내용 (OCR 텍스트의 <, & 등은 이스케이프)
                 page_specific_title = f'Page {item_data.page_num}'
                 # 병합된 파일 내에서는 h2로 각 페이지 시작을 표시
-                html_for_this_page = f"<h2>{page_specific_title}</h2><pre>{item_data.content}</pre>\n"
+                html_for_this_page = f"<h2>{page_specific_title}</h2><pre>{html.escape(item_data.content or '')}</pre>\n"
+                page_bytes = len(html_for_this_page.encode('utf-8'))
+
+                # 이 페이지를 더하면 챕터 크기/페이지 수 제한을 넘으면 지금까지의 그룹을 챕터로 내보내고 새 챕터 시작
+                if current_text_group_content_html and (
+                        (max_chapter_bytes and current_text_group_bytes + page_bytes > max_chapter_bytes)
+                        or (max_chapter_pages and len(current_text_group_content_html) >= max_chapter_pages)):
+                    add_merged_text_chapter_to_book(current_text_group_start_item, current_text_group_content_html)
+                    current_text_group_content_html = []
+                    current_text_group_start_item = None
+                    current_text_group_bytes = 0
+
+                if not current_text_group_start_item:
+                    current_text_group_start_item = item_data
                 current_text_group_content_html.append(html_for_this_page)
+                current_text_group_bytes += page_bytes
             
             elif item_data.type == 'image':
                 # 1. 현재까지 모인 텍스트 그룹이 있다면 병합해서 추가
                 add_merged_text_chapter_to_book(current_text_group_start_item, current_text_group_content_html)
                 current_text_group_content_html = []
                 current_text_group_start_item = None
+                current_text_group_bytes = 0
                 
                 # 2. 이미지 아이템 추가
                 img_pil = None
@@ -245,9 +560,7 @@ class EpubProcessor:
                         epub_image = epub.EpubImage()
                         epub_image.file_name = f'images/{img_filename_epub}' # EPUB 내 이미지 폴더 경로
                         epub_image.media_type = Image.MIME[img_pil.format]
-                        with open(item_data.path, 'rb') as f_img:
-                            epub_image.content = f_img.read()
-                        book.add_item(epub_image)
+                        writer.add_file_item(epub_image, item_data.path) # 파일 내용은 writer가 직접 읽음
                         app_logger.debug(f"이미지 아이템 추가: {epub_image.file_name}")
 
                         image_chapter_title = f'Illustration (Page {item_data.page_num})'
@@ -255,7 +568,7 @@ class EpubProcessor:
                         epub_img_chapter = epub.EpubHtml(title=image_chapter_title, file_name=image_xhtml_filename, lang=self.language)
                         epub_img_chapter.content = f'<h1>{image_chapter_title}</h1><div><img src="images/{img_filename_epub}" alt="{image_chapter_title}" style="max-width:100%;"/></div>'
                         epub_img_chapter.add_item(epub_image)
-                        book.add_item(epub_img_chapter)
+                        writer.add_item(epub_img_chapter)
                         new_chapters_for_toc.append(epub_img_chapter)
                         new_spine_order.append(epub_img_chapter)
                         app_logger.debug(f"이미지 챕터 추가: {image_chapter_title} ({image_xhtml_filename})")
@@ -274,10 +587,7 @@ class EpubProcessor:
         book.spine = new_spine_order # 읽기 순서 설정
         book.add_item(epub.EpubNcx()) # NCX (목차) 파일 생성
         book.add_item(epub.EpubNav()) # Nav (탐색) 문서 생성
-
-        epub.write_epub(self.output_epub_path, book, {})
-        app_logger.info(f"EPUB 파일 생성 완료: '{self.output_epub_path}'")
-        self._cleanup()
+        writer.finish() # NCX/Nav와 content.opf는 마지막에 씀
 
     def _cleanup(self):
         """임시 파일 및 폴더 정리"""
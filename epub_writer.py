@@ -0,0 +1,149 @@
+"""
+EPUB 파일(OCF zip)을 쓰는 출력 백엔드를 정의합니다.
+스트리밍 백엔드는 챕터와 이미지가 만들어지는 대로 압축 파일에 바로 써 넣고 메모리에서 해제하며,
+매니페스트(content.opf)·스파인·NCX·nav는 마지막에 씁니다. 파일 구성과 목차는 ebooklib의 write_epub과 같습니다.
+출력은 같은 폴더의 임시 파일에 쓰고 끝났을 때만 os.replace로 대상 경로에 옮기므로, 실패하거나 취소된 실행이 기존 EPUB을 지우지 않습니다.
+"""
+import os
+import uuid
+import zipfile
+import ebooklib
+from ebooklib import epub
+from ebooklib.utils import get_pages
+from logger import app_logger
+from config_manager import config_manager
+
+# 압축 파일에 쓴 뒤 내용을 비운 XHTML 문서의 자리표시자 (nav를 만들 때 문서마다 본문을 다시 파싱해 페이지 표시를 찾으므로 본문이 있는 빈 문서가 필요)
+_RELEASED_DOCUMENT = b"<html><body><div></div></body></html>"
+
+# StreamingEpubWriter가 사용하는 ebooklib EpubWriter의 내부 메서드. 없으면 기존 방식으로 대체
+_REQUIRED_EBOOKLIB_INTERNALS = ("_write_container", "_write_opf", "_get_ncx", "_get_nav", "process")
+
+# 스트리밍 백엔드의 출력이 write_epub과 같은지 확인한 ebooklib 버전 (major, minor).
+# 내부 메서드의 동작은 버전마다 바뀔 수 있으므로, 이외의 버전에서는 기존 방식으로 씀
+_TESTED_EBOOKLIB_VERSIONS = ((0, 20),)
+
+def _make_temp_path(name):
+    """대상 EPUB과 같은 폴더에 임시 파일을 만들고 경로를 반환합니다 (같은 파일 시스템이어야 os.replace가 원자적)."""
+    directory, base_name = os.path.split(os.path.abspath(name))
+    temp_path = os.path.join(directory, f".{base_name}.{uuid.uuid4().hex[:12]}.tmp")
+    # mkstemp(0600)과 달리 umask에 따른 일반 파일 권한으로 만들어, 완성된 EPUB의 권한이 기존과 같게 함
+    os.close(os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+    return temp_path
+
+def _remove_temp_file(temp_path):
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        app_logger.warning(f"EPUB 임시 파일 정리 실패 '{temp_path}': {e}")
+
+class BufferedEpubWriter:
+    """기존 방식: 모든 아이템 내용을 EpubBook에 모아 두었다가 마지막에 ebooklib.write_epub으로 임시 파일에 한 번에 쓰고 대상 경로로 옮깁니다."""
+    def __init__(self, name, book):
+        self.name = name
+        self.book = book
+
+    def add_item(self, item):
+        self.book.add_item(item)
+
+    def add_file_item(self, item, source_path):
+        """디스크의 파일 내용을 아이템에 읽어 들여 책에 추가합니다."""
+        with open(source_path, 'rb') as source_file:
+            item.content = source_file.read()
+        self.book.add_item(item)
+
+    def finish(self):
+        temp_path = _make_temp_path(self.name)
+        try:
+            epub.write_epub(temp_path, self.book, {})
+            os.replace(temp_path, self.name)
+        except BaseException:
+            _remove_temp_file(temp_path)
+            raise
+
+    def abort(self):
+        pass
+
+class StreamingEpubWriter(epub.EpubWriter):
+    """
+    OCF zip을 점진적으로 쓰는 EPUB 출력 백엔드.
+    add_item/add_file_item으로 추가한 아이템은 곧바로 압축 파일에 쓰고 내용을 해제하며,
+    finish()에서 책에 남아 있는 아이템(NCX, nav 등)과 content.opf를 쓰고, 임시 파일을 대상 경로로 옮깁니다.
+    """
+    def __init__(self, name, book, options=None):
+        super().__init__(name, book, options)
+        self._written = set() # 이미 압축 파일에 쓴 아이템의 id()
+        self._temp_path = _make_temp_path(name) # 작업 중에는 대상 경로(self.file_name)를 건드리지 않음
+        try:
+            self.out = zipfile.ZipFile(self._temp_path, "w", zipfile.ZIP_DEFLATED,
+                                       compresslevel=self.options.get("compresslevel", 6))
+        except BaseException:
+            _remove_temp_file(self._temp_path)
+            raise
+        self.out.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        self._write_container()
+
+    def _archive_name(self, item):
+        return f"{self.book.FOLDER_NAME}/{item.file_name}" if item.manifest else item.file_name
+
+    def add_item(self, item):
+        """아이템을 책에 추가하고 바로 압축 파일에 씁니다. 쓴 뒤에는 내용을 메모리에서 해제합니다."""
+        self.book.add_item(item)
+        self.out.writestr(self._archive_name(item), item.get_content())
+        self._written.add(id(item))
+        if not isinstance(item, epub.EpubHtml):
+            item.content = b""
+        elif not get_pages(item): # 페이지 표시(epub:type)가 있는 문서는 nav의 페이지 목록을 위해 내용을 남김
+            item.content = _RELEASED_DOCUMENT
+
+    def add_file_item(self, item, source_path):
+        """이미지처럼 디스크에 있는 파일을 내용 없이 책에 추가하고, 파일에서 압축 파일로 바로 복사합니다 (전체를 메모리에 올리지 않음)."""
+        self.book.add_item(item)
+        self.out.write(source_path, self._archive_name(item))
+        self._written.add(id(item))
+
+    def finish(self):
+        """content.opf와 아직 쓰지 않은 아이템(NCX, nav 등)을 쓰고 압축 파일을 닫습니다."""
+        self.process()
+        self._write_opf()
+        for item in self.book.get_items():
+            if id(item) in self._written:
+                continue
+            if isinstance(item, epub.EpubNcx):
+                content = self._get_ncx()
+            elif isinstance(item, epub.EpubNav):
+                content = self._get_nav(item)
+            else:
+                content = item.get_content()
+            self.out.writestr(self._archive_name(item), content)
+        self.out.close()
+        os.replace(self._temp_path, self.file_name)
+
+    def abort(self):
+        """작업이 실패했을 때 압축 파일을 닫고 임시 파일만 삭제합니다 (대상 경로의 기존 EPUB은 그대로 둠)."""
+        try:
+            self.out.close()
+        except Exception as e:
+            app_logger.warning(f"EPUB 임시 파일 닫기 실패 '{self._temp_path}': {e}")
+        _remove_temp_file(self._temp_path)
+
+def create_epub_writer(name, book):
+    """
+    설정의 epub_writer("streaming" 또는 "ebooklib")에 맞는 EPUB 출력 백엔드를 만듭니다.
+    스트리밍 백엔드는 ebooklib 내부 메서드에 의존하므로, 설치된 ebooklib이 확인된 버전이 아니거나
+    필요한 내부 메서드가 없으면 기존 방식으로 대체합니다.
+    """
+    if config_manager.get("epub_writer") != "streaming":
+        return BufferedEpubWriter(name, book)
+    installed_version = tuple(getattr(ebooklib, "VERSION", ())[:2])
+    if installed_version not in _TESTED_EBOOKLIB_VERSIONS:
+        app_logger.warning(f"설치된 ebooklib 버전({'.'.join(map(str, installed_version)) or '알 수 없음'})에서는 스트리밍 EPUB 쓰기를 "
+                           f"확인하지 않았으므로 기존 방식으로 씁니다.")
+        return BufferedEpubWriter(name, book)
+    missing = [attr for attr in _REQUIRED_EBOOKLIB_INTERNALS if not hasattr(epub.EpubWriter, attr)]
+    if missing:
+        app_logger.warning(f"설치된 ebooklib에 스트리밍 EPUB 쓰기에 필요한 내부 메서드({', '.join(missing)})가 없어 기존 방식으로 씁니다.")
+        return BufferedEpubWriter(name, book)
+    return StreamingEpubWriter(name, book)
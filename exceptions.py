@@ -18,6 +18,16 @@ class OCRError(ApplicationBaseException):
     def __init__(self, message="OCR 처리 중 오류가 발생했습니다."):
         super().__init__(message)
 
+class OCRCircuitOpenError(OCRError):
+    """OCR 오류율 급증으로 서킷 브레이커가 열려 Vision API 호출을 중단할 때 사용됩니다."""
+    def __init__(self, message="OCR 오류율 급증으로 Vision API 호출이 중단되었습니다."):
+        super().__init__(message)
+
+class OCRDeadlineExceededError(OCRError):
+    """OCR 작업 전체 기한을 초과했을 때 사용됩니다."""
+    def __init__(self, message="OCR 작업 기한을 초과했습니다."):
+        super().__init__(message)
+
 class EpubProcessingError(ApplicationBaseException):
     """EPUB 생성 처리 중 오류 발생 시 사용됩니다."""
     def __init__(self, message="EPUB 생성 중 오류가 발생했습니다."):
@@ -0,0 +1,180 @@
+"""
+PDF/TIFF 파일을 래스터화하지 않고 Vision API 파일 주석(동기 batch_annotate_files)으로 보내는 경로의
+전송 계층(실제 Vision API / 오프라인 테스트용 로컬 대체 전송)과 문서 분할(chunk)을 정의합니다.
+"""
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+from collections import namedtuple
+from google.cloud import vision
+from PIL import Image
+from logger import app_logger
+from config_manager import config_manager
+from exceptions import OCRError
+from pdf_text_layer import run_pdftotext
+
+# 동기 batch_annotate_files 요청 하나가 처리할 수 있는 최대 페이지 수 (API 제한)
+FILE_ANNOTATION_MAX_PAGES = 5
+
+# 파일 주석 경로에서 요청하는 기능 유형 (OCR 캐시 키에 포함)
+FILE_ANNOTATION_FEATURE = "DOCUMENT_TEXT_DETECTION_FILE"
+
+PDF_MIME_TYPE = "application/pdf"
+TIFF_MIME_TYPE = "image/tiff"
+
+# 요청 하나에 해당하는 문서 조각.
+# page_numbers: 원본 문서 기준 페이지 번호, content: 보낼 파일 바이트, request_pages: content 기준 페이지 번호 (1부터 시작)
+FileChunk = namedtuple("FileChunk", ["page_numbers", "content", "mime_type", "request_pages"])
+
+def mime_type_for(file_path):
+    """파일 확장자로 파일 주석 요청의 MIME 타입을 결정합니다."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in ('.tif', '.tiff'):
+        return TIFF_MIME_TYPE
+    if extension == '.pdf':
+        return PDF_MIME_TYPE
+    raise OCRError(f"파일 주석 모드는 PDF/TIFF만 지원합니다: {file_path}")
+
+class VisionFileTransport:
+    """Google Vision API의 batch_annotate_files로 파일 조각을 보내는 전송."""
+    def __init__(self, client_provider):
+        """
+        Args:
+            client_provider (VisionClientProvider): Vision 클라이언트를 제공하는 객체.
+        """
+        self.client_provider = client_provider
+
+    def annotate(self, content, mime_type, pages, language_hints=None):
+        """
+        파일 바이트의 지정한 페이지들에 대해 텍스트 감지를 요청합니다.
+
+        Returns:
+            vision.AnnotateFileResponse: 페이지별 AnnotateImageResponse를 담은 응답.
+        """
+        request = vision.AnnotateFileRequest(
+            input_config=vision.InputConfig(content=content, mime_type=mime_type),
+            features=[vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)],
+            pages=list(pages),
+        )
+        if language_hints:
+            request.image_context = vision.ImageContext(language_hints=list(language_hints))
+        batch_response = self.client_provider.get_client().batch_annotate_files(requests=[request])
+        return batch_response.responses[0]
+
+class LocalFileTransport:
+    """
+    네트워크 없이 파일 주석 경로를 시험하기 위한 로컬 대체 전송.
+    Vision API와 같은 형태의 응답(AnnotateFileResponse)을 만들며, 페이지 텍스트는 text_provider에서 얻습니다.
+    기본 text_provider는 poppler의 pdftotext로 PDF 텍스트 레이어를 읽습니다 (TIFF는 빈 텍스트).
+    """
+    def __init__(self, text_provider=None):
+        """
+        Args:
+            text_provider (callable, optional): (content, mime_type, page) -> str. 페이지 텍스트를 돌려주는 함수.
+        """
+        self.text_provider = text_provider or _pdftotext_provider
+        self.calls = 0
+
+    def annotate(self, content, mime_type, pages, language_hints=None):
+        self.calls += 1
+        page_responses = []
+        for page in pages:
+            text = self.text_provider(content, mime_type, page)
+            page_responses.append(vision.AnnotateImageResponse(
+                full_text_annotation=vision.TextAnnotation(text=text),
+                context=vision.ImageAnnotationContext(page_number=page),
+            ))
+        return vision.AnnotateFileResponse(responses=page_responses, total_pages=len(pages))
+
+def _pdftotext_provider(content, mime_type, page):
+    if mime_type != PDF_MIME_TYPE:
+        return ""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
+        temp_file.write(content)
+    try:
+        return run_pdftotext(temp_file.name, first_page=page, last_page=page)
+    finally:
+        os.remove(temp_file.name)
+
+def create_file_transport(client_provider):
+    """설정(ocr_file_transport)에 따라 파일 주석 전송을 만듭니다: "vision"(기본) 또는 "local"(오프라인 대체)."""
+    transport_name = config_manager.get("ocr_file_transport")
+    if transport_name == "local":
+        app_logger.info("파일 주석 모드: 로컬 대체 전송 사용 (Vision API 호출 없음).")
+        return LocalFileTransport()
+    if transport_name != "vision":
+        raise OCRError(f"알 수 없는 파일 주석 전송: {transport_name}")
+    return VisionFileTransport(client_provider)
+
+def get_file_page_count(file_path, mime_type, pdf_page_counter):
+    """문서의 전체 페이지 수. PDF는 pdf_page_counter(pdfinfo)로, TIFF는 프레임 수로 셉니다."""
+    if mime_type == PDF_MIME_TYPE:
+        return pdf_page_counter(file_path)
+    with Image.open(file_path) as img:
+        return getattr(img, "n_frames", 1)
+
+def can_split_document(file_path):
+    """
+    문서를 조각마다 해당 페이지만 담은 작은 파일로 나눌 수 있는지 확인합니다.
+    TIFF는 PIL로 프레임을 나누므로 항상 가능하고, PDF는 poppler의 pdfseparate/pdfunite가 있어야 합니다.
+    """
+    if mime_type_for(file_path) == TIFF_MIME_TYPE:
+        return True
+    return bool(shutil.which("pdfseparate") and shutil.which("pdfunite"))
+
+def iter_file_chunks(file_path, total_pages, chunk_pages, work_dir):
+    """
+    문서를 chunk_pages 페이지씩 나눈 FileChunk를 차례로 반환하는 제너레이터.
+    조각마다 해당 페이지만 담은 작은 파일(PDF는 pdfseparate/pdfunite, TIFF는 PIL로 프레임 분할)을 만들어,
+    요청마다 전체 문서를 다시 보내지 않습니다. 나눌 수 없는 문서(can_split_document()가 False)이면 OCRError를 발생시킵니다.
+    """
+    mime_type = mime_type_for(file_path)
+    if not can_split_document(file_path):
+        raise OCRError(f"pdfseparate/pdfunite가 없어 PDF를 조각으로 나눌 수 없습니다: {file_path}")
+    chunk_pages = max(1, min(int(chunk_pages), FILE_ANNOTATION_MAX_PAGES))
+    for first_page in range(1, total_pages + 1, chunk_pages):
+        page_numbers = list(range(first_page, min(total_pages, first_page + chunk_pages - 1) + 1))
+        if mime_type == TIFF_MIME_TYPE:
+            content = _split_tiff_frames(file_path, page_numbers)
+        else:
+            content = _split_pdf_pages(file_path, page_numbers, work_dir)
+        yield FileChunk(page_numbers, content, mime_type, list(range(1, len(page_numbers) + 1)))
+
+def _split_tiff_frames(tiff_path, page_numbers):
+    """page_numbers 프레임만 담은 다중 페이지 TIFF 바이트를 만듭니다."""
+    try:
+        with Image.open(tiff_path) as img:
+            frames = []
+            for page in page_numbers:
+                img.seek(page - 1)
+                frames.append(img.copy())
+    except (OSError, EOFError) as e:
+        raise OCRError(f"TIFF {page_numbers[0]}~{page_numbers[-1]} 페이지 분할 실패: {e}")
+    # 흑백 스캔은 CCITT G4, 그 외에는 무손실 LZW로 압축해 업로드량을 줄임
+    compression = "group4" if frames[0].mode == "1" else "tiff_lzw"
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format="TIFF", save_all=True, append_images=frames[1:], compression=compression)
+    return buffer.getvalue()
+
+def _split_pdf_pages(pdf_path, page_numbers, work_dir):
+    """pdfseparate/pdfunite로 page_numbers 페이지만 담은 PDF 바이트를 만듭니다."""
+    pattern = os.path.join(work_dir, "page-%d.pdf")
+    page_files = [pattern % page for page in page_numbers]
+    chunk_path = os.path.join(work_dir, f"chunk-{page_numbers[0]}-{page_numbers[-1]}.pdf")
+    try:
+        subprocess.run(["pdfseparate", "-f", str(page_numbers[0]), "-l", str(page_numbers[-1]), pdf_path, pattern],
+                       capture_output=True, check=True)
+        if len(page_files) == 1:
+            chunk_path = page_files[0]
+        else:
+            subprocess.run(["pdfunite", *page_files, chunk_path], capture_output=True, check=True)
+        with open(chunk_path, 'rb') as f:
+            return f.read()
+    except subprocess.CalledProcessError as e:
+        raise OCRError(f"PDF {page_numbers[0]}~{page_numbers[-1]} 페이지 분할 실패: {e.stderr.decode('utf-8', errors='replace')}")
+    finally:
+        for path in set(page_files + [chunk_path]):
+            if os.path.exists(path):
+                os.remove(path)
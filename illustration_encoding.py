@@ -0,0 +1,164 @@
+"""
+EPUB에 넣을 일러스트 이미지의 재압축 정책(최대 해상도, JPEG/WebP 품질, 프로그레시브 인코딩, 메타데이터 제거)을 정의합니다.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+from logger import app_logger
+from config_manager import config_manager
+
+# 정책에서 선택할 수 있는 출력 형식 (설정값 -> (PIL 저장 형식, 파일 확장자))
+ILLUSTRATION_FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+
+# 일러스트 하나의 재압축 결과. recompressed가 False이면 원본이 더 작거나 같아 원본 파일(path)을 그대로 사용
+IllustrationEncodeResult = namedtuple("IllustrationEncodeResult",
+                                      ["path", "source_bytes", "output_bytes", "width", "height", "recompressed", "seconds"])
+
+class IllustrationEncoder:
+    """
+    EPUB용 일러스트 재압축 정책.
+    긴 변이 max_longest_side를 넘으면 축소하고, 지정한 형식·품질로 다시 인코딩합니다 (JPEG는 프로그레시브 선택 가능).
+    투명도가 있는 이미지를 JPEG로 내보낼 때는 투명도를 잃지 않도록 최적화된 PNG로 씁니다.
+    축소하지 않았는데 결과가 원본보다 작지 않으면 원본 파일을 그대로 사용합니다.
+    여러 스레드에서 동시에 encode_file()을 호출할 수 있으며, 작업 전체의 원본/결과 크기 통계를 모읍니다.
+    """
+    def __init__(self, image_format="jpeg", quality=85, max_longest_side=2048, progressive=True, strip_metadata=True):
+        """
+        Args:
+            image_format (str): "jpeg" 또는 "webp".
+            quality (int): JPEG/WebP 품질 (1~100).
+            max_longest_side (int, optional): 긴 변의 최대 픽셀 수. None이면 축소하지 않음.
+            progressive (bool): True이면 JPEG를 프로그레시브로 인코딩 (전자책 리더에서 먼저 흐리게 표시).
+            strip_metadata (bool): True이면 EXIF/XMP/주석을 제거 (EXIF 회전 정보는 픽셀에 적용한 뒤 제거). 색상 프로필(ICC)은 유지.
+        """
+        image_format = (image_format or "jpeg").lower()
+        if image_format == "jpg":
+            image_format = "jpeg"
+        if image_format not in ILLUSTRATION_FORMATS:
+            raise ValueError(f"지원하지 않는 일러스트 출력 형식: {image_format} (가능: {', '.join(ILLUSTRATION_FORMATS)})")
+        self.image_format = image_format
+        self.quality = max(1, min(int(quality), 100))
+        self.max_longest_side = max_longest_side
+        self.progressive = progressive
+        self.strip_metadata = strip_metadata
+        self._lock = threading.Lock()
+        self.files = 0
+        self.recompressed_files = 0
+        self.resized_files = 0
+        self.source_bytes = 0
+        self.output_bytes = 0
+        self.total_seconds = 0.0
+
+    def encode_file(self, source_path, output_path_base):
+        """
+        일러스트 파일 하나를 정책에 따라 재압축합니다.
+
+        Args:
+            source_path (str): 원본 이미지 파일 경로 (PIL이 읽을 수 있는 모든 형식).
+            output_path_base (str): 확장자를 뺀 출력 파일 경로. 형식에 맞는 확장자가 붙습니다.
+
+        Returns:
+            IllustrationEncodeResult: EPUB에 넣을 파일 경로와 크기 정보.
+        """
+        start_time = time.perf_counter()
+        source_bytes = os.path.getsize(source_path)
+        with Image.open(source_path) as source:
+            icc_profile = source.info.get("icc_profile")
+            exif = source.info.get("exif")
+            img = ImageOps.exif_transpose(source) if self.strip_metadata else source.copy()
+        if self.strip_metadata: # 저장 시 이미지 info에서 옮겨 쓰는 주석·XMP 등도 남기지 않음 (투명도 정보만 유지)
+            img.info = {key: value for key, value in img.info.items() if key == "transparency"}
+        resized = False
+        if self.max_longest_side and max(img.size) > self.max_longest_side:
+            img.thumbnail((self.max_longest_side, self.max_longest_side), Image.LANCZOS)
+            resized = True
+
+        pil_format, extension = ILLUSTRATION_FORMATS[self.image_format]
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+        save_options = {"optimize": True}
+        if pil_format == "JPEG" and has_alpha:
+            pil_format, extension = "PNG", ".png"
+        elif pil_format == "JPEG":
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            save_options.update(quality=self.quality, progressive=self.progressive)
+        else: # WEBP
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            save_options.update(quality=self.quality, method=4)
+        if icc_profile:
+            save_options["icc_profile"] = icc_profile
+        if exif and not self.strip_metadata and pil_format != "PNG":
+            save_options["exif"] = exif
+
+        output_path = output_path_base + extension
+        try:
+            img.save(output_path, pil_format, **save_options)
+        finally:
+            width, height = img.size
+            img.close()
+        output_bytes = os.path.getsize(output_path)
+        if not resized and output_bytes >= source_bytes: # 다시 인코딩해도 작아지지 않으면 원본 사용
+            os.remove(output_path)
+            result = IllustrationEncodeResult(source_path, source_bytes, source_bytes, width, height, False,
+                                              time.perf_counter() - start_time)
+        else:
+            result = IllustrationEncodeResult(output_path, source_bytes, output_bytes, width, height, True,
+                                              time.perf_counter() - start_time)
+        self._record(source_path, result, resized)
+        return result
+
+    def _record(self, source_path, result, resized):
+        with self._lock:
+            self.files += 1
+            self.recompressed_files += 1 if result.recompressed else 0
+            self.resized_files += 1 if resized else 0
+            self.source_bytes += result.source_bytes
+            self.output_bytes += result.output_bytes
+            self.total_seconds += result.seconds
+        if result.recompressed:
+            app_logger.debug(f"일러스트 재압축 '{source_path}': {result.source_bytes} -> {result.output_bytes} 바이트, "
+                             f"{result.width}x{result.height}{' (축소)' if resized else ''}, {result.seconds * 1000:.1f}ms")
+        else:
+            app_logger.debug(f"일러스트 재압축 생략 '{source_path}': 원본({result.source_bytes} 바이트)이 더 작음")
+
+    def log_summary(self):
+        """작업 전체의 일러스트 재압축 전후 크기를 로그에 남깁니다."""
+        with self._lock:
+            if not self.files:
+                return
+            saved_ratio = (1 - self.output_bytes / self.source_bytes) * 100 if self.source_bytes else 0.0
+            app_logger.info(f"일러스트 재압축 요약 ({self.describe()}): {self.files}개 중 {self.recompressed_files}개 재압축 "
+                            f"(축소 {self.resized_files}개), {self.source_bytes / 1024:.1f}KB -> {self.output_bytes / 1024:.1f}KB "
+                            f"({saved_ratio:.1f}% 절감), 작업 시간 {self.total_seconds:.2f}초")
+
+    def describe(self):
+        """정책 설정을 한 줄로 요약합니다."""
+        parts = [self.image_format.upper(), f"q={self.quality}"]
+        if self.max_longest_side:
+            parts.append(f"최대 {self.max_longest_side}px")
+        if self.progressive and self.image_format == "jpeg":
+            parts.append("프로그레시브")
+        if self.strip_metadata:
+            parts.append("메타데이터 제거")
+        return ", ".join(parts)
+
+def create_illustration_encoder():
+    """설정을 바탕으로 일러스트 재압축 정책을 만듭니다. illustration_recompress가 False이면 None."""
+    if not config_manager.get("illustration_recompress"):
+        return None
+    return IllustrationEncoder(
+        image_format=config_manager.get("illustration_format"),
+        quality=config_manager.get("illustration_quality"),
+        max_longest_side=config_manager.get("illustration_max_longest_side"),
+        progressive=config_manager.get("illustration_progressive"),
+        strip_metadata=config_manager.get("illustration_strip_metadata"),
+    )
+
+def create_illustration_executor():
+    """일러스트 재압축을 병렬로 실행할 스레드 풀을 만듭니다. 워커 수는 설정의 illustration_encode_workers (None이면 CPU 코어 수)."""
+    workers = max(1, int(config_manager.get("illustration_encode_workers") or os.cpu_count() or 1))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="illustration-encode")
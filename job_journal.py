@@ -0,0 +1,150 @@
+"""
+EPUB 생성 작업의 페이지별 OCR 결과를 출력 파일 옆의 추가 전용(append-only) 저널에 기록해,
+작업이 중간에 실패하거나 프로세스가 죽어도 같은 입력으로 다시 실행하면 끝난 페이지부터 이어서 처리하게 합니다.
+"""
+import hashlib
+import json
+import os
+import threading
+from logger import app_logger
+from config_manager import config_manager
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+
+def _text_checksum(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compute_job_fingerprint(input_source, illustration_pages=None, illustration_images=None):
+    """
+    저널을 재사용해도 되는 작업인지 판단할 지문(SHA-256 16진 문자열)을 계산합니다.
+    입력 파일(경로, 크기, 수정 시각)과 페이지 번호 배정 및 OCR 결과에 영향을 주는 값(일러스트 지정, 언어 힌트)을 합칩니다.
+    """
+    digest = hashlib.sha256()
+    paths = input_source if isinstance(input_source, (list, tuple)) else [input_source]
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    digest.update(repr(sorted(illustration_pages or [])).encode("utf-8"))
+    digest.update(repr(sorted(os.path.abspath(p) for p in illustration_images or [])).encode("utf-8"))
+    digest.update(repr(config_manager.get("ocr_language_hints") or []).encode("utf-8"))
+    return digest.hexdigest()
+
+class JobJournal:
+    """
+    페이지별 OCR 결과 저널 (JSON Lines).
+    첫 줄은 작업 지문이 담긴 머리글이고, 이후 한 줄에 한 페이지씩 {'page', 'text', 'sha256'}를 기록합니다.
+    기록할 때마다 flush와 fsync를 하므로 프로세스가 죽어도 기록된 페이지는 남습니다.
+    여러 스레드에서 동시에 record()를 호출할 수 있습니다.
+    """
+    def __init__(self, path, fingerprint):
+        """
+        저널을 엽니다. 지문이 같은 기존 저널이 있으면 끝난 페이지를 읽어 들이고(체크섬이 맞는 줄만),
+        잘린 마지막 줄 등 손상된 줄을 걸러 낸 내용으로 파일을 원자적으로 다시 씁니다. 지문이 다르면 새로 시작합니다.
+
+        Args:
+            path (str): 저널 파일 경로.
+            fingerprint (str): compute_job_fingerprint()로 계산한 작업 지문.
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self.completed_pages = self._load()
+        self.recorded = 0
+        self._rewrite()
+
+    def _load(self):
+        """기존 저널에서 {페이지 번호: 텍스트}를 읽습니다. 저널이 없거나 다른 작업의 것이면 빈 딕셔너리."""
+        if not os.path.exists(self.path):
+            return {}
+        pages = {}
+        corrupt_lines = 0
+        with open(self.path, "r", encoding="utf-8", errors="replace") as journal_file:
+            lines = journal_file.read().split("\n")
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            header = {}
+        if header.get("version") != JOURNAL_VERSION or header.get("fingerprint") != self.fingerprint:
+            app_logger.info(f"작업 저널 '{self.path}'는 다른 입력/설정의 작업이므로 새로 시작합니다.")
+            return {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                if _text_checksum(record["text"]) != record["sha256"]:
+                    raise ValueError("체크섬 불일치")
+            except (ValueError, KeyError, TypeError):
+                corrupt_lines += 1 # 기록 도중 중단된 마지막 줄 등
+                continue
+            pages[record["page"]] = record["text"]
+        app_logger.info(f"작업 저널 '{self.path}'에서 완료된 페이지 {len(pages)}개를 읽었습니다 (손상된 줄 {corrupt_lines}개 무시).")
+        return pages
+
+    def _rewrite(self):
+        """머리글과 유효한 기록만으로 저널을 다시 쓰고(임시 파일 → os.replace), 이후 기록을 위해 추가 모드로 엽니다."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as journal_file:
+            journal_file.write(json.dumps({"version": JOURNAL_VERSION, "fingerprint": self.fingerprint}) + "\n")
+            for page, text in sorted(self.completed_pages.items()):
+                journal_file.write(self._format_record(page, text))
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _format_record(page, text):
+        return json.dumps({"page": page, "text": text, "sha256": _text_checksum(text)}, ensure_ascii=False) + "\n"
+
+    def record(self, page, text):
+        """끝난 페이지의 OCR 텍스트를 저널에 추가하고 디스크에 반영합니다. 기록에 실패하면 경고만 남깁니다 (OCR은 계속)."""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.write(self._format_record(page, text))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.recorded += 1
+            except OSError as e:
+                app_logger.warning(f"작업 저널 기록 실패 ({page} 페이지, 이후 기록 중단): {e}")
+                self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def close(self):
+        """저널 파일을 닫습니다. 파일은 남겨 두어 다음 실행에서 이어서 처리할 수 있게 합니다."""
+        with self._lock:
+            self._close_file()
+
+    def discard(self):
+        """작업이 끝까지 성공했을 때 저널 파일을 삭제합니다."""
+        self.close()
+        try:
+            os.remove(self.path)
+            app_logger.info(f"작업 완료, 작업 저널 삭제: {self.path}")
+        except OSError as e:
+            app_logger.warning(f"작업 저널 삭제 실패 '{self.path}': {e}")
+
+def open_job_journal(output_path, input_source, illustration_pages=None, illustration_images=None):
+    """
+    출력 파일 옆(output_path + '.journal')의 작업 저널을 엽니다.
+    job_journal_enabled가 False이거나 저널을 열 수 없으면 None (저널 없이 처음부터 처리).
+    """
+    if not config_manager.get("job_journal_enabled"):
+        return None
+    path = f"{output_path}{JOURNAL_SUFFIX}"
+    try:
+        fingerprint = compute_job_fingerprint(input_source, illustration_pages, illustration_images)
+        return JobJournal(path, fingerprint)
+    except OSError as e:
+        app_logger.warning(f"작업 저널 '{path}'를 열 수 없어 저널 없이 진행합니다: {e}")
+        return None
@@ -1,6 +1,7 @@
 import sys
 import os
 import threading
+import multiprocessing
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QRadioButton, QFileDialog, QMessageBox,
@@ -22,6 +23,7 @@ class WorkerSignals(QObject):
     finished = pyqtSignal()
     error = pyqtSignal(str, str) # 오류 제목, 오류 메시지
     success = pyqtSignal(str, str) # 성공 제목, 성공 메시지
+    warning = pyqtSignal(str, str) # 일부 실패 제목, 메시지 (결과물은 만들어졌지만 실패한 항목이 있음)
     status_update = pyqtSignal(str)
 
 class EpubCreatorAppPyQt(QMainWindow):
@@ -245,6 +247,7 @@ class EpubCreatorAppPyQt(QMainWindow):
         self.worker_signals.finished.connect(self.on_processing_finished)
         self.worker_signals.error.connect(self.on_processing_error)
         self.worker_signals.success.connect(self.on_processing_success)
+        self.worker_signals.warning.connect(self.on_processing_warning)
         self.worker_signals.status_update.connect(self.status_label.setText)
 
         # 스레드 생성 및 시작
@@ -293,7 +296,13 @@ class EpubCreatorAppPyQt(QMainWindow):
                 is_image_folder_mode=is_image_folder_mode,
                 credentials_path=credentials_file
             )
-            if success:
+            run_summary = self.app_service.last_run_summary
+            if success and run_summary is not None and run_summary.failed_pages:
+                failed_pages = sorted(run_summary.failed_pages)
+                signals.warning.emit("일부 페이지 OCR 실패",
+                                     f"EPUB 파일 '{os.path.basename(output_path)}'을 만들었지만 {len(failed_pages)}개 페이지의 OCR에 "
+                                     f"실패해 본문을 비워 두었습니다: {failed_pages}\n자세한 오류는 로그를 확인하세요.")
+            elif success:
                 signals.success.emit("완료", f"EPUB 파일 '{os.path.basename(output_path)}' 생성이 완료되었습니다.")
         except (ConfigError, FileOperationError, OCRError, EpubProcessingError) as app_exc:
             signals.error.emit("처리 오류", app_exc.message)
@@ -319,7 +328,13 @@ class EpubCreatorAppPyQt(QMainWindow):
         QMessageBox.information(self, title, message)
         app_logger.info(message)
 
+    def on_processing_warning(self, title, message):
+        self.status_label.setText("EPUB 파일 생성 완료 (일부 페이지 OCR 실패)")
+        QMessageBox.warning(self, title, message)
+        app_logger.warning(f"{title}: {message}")
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # 패키징된 실행 파일에서 OCR 프로세스 풀 워커가 GUI를 다시 띄우지 않도록
     app = QApplication(sys.argv)
     
     # Material Design 테마 적용 (예: dark_teal)
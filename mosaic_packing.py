@@ -0,0 +1,161 @@
+"""
+작은 이미지(말풍선, 캡션 등의 잘라낸 조각) 여러 개를 캔버스 하나에 타일로 배치해 OCR 요청 하나로 보내고,
+응답의 단어 경계 상자를 원래 타일(이미지)로 되돌리는 모자이크 패킹을 정의합니다.
+"""
+import io
+from collections import namedtuple
+from google.cloud import vision
+from PIL import Image
+from config_manager import config_manager
+
+# 캔버스 안에서 타일 하나의 위치. item은 원본 OcrInputItem
+MosaicPlacement = namedtuple("MosaicPlacement", ["item", "x", "y", "width", "height"])
+
+# 요청 하나로 보낼 모자이크 배치 결과
+MosaicLayout = namedtuple("MosaicLayout", ["placements", "width", "height"])
+
+_BreakType = vision.TextAnnotation.DetectedBreak.BreakType
+# 단어 뒤에 붙일 구분 문자 (Vision의 detected_break 기준)
+_BREAK_TEXT = {
+    _BreakType.SPACE: " ",
+    _BreakType.SURE_SPACE: " ",
+    _BreakType.EOL_SURE_SPACE: "\n",
+    _BreakType.LINE_BREAK: "\n",
+    _BreakType.HYPHEN: "-\n",
+}
+
+class MosaicPacker:
+    """
+    작은 이미지를 선반(shelf) 방식으로 캔버스에 차례로 배치합니다.
+    타일 사이와 캔버스 가장자리에는 gap 픽셀의 여백을 두어, 서로 다른 타일의 글자가 한 단어로 합쳐지지 않게 합니다.
+    """
+    def __init__(self, canvas_size=2048, gap=40, max_tile_side=512, max_tiles=50):
+        """
+        Args:
+            canvas_size (int): 캔버스 한 변의 최대 픽셀 수.
+            gap (int): 타일 사이 여백 (픽셀).
+            max_tile_side (int): 모자이크로 보낼 이미지의 최대 가로/세로 픽셀 수. 이보다 큰 이미지는 단독으로 OCR.
+            max_tiles (int): 캔버스 하나에 넣을 최대 타일 수 (요청 하나가 실패했을 때 영향 범위 제한).
+        """
+        self.canvas_size = canvas_size
+        self.gap = gap
+        self.max_tile_side = min(max_tile_side, canvas_size - 2 * gap)
+        self.max_tiles = max(1, int(max_tiles))
+        self._reset()
+
+    def _reset(self):
+        self._placements = []
+        self._x = self.gap
+        self._y = self.gap
+        self._shelf_height = 0
+        self._used_width = 0
+
+    def accepts(self, size):
+        """이 크기(가로, 세로)의 이미지를 모자이크 타일로 보낼지 반환합니다."""
+        width, height = size
+        return 0 < width <= self.max_tile_side and 0 < height <= self.max_tile_side
+
+    def add(self, item, size):
+        """
+        현재 캔버스에 타일을 배치합니다.
+
+        Returns:
+            bool: 배치했으면 True, 캔버스가 가득 차 배치할 수 없으면 False (take()로 비운 뒤 다시 시도).
+        """
+        width, height = size
+        if len(self._placements) >= self.max_tiles:
+            return False
+        x, y = self._x, self._y
+        if x + width + self.gap > self.canvas_size: # 현재 선반에 자리가 없으면 다음 선반으로
+            x, y = self.gap, y + self._shelf_height + self.gap
+            if y + height + self.gap > self.canvas_size:
+                return False
+            self._shelf_height = 0
+        elif y + height + self.gap > self.canvas_size:
+            return False
+        self._placements.append(MosaicPlacement(item, x, y, width, height))
+        self._x, self._y = x + width + self.gap, y
+        self._shelf_height = max(self._shelf_height, height)
+        self._used_width = max(self._used_width, x + width + self.gap)
+        return True
+
+    def __len__(self):
+        return len(self._placements)
+
+    def take(self):
+        """지금까지 배치한 타일로 MosaicLayout을 만들고 캔버스를 비웁니다. 타일이 없으면 None."""
+        if not self._placements:
+            return None
+        layout = MosaicLayout(tuple(self._placements), self._used_width, self._y + self._shelf_height + self.gap)
+        self._reset()
+        return layout
+
+def render_mosaic(layout):
+    """
+    배치대로 타일 이미지를 흰 그레이스케일 캔버스에 붙여 PNG 바이트로 인코딩합니다.
+    타일 이미지는 이 시점에 디코딩하고 붙인 뒤 바로 해제합니다.
+    좌표가 응답의 경계 상자와 그대로 대응해야 하므로 인코딩 정책의 축소는 적용하지 않습니다.
+    """
+    canvas = Image.new("L", (layout.width, layout.height), 255)
+    for placement in layout.placements:
+        try:
+            tile = placement.item.load_image()
+            if tile.mode in ("RGBA", "LA", "P"): # 투명 배경은 흰색으로 합성
+                rgba = tile.convert("RGBA")
+                background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+                tile = Image.alpha_composite(background, rgba)
+            canvas.paste(tile.convert("L"), (placement.x, placement.y))
+        finally:
+            placement.item.release()
+    buffer = io.BytesIO()
+    canvas.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def map_words_to_tiles(full_text_annotation, layout):
+    """
+    document_text_detection 응답의 단어들을 경계 상자 중심이 들어 있는 타일에 나눠 타일별 텍스트를 만듭니다.
+
+    Returns:
+        dict: {item.id: 텍스트}. 단어가 없는 타일은 빈 문자열.
+    """
+    pieces = {placement.item.id: [] for placement in layout.placements}
+    for page in full_text_annotation.pages:
+        for block in page.blocks:
+            for paragraph in block.paragraphs:
+                paragraph_tiles = set()
+                for word in paragraph.words:
+                    vertices = word.bounding_box.vertices
+                    if not vertices:
+                        continue
+                    center_x = sum(vertex.x for vertex in vertices) / len(vertices)
+                    center_y = sum(vertex.y for vertex in vertices) / len(vertices)
+                    placement = _placement_at(layout, center_x, center_y)
+                    if placement is None: # 여백에 걸친 단어 (보통 없음)
+                        continue
+                    tile_pieces = pieces[placement.item.id]
+                    if tile_pieces and placement.item.id not in paragraph_tiles and not tile_pieces[-1].endswith("\n"):
+                        if tile_pieces[-1] == " ": # 앞 문단 끝의 공백 대신 줄바꿈
+                            tile_pieces.pop()
+                        tile_pieces.append("\n") # 같은 타일의 새 문단
+                    paragraph_tiles.add(placement.item.id)
+                    for symbol in word.symbols:
+                        tile_pieces.append(symbol.text)
+                        tile_pieces.append(_BREAK_TEXT.get(symbol.property.detected_break.type_, ""))
+    return {item_id: "".join(tile_pieces).strip() for item_id, tile_pieces in pieces.items()}
+
+def _placement_at(layout, x, y):
+    for placement in layout.placements:
+        if placement.x <= x < placement.x + placement.width and placement.y <= y < placement.y + placement.height:
+            return placement
+    return None
+
+def create_mosaic_packer():
+    """설정을 바탕으로 모자이크 패커를 만듭니다. ocr_mosaic_enabled가 False이면 None."""
+    if not config_manager.get("ocr_mosaic_enabled"):
+        return None
+    return MosaicPacker(
+        canvas_size=config_manager.get("ocr_mosaic_canvas_size"),
+        gap=config_manager.get("ocr_mosaic_gap"),
+        max_tile_side=config_manager.get("ocr_mosaic_max_tile_side"),
+        max_tiles=config_manager.get("ocr_mosaic_max_tiles"),
+    )
@@ -0,0 +1,135 @@
+"""
+Vision API로 보낸 이미지 바이트를 기준으로 OCR 결과를 저장하는 영구 캐시(SQLite)를 정의합니다.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from logger import app_logger
+from config_manager import config_manager
+
+class OcrResultCache:
+    """
+    콘텐츠 주소 기반 OCR 결과 캐시.
+    키는 Vision API로 보낸 이미지 바이트, 기능 유형(feature), 언어 힌트를 합친 SHA-256 해시이며,
+    저장된 텍스트의 총 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+    여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+    def __init__(self, db_path, max_bytes):
+        """
+        Args:
+            db_path (str): SQLite 데이터베이스 파일 경로.
+            max_bytes (int): 캐시에 보관할 텍스트의 최대 총 바이트 수.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_results_last_access ON ocr_results(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        app_logger.info(f"OCR 결과 캐시 열림: {db_path} (현재 {self._total_bytes} 바이트, 최대 {max_bytes} 바이트)")
+
+    @staticmethod
+    def make_key(image_data, feature_type, language_hints=None):
+        """요청 바이트, 기능 유형, 언어 힌트로 캐시 키(SHA-256 16진 문자열)를 만듭니다."""
+        digest = hashlib.sha256()
+        digest.update(feature_type.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(",".join(language_hints or []).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(image_data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """키에 해당하는 OCR 텍스트를 반환합니다. 없으면 None. 조회된 항목의 최근 사용 시각을 갱신합니다."""
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT text FROM ocr_results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._conn.execute("UPDATE ocr_results SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                app_logger.warning(f"OCR 캐시 조회 실패 (캐시 미스로 처리): {e}")
+                self.misses += 1
+                return None
+
+    def put(self, key, text):
+        """OCR 텍스트를 저장하고, 총 크기가 최대치를 넘으면 오래된 항목부터 삭제합니다."""
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT size FROM ocr_results WHERE key = ?", (key,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO ocr_results (key, text, size, last_access) VALUES (?, ?, ?, ?)",
+                                   (key, text, size, time.time()))
+                self._total_bytes += size - (row[0] if row else 0)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                app_logger.warning(f"OCR 캐시 저장 실패 (무시): {e}")
+
+    def _evict(self):
+        # 호출자가 self._lock을 보유하고 있어야 함
+        evicted = 0
+        cursor = self._conn.execute("SELECT key, size FROM ocr_results ORDER BY last_access ASC")
+        keys_to_delete = []
+        for key, size in cursor:
+            if self._total_bytes <= self.max_bytes:
+                break
+            keys_to_delete.append((key,))
+            self._total_bytes -= size
+            evicted += 1
+        self._conn.executemany("DELETE FROM ocr_results WHERE key = ?", keys_to_delete)
+        app_logger.info(f"OCR 캐시 LRU 정리: {evicted}개 항목 삭제 (현재 {self._total_bytes} 바이트)")
+
+    def snapshot(self):
+        """현재까지의 (적중, 미스) 횟수를 반환합니다. log_run_summary()에 넘겨 실행 단위 통계를 계산할 때 사용합니다."""
+        with self._lock:
+            return (self.hits, self.misses)
+
+    def log_run_summary(self, start_snapshot):
+        """start_snapshot 이후의 적중/미스 횟수를 로그에 남깁니다."""
+        hits, misses = self.snapshot()
+        run_hits = hits - start_snapshot[0]
+        run_misses = misses - start_snapshot[1]
+        total = run_hits + run_misses
+        hit_rate = (run_hits / total * 100) if total else 0.0
+        app_logger.info(f"OCR 캐시 요약: 적중 {run_hits}회, 미스 {run_misses}회 (적중률 {hit_rate:.1f}%)")
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+def get_ocr_cache():
+    """
+    설정에 따라 애플리케이션 전체에서 공유하는 OcrResultCache를 반환합니다.
+    ocr_cache_enabled가 False이거나 캐시를 열 수 없으면 None을 반환합니다.
+    """
+    global _cache_instance
+    if not config_manager.get("ocr_cache_enabled"):
+        return None
+    with _cache_lock:
+        if _cache_instance is None:
+            # 기본 위치는 config.json과 같은 폴더 (실행 위치에 따라 캐시가 달라지지 않도록)
+            db_path = config_manager.get("ocr_cache_path") or os.path.join(
+                os.path.dirname(config_manager.config_file_path), 'cache', 'ocr_cache.sqlite3')
+            try:
+                _cache_instance = OcrResultCache(db_path, int(config_manager.get("ocr_cache_max_mb")) * 1024 * 1024)
+            except (sqlite3.Error, OSError) as e:
+                app_logger.error(f"OCR 결과 캐시를 열 수 없습니다 ({db_path}). 캐시 없이 진행합니다: {e}", exc_info=True)
+                return None
+        return _cache_instance
@@ -0,0 +1,198 @@
+"""
+Vision API로 업로드할 페이지 이미지의 인코딩 정책(해상도 축소, 그레이스케일 JPEG/WebP/PNG, 이진화, 최대 크기)을 정의합니다.
+"""
+import io
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+import cv2
+from PIL import Image
+from logger import app_logger
+from config_manager import config_manager
+
+# 정책에서 선택할 수 있는 인코딩 형식 (설정값 -> PIL 저장 형식)
+ENCODING_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+
+# 페이지 하나의 인코딩 결과. data는 인코딩된 바이트 (프로세스 간 전달 시에는 공유 메모리 핸들일 수 있음)
+EncodeResult = namedtuple("EncodeResult", ["data", "size", "width", "height", "quality", "step_downs", "seconds"])
+
+class EncodingPolicy:
+    """
+    OCR 업로드용 인코딩 정책.
+    페이지를 그레이스케일로 변환하고, 목표 DPI 또는 긴 변 길이에 맞게 축소한 뒤 (선택적으로 이진화해) 지정한 형식으로 인코딩합니다.
+    결과가 max_payload_bytes를 넘으면 품질을 낮추고, 그래도 넘으면 해상도를 줄여 가며 다시 인코딩합니다 (단계 축소).
+    작업(job) 단위로 생성하며, 페이지별 바이트 수와 인코딩 시간을 로그에 남기고 작업 전체 통계를 모읍니다.
+    """
+    def __init__(self, image_format="png", quality=85, target_dpi=None, source_dpi=200, max_longest_side=None,
+                 binarize=False, max_payload_bytes=None, min_quality=40, quality_step=15, scale_step=0.8, min_longest_side=800):
+        """
+        Args:
+            image_format (str): "png", "jpeg" 또는 "webp".
+            quality (int): JPEG/WebP 품질 (1~100). PNG에는 사용하지 않음.
+            target_dpi (int, optional): 이 DPI로 축소. 이미지에 DPI 정보가 없으면 source_dpi로 렌더링됐다고 가정.
+            source_dpi (int): DPI 정보가 없는 이미지의 원본 DPI (pdf2image 렌더링 DPI).
+            max_longest_side (int, optional): 긴 변의 최대 픽셀 수.
+            binarize (bool): True이면 Otsu 이진화 후 인코딩.
+            max_payload_bytes (int, optional): 인코딩 결과의 최대 바이트 수. 넘으면 단계적으로 축소.
+            min_quality (int): 단계 축소 시 내려갈 수 있는 최저 품질.
+            quality_step (int): 단계 축소 시 한 번에 낮출 품질.
+            scale_step (float): 단계 축소 시 한 번에 곱할 해상도 비율.
+            min_longest_side (int): 단계 축소 시 긴 변이 이보다 작아지지 않음 (글자 인식 한계).
+        """
+        image_format = (image_format or "png").lower()
+        if image_format == "jpg":
+            image_format = "jpeg"
+        if image_format not in ENCODING_FORMATS:
+            raise ValueError(f"지원하지 않는 OCR 인코딩 형식: {image_format} (가능: {', '.join(ENCODING_FORMATS)})")
+        self.image_format = image_format
+        self.quality = max(1, min(int(quality), 100))
+        self.target_dpi = target_dpi
+        self.source_dpi = source_dpi
+        self.max_longest_side = max_longest_side
+        self.binarize = binarize
+        self.max_payload_bytes = max_payload_bytes
+        self.min_quality = min(int(min_quality), self.quality)
+        self.quality_step = max(1, int(quality_step))
+        self.scale_step = scale_step
+        self.min_longest_side = min_longest_side
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.total_bytes = 0
+        self.total_seconds = 0.0
+        self.stepped_down_pages = 0
+        self.oversized_pages = 0
+
+    def __getstate__(self):
+        # 프로세스 풀 워커로 보낼 때 잠금은 제외 (통계는 부모 프로세스에서 record()로 모음)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def encode(self, page, label=None):
+        """
+        페이지를 정책에 따라 인코딩해 Vision API로 보낼 바이트를 반환합니다.
+
+        Args:
+            page (PIL.Image.Image): 페이지 이미지.
+            label: 로그에 표시할 페이지 식별자.
+
+        Returns:
+            bytes: 인코딩된 이미지 데이터.
+        """
+        result = self.encode_page(page)
+        self.record(label, result)
+        return result.data
+
+    def encode_page(self, page):
+        """
+        페이지를 인코딩만 하고 통계는 기록하지 않습니다. 프로세스 풀 워커에서 호출하며, 결과는 record()로 기록합니다.
+
+        Returns:
+            EncodeResult: 인코딩 결과.
+        """
+        start_time = time.perf_counter()
+        image = self._prepare(page)
+        quality = self.quality
+        step_downs = 0
+        data = self._save(image, quality)
+        while self.max_payload_bytes and len(data) > self.max_payload_bytes:
+            if self.image_format != "png" and quality > self.min_quality:
+                quality = max(self.min_quality, quality - self.quality_step)
+            elif max(image.size) * self.scale_step >= self.min_longest_side:
+                image = _resize(image, self.scale_step)
+            else:
+                break
+            step_downs += 1
+            data = self._save(image, quality)
+        return EncodeResult(data, len(data), image.size[0], image.size[1], quality, step_downs,
+                            time.perf_counter() - start_time)
+
+    def record(self, label, result):
+        """인코딩 결과(EncodeResult)를 작업 통계에 반영하고, 선택된 크기와 인코딩 시간을 로그에 남깁니다."""
+        oversized = bool(self.max_payload_bytes and result.size > self.max_payload_bytes)
+        with self._lock:
+            self.pages += 1
+            self.total_bytes += result.size
+            self.total_seconds += result.seconds
+            self.stepped_down_pages += 1 if result.step_downs else 0
+            self.oversized_pages += 1 if oversized else 0
+        description = (f"{self.image_format.upper()}" + (f" q={result.quality}" if self.image_format != "png" else "")
+                       + f" {result.width}x{result.height}, {result.size} 바이트, {result.seconds * 1000:.1f}ms")
+        if result.step_downs:
+            description += f" (최대 크기 초과로 {result.step_downs}단계 축소)"
+        if oversized:
+            app_logger.warning(f"{label} OCR 인코딩 결과가 최대 크기({self.max_payload_bytes} 바이트)를 넘습니다: {description}")
+        else:
+            app_logger.info(f"{label} OCR 인코딩: {description}")
+
+    def log_summary(self):
+        """작업 전체의 페이지당 평균 바이트 수와 인코딩 시간을 로그에 남깁니다."""
+        with self._lock:
+            if not self.pages:
+                return
+            app_logger.info(f"OCR 인코딩 요약 ({self.describe()}): {self.pages}페이지, "
+                            f"페이지당 평균 {self.total_bytes // self.pages} 바이트, {self.total_seconds / self.pages * 1000:.1f}ms, "
+                            f"단계 축소 {self.stepped_down_pages}페이지, 최대 크기 초과 {self.oversized_pages}페이지")
+
+    def describe(self):
+        """정책 설정을 한 줄로 요약합니다."""
+        parts = [self.image_format.upper()]
+        if self.image_format != "png":
+            parts.append(f"q={self.quality}")
+        if self.target_dpi:
+            parts.append(f"{self.target_dpi}dpi")
+        if self.max_longest_side:
+            parts.append(f"긴 변 {self.max_longest_side}px")
+        if self.binarize:
+            parts.append("이진화")
+        if self.max_payload_bytes:
+            parts.append(f"최대 {self.max_payload_bytes} 바이트")
+        return ", ".join(parts)
+
+    def _prepare(self, page):
+        # 그레이스케일 변환 후 목표 해상도로 축소, 필요하면 이진화
+        gray = cv2.cvtColor(np.array(page.convert("RGB")), cv2.COLOR_RGB2GRAY)
+        image = Image.fromarray(gray)
+        scale = 1.0
+        if self.target_dpi:
+            source_dpi = page.info.get("dpi", (self.source_dpi,))[0] or self.source_dpi
+            scale = min(scale, self.target_dpi / float(source_dpi))
+        if self.max_longest_side:
+            scale = min(scale, self.max_longest_side / float(max(image.size)))
+        if scale < 1.0:
+            image = _resize(image, scale)
+        if self.binarize:
+            _, binary = cv2.threshold(np.array(image), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            image = Image.fromarray(binary)
+        return image
+
+    def _save(self, image, quality):
+        buffer = io.BytesIO()
+        save_format = ENCODING_FORMATS[self.image_format]
+        if save_format == "PNG":
+            image.save(buffer, format=save_format, optimize=False)
+        else:
+            image.save(buffer, format=save_format, quality=quality)
+        return buffer.getvalue()
+
+def _resize(image, scale):
+    new_size = (max(1, int(image.size[0] * scale)), max(1, int(image.size[1] * scale)))
+    return image.resize(new_size, Image.LANCZOS)
+
+def create_encoding_policy():
+    """설정을 바탕으로 작업 하나에 사용할 OCR 인코딩 정책을 만듭니다."""
+    max_payload_kb = config_manager.get("ocr_max_payload_kb")
+    return EncodingPolicy(
+        image_format=config_manager.get("ocr_encode_format"),
+        quality=config_manager.get("ocr_encode_quality"),
+        target_dpi=config_manager.get("ocr_target_dpi"),
+        source_dpi=config_manager.get("pdf_render_dpi"),
+        max_longest_side=config_manager.get("ocr_max_longest_side"),
+        binarize=config_manager.get("ocr_binarize"),
+        max_payload_bytes=int(max_payload_kb) * 1024 if max_payload_kb else None,
+    )
@@ -1,20 +1,137 @@
 import os
 import io
+import asyncio
+import hashlib
+import queue
+import tempfile
+import threading
+import time
 import numpy as np
 from PIL import Image
 import cv2
 from google.cloud import vision
-from pdf2image import convert_from_path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from google.api_core import exceptions as google_exceptions
+from pdf2image import convert_from_path, pdfinfo_from_path
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from logger import app_logger # 로거 임포트
 from config_manager import config_manager # ConfigManager 임포트
-from exceptions import OCRError, FileOperationError # 사용자 정의 예외 임포트
-from dtos import OcrInputItem # OcrInputItem DTO 임포트
+from exceptions import OCRError, FileOperationError, OCRCircuitOpenError, OCRDeadlineExceededError # 사용자 정의 예외 임포트
+from dtos import OcrInputItem, PageDataSource, FolderRunSummary # DTO 임포트
+from concurrency_limiter import create_ocr_limiter # 적응형 동시성 제한기
+from retry_policy import create_retry_policy, is_retryable_error # 재시도/서킷 브레이커 정책
+from ocr_cache import OcrResultCache, get_ocr_cache # 영구 OCR 결과 캐시
+from ocr_encoding import create_encoding_policy # 업로드용 인코딩 정책
+from file_annotation import (FILE_ANNOTATION_FEATURE, can_split_document, create_file_transport, get_file_page_count,
+                             iter_file_chunks, mime_type_for) # PDF/TIFF 파일 주석(래스터화 없는) 경로
+from pipeline_stages import (StageUtilization, create_cpu_executor, encode_item_in_process,
+                             import_payload, discard_payload, OrderedPageWriter) # CPU 단계(프로세스 풀)/네트워크 단계 분리, 출력 재정렬
+from page_analysis import PageInkStats, create_blank_page_detector # OCR 전 빈 페이지 감지
+from mosaic_packing import create_mosaic_packer, map_words_to_tiles, render_mosaic # 작은 이미지 모자이크 패킹
+
+# 작업 전체를 중단해야 하는 오류 (개별 페이지 오류로 기록하지 않고 그대로 전파)
+JOB_ABORT_ERRORS = (OCRCircuitOpenError, OCRDeadlineExceededError)
+
+# Vision API에 요청하는 기능 유형 (OCR 캐시 키에 포함)
+TEXT_DETECTION_FEATURE = "TEXT_DETECTION"
+
+# 모자이크로 OCR한 타일의 캐시 키에 넣는 기능 유형 (캔버스의 DOCUMENT_TEXT_DETECTION 결과를 타일별로 나눈 텍스트)
+MOSAIC_TILE_FEATURE = "DOCUMENT_TEXT_DETECTION_MOSAIC_TILE"
+
+# 폴더 일괄 처리 대상 이미지 확장자
+SUPPORTED_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif')
 
 # The environment variable for Google Vision API credentials
 # will be set by the GUI (ocr_gui.py) or should be set in the system environment.
 # os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = r'' # 사용자에게 GUI를 통해 입력받도록 변경됨
 
+class VisionClientProvider:
+    """
+    Google Vision API 클라이언트를 재사용하기 위한 스레드 안전 클라이언트 풀.
+    클라이언트(및 gRPC 채널)를 페이지마다 새로 만들지 않고 소수의 장수명 클라이언트를 라운드 로빈으로 공유합니다.
+    GOOGLE_APPLICATION_CREDENTIALS 경로가 바뀌면 다음 요청 시 풀을 다시 만듭니다.
+    """
+    def __init__(self, pool_size=None, client_factory=None, async_client_factory=None):
+        """
+        Args:
+            pool_size (int, optional): 유지할 클라이언트 수. None이면 설정의 vision_client_pool_size 사용.
+            client_factory (callable, optional): 인자 없이 클라이언트를 생성하는 함수.
+                                                 테스트 시 가짜 클라이언트를 주입할 때 사용. 기본값은 vision.ImageAnnotatorClient.
+            async_client_factory (callable, optional): 인자 없이 비동기 클라이언트를 생성하는 함수.
+                                                       기본값은 vision.ImageAnnotatorAsyncClient.
+        """
+        self._lock = threading.Lock()
+        self._pool_size = pool_size
+        self._client_factory = client_factory or vision.ImageAnnotatorClient
+        self._async_client_factory = async_client_factory or vision.ImageAnnotatorAsyncClient
+        self._clients = []
+        self._next_index = 0
+        self._credentials_path = None
+
+    def _target_pool_size(self):
+        size = self._pool_size if self._pool_size is not None else config_manager.get("vision_client_pool_size")
+        return max(1, int(size or 1))
+
+    def get_client(self):
+        """풀에서 클라이언트를 하나 반환합니다. 풀이 비어 있거나 인증 정보가 바뀌었으면 새로 생성합니다."""
+        credentials_path = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+        with self._lock:
+            if self._clients and credentials_path != self._credentials_path:
+                app_logger.info(f"인증 정보 경로 변경 감지 ({self._credentials_path} -> {credentials_path}). Vision 클라이언트 풀 재생성.")
+                self._close_clients()
+            if not self._clients:
+                self._credentials_path = credentials_path
+            if len(self._clients) < self._target_pool_size():
+                app_logger.debug(f"Google Vision API 클라이언트 생성 ({len(self._clients) + 1}/{self._target_pool_size()}).")
+                client = self._client_factory()
+                self._clients.append(client)
+                return client
+            client = self._clients[self._next_index % len(self._clients)]
+            self._next_index += 1
+            return client
+
+    def reload(self):
+        """기존 클라이언트를 모두 닫습니다. 다음 get_client() 호출 시 현재 인증 정보로 새로 생성됩니다."""
+        with self._lock:
+            self._close_clients()
+        app_logger.info("Vision 클라이언트 풀 초기화됨. 다음 요청 시 새 인증 정보로 클라이언트를 생성합니다.")
+
+    def set_client_factory(self, client_factory):
+        """클라이언트 생성 함수를 교체하고 풀을 비웁니다. None이면 기본 vision.ImageAnnotatorClient로 복원합니다."""
+        with self._lock:
+            self._close_clients()
+            self._client_factory = client_factory or vision.ImageAnnotatorClient
+
+    def set_async_client_factory(self, async_client_factory):
+        """비동기 클라이언트 생성 함수를 교체합니다. None이면 기본 vision.ImageAnnotatorAsyncClient로 복원합니다."""
+        with self._lock:
+            self._async_client_factory = async_client_factory or vision.ImageAnnotatorAsyncClient
+
+    def create_async_client(self):
+        """
+        새 비동기 클라이언트를 생성합니다.
+        비동기 클라이언트의 채널은 생성된 이벤트 루프에 묶이므로 풀에 보관하지 않고 실행(루프)마다 하나씩 만듭니다.
+        """
+        with self._lock:
+            factory = self._async_client_factory
+        app_logger.debug("Google Vision API 비동기 클라이언트 생성.")
+        return factory()
+
+    def _close_clients(self):
+        # 호출자가 self._lock을 보유하고 있어야 함
+        for client in self._clients:
+            transport = getattr(client, "transport", None)
+            try:
+                if transport is not None and hasattr(transport, "close"):
+                    transport.close()
+            except Exception as e:
+                app_logger.warning(f"Vision 클라이언트 종료 중 오류 (무시): {e}")
+        self._clients = []
+        self._next_index = 0
+        self._credentials_path = None
+
+# 애플리케이션 전체에서 공유하는 Vision 클라이언트 풀
+vision_client_provider = VisionClientProvider()
+
 def detect_text_from_image(image_data):
     """
     Detects text in an image file using Google Vision API and returns it.
@@ -26,11 +143,11 @@ def detect_text_from_image(image_data):
         str: The detected text.
     """
     try:
-        app_logger.debug("Google Vision API 클라이언트 생성 시도.")
-        client = vision.ImageAnnotatorClient()
+        client = vision_client_provider.get_client()
         image = vision.Image(content=image_data)
         app_logger.debug("텍스트 감지 수행 중...")
-        response = client.text_detection(image=image)
+        response = client.text_detection(image=image, **_image_context_kwargs())
+        _raise_for_response_error(response.error) # 이미지별 오류는 예외가 아니라 응답의 error로 옴
         texts = response.text_annotations
 
         if texts:
@@ -39,12 +156,117 @@ def detect_text_from_image(image_data):
         else:
             app_logger.info("감지된 텍스트 없음.")
             return ""
-    except vision.exceptions.GoogleCloudError as e: # Google Cloud 관련 명시적 예외 처리
-        app_logger.error(f"Google Vision API 호출 중 GoogleCloudError 발생: {e}", exc_info=True)
-        raise OCRError(f"Google Vision API 오류: {e}")
+    except OCRError:
+        raise
+    except google_exceptions.GoogleAPICallError as e: # Google Cloud 관련 명시적 예외 처리
+        app_logger.error(f"Google Vision API 호출 중 GoogleAPICallError 발생: {e}", exc_info=True)
+        raise OCRError(f"Google Vision API 오류: {e}") from e
     except Exception as e:
         app_logger.error(f"Google Vision API 텍스트 감지 중 오류: {e}", exc_info=True)
-        raise OCRError(f"OCR 처리 중 예상치 못한 오류 발생: {e}")
+        raise OCRError(f"OCR 처리 중 예상치 못한 오류 발생: {e}") from e
+
+def detect_document_text_from_image(image_data):
+    """
+    DOCUMENT_TEXT_DETECTION으로 이미지의 텍스트를 감지해 단어 경계 상자를 포함한 full_text_annotation을 반환합니다.
+    모자이크 캔버스처럼 응답 좌표로 텍스트를 나눠야 할 때 사용합니다.
+
+    Returns:
+        vision.TextAnnotation: 페이지/블록/문단/단어/글자 구조와 경계 상자.
+    """
+    client = vision_client_provider.get_client()
+    response = client.document_text_detection(image=vision.Image(content=image_data), **_image_context_kwargs())
+    _raise_for_response_error(response.error)
+    return response.full_text_annotation
+
+def _image_context_kwargs():
+    """설정에 언어 힌트가 있으면 요청에 추가할 image_context 인자를 반환합니다."""
+    language_hints = config_manager.get("ocr_language_hints")
+    if not language_hints:
+        return {}
+    return {'image_context': vision.ImageContext(language_hints=list(language_hints))}
+
+def _build_text_detection_request(image_data):
+    """이미지 바이트로 TEXT_DETECTION AnnotateImageRequest를 만듭니다."""
+    return vision.AnnotateImageRequest(image=vision.Image(content=image_data),
+                                       features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)],
+                                       **_image_context_kwargs())
+
+def _cache_key_for(image_data):
+    """요청 바이트와 기능 유형, 언어 힌트로 OCR 캐시 키를 만듭니다."""
+    return OcrResultCache.make_key(image_data, TEXT_DETECTION_FEATURE, config_manager.get("ocr_language_hints"))
+
+def _text_from_annotate_response(response):
+    """
+    AnnotateImageResponse에서 전체 텍스트를 꺼냅니다. 응답에 오류가 있으면 OCRError를 발생시킵니다.
+    text_annotations가 없으면 (파일 주석/DOCUMENT_TEXT_DETECTION 응답) full_text_annotation의 텍스트를 사용합니다.
+    """
+    _raise_for_response_error(response.error)
+    if response.text_annotations:
+        return response.text_annotations[0].description
+    return response.full_text_annotation.text if response.full_text_annotation else ""
+
+def _raise_for_response_error(error):
+    """응답의 error(google.rpc.Status)가 채워져 있으면 OCRError를 발생시킵니다."""
+    if error.message:
+        # 원본 상태 코드를 예외 원인으로 남겨 과부하 오류 여부를 판별할 수 있게 함
+        raise OCRError(f"Google Vision API 오류 (code={error.code}): {error.message}") \
+            from google_exceptions.from_grpc_status(error.code, error.message)
+
+def detect_text_from_images_batch(image_data_list):
+    """
+    Detects text in several images with a single batch_annotate_images call.
+    A failure reported for one image does not fail the others.
+
+    Args:
+        image_data_list (list[bytes]): The image data of each image, at most the API's per-request image limit.
+
+    Returns:
+        list: One entry per input image, in the same order. Each entry is either the detected text (str)
+              or an OCRError describing why that image failed.
+    """
+    try:
+        client = vision_client_provider.get_client()
+        requests = [_build_text_detection_request(image_data) for image_data in image_data_list]
+        app_logger.debug(f"batch_annotate_images 요청 전송 (이미지 {len(requests)}개).")
+        batch_response = client.batch_annotate_images(requests=requests)
+    except Exception as e:
+        app_logger.error(f"batch_annotate_images 호출 중 오류: {e}", exc_info=True)
+        raise OCRError(f"Google Vision API 배치 요청 오류: {e}") from e
+
+    outcomes = []
+    for response in batch_response.responses:
+        try:
+            outcomes.append(_text_from_annotate_response(response))
+        except OCRError as e:
+            outcomes.append(e)
+    if len(outcomes) != len(image_data_list):
+        raise OCRError(f"batch_annotate_images 응답 수 불일치: 요청 {len(image_data_list)}개, 응답 {len(outcomes)}개")
+    return outcomes
+
+def split_into_batches(encoded_items, max_images, max_bytes):
+    """
+    (식별자, 이미지 바이트) 항목들을 이미지 수와 누적 바이트 수 제한에 맞춰 배치로 나눕니다.
+    단일 항목이 max_bytes를 넘으면 그 항목 하나만으로 배치를 구성합니다.
+
+    Args:
+        encoded_items (Iterable[tuple]): (id, bytes) 튜플들. 순서는 유지됩니다.
+        max_images (int): 배치당 최대 이미지 수.
+        max_bytes (int): 배치당 최대 누적 바이트 수.
+
+    Yields:
+        list[tuple]: (id, bytes) 튜플 리스트 하나가 하나의 배치.
+    """
+    batch = []
+    batch_bytes = 0
+    for identifier, image_data in encoded_items:
+        if batch and (len(batch) >= max_images or batch_bytes + len(image_data) > max_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append((identifier, image_data))
+        batch_bytes += len(image_data)
+    if batch:
+        yield batch
 
 def preprocess_image(image):
     """
@@ -67,104 +289,491 @@ def preprocess_image(image):
         app_logger.error(f"이미지 전처리 중 오류: {e}", exc_info=True)
         raise OCRError(f"이미지 전처리 중 오류: {e}")
 
-def process_page(page, page_number):
+def get_pdf_page_count(pdf_path):
+    """PDF의 전체 페이지 수를 반환합니다 (poppler의 pdfinfo 사용)."""
+    return int(pdfinfo_from_path(pdf_path)["Pages"])
+
+def _page_windows(page_numbers, window_size):
+    """정렬된 페이지 번호들을 연속 구간별로 묶고, 각 구간을 window_size 페이지 이하의 (첫 페이지, 마지막 페이지)로 나눕니다."""
+    first_page = last_page = None
+    for page_number in page_numbers:
+        if first_page is not None and page_number == last_page + 1 and page_number - first_page < window_size:
+            last_page = page_number
+            continue
+        if first_page is not None:
+            yield first_page, last_page
+        first_page = last_page = page_number
+    if first_page is not None:
+        yield first_page, last_page
+
+def iter_pdf_pages(pdf_path, window_size=None, queue_size=None, pages=None, **convert_kwargs):
     """
-    Processes a single page of PDF: converts to image, preprocesses, performs OCR, and returns the extracted text.
-    
+    PDF를 window_size 페이지씩 래스터화하면서 페이지를 하나씩 반환하는 제너레이터.
+    래스터화는 백그라운드 스레드에서 진행되며, 크기가 제한된 큐로 소비 속도에 맞춰 멈추므로(backpressure)
+    메모리에는 대략 window_size + queue_size 페이지만 유지됩니다.
+
     Args:
-        page (PIL.Image.Image): The PDF page as a PIL image.
-        page_number (int): The page number.
-        
-    Returns:
-        tuple: A tuple containing the page number and extracted text.
+        pdf_path (str): PDF 파일 경로.
+        window_size (int, optional): 한 번에 래스터화할 페이지 수. None이면 설정의 pdf_render_window_pages 사용.
+        queue_size (int, optional): 소비되기를 기다리는 페이지의 최대 수. None이면 설정의 pdf_render_queue_size 사용.
+        pages (iterable, optional): 래스터화할 페이지 번호들 (1부터 시작). None이면 전체 페이지.
+        **convert_kwargs: convert_from_path에 그대로 전달할 인자 (output_folder, fmt 등).
+
+    Yields:
+        tuple: (페이지 번호(1부터 시작), PIL.Image.Image)
     """
+    convert_kwargs.setdefault("dpi", config_manager.get("pdf_render_dpi"))
+    window_size = max(1, int(window_size or config_manager.get("pdf_render_window_pages")))
+    queue_size = max(1, int(queue_size or config_manager.get("pdf_render_queue_size")))
+    total_pages = get_pdf_page_count(pdf_path)
+    if pages is None:
+        page_numbers = range(1, total_pages + 1)
+    else:
+        page_numbers = sorted(page for page in set(pages) if 1 <= page <= total_pages)
+    app_logger.info(f"PDF 스트리밍 래스터화 시작: {pdf_path} (총 {total_pages} 페이지 중 {len(page_numbers)} 페이지, "
+                    f"윈도우 {window_size}, 큐 {queue_size})")
+
+    page_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    end_marker = object()
+
+    def put(entry):
+        # 소비자가 중단하면(stop_event) 대기 중인 put도 포기
+        while not stop_event.is_set():
+            try:
+                page_queue.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for first_page, last_page in _page_windows(page_numbers, window_size):
+                rendered_pages = convert_from_path(pdf_path, first_page=first_page, last_page=last_page, **convert_kwargs)
+                app_logger.debug(f"PDF {first_page}~{last_page} 페이지 래스터화 완료.")
+                for offset, page in enumerate(rendered_pages):
+                    if not put((first_page + offset, page)):
+                        return
+                del rendered_pages
+        except Exception as e:
+            put(e)
+        finally:
+            put(end_marker)
+
+    producer = threading.Thread(target=produce, name="pdf-rasterizer", daemon=True)
+    producer.start()
     try:
-        app_logger.info(f"{page_number} 페이지 처리 시작.")
-        buffer = io.BytesIO()
-        processed_page = preprocess_image(page) # 전처리된 이미지 사용
-        processed_page.save(buffer, format="PNG")
-        image_data = buffer.getvalue()
+        while True:
+            entry = page_queue.get()
+            if entry is end_marker:
+                break
+            if isinstance(entry, Exception):
+                raise entry
+            yield entry
+    finally:
+        stop_event.set()
+
+def _submit_bounded(executor, items, submit, max_pending, on_abandoned=None):
+    """
+    items를 하나씩 꺼내 submit(executor, item)으로 제출하되, 완료되지 않은 future가 max_pending개를 넘지 않게 합니다.
+    items가 제너레이터이면 필요한 만큼만 소비하므로 입력 전체를 메모리에 올리지 않습니다.
+    중간에 중단되면 아직 시작되지 않은 future는 취소하고, 이미 실행 중이거나 끝났지만 반환되지 않은 future에는
+    on_abandoned(future)를 완료 콜백으로 등록합니다 (결과에 딸린 자원 정리용).
+
+    Yields:
+        tuple: 완료된 순서대로 (future, item)
+    """
+    pending = {}
+    try:
+        for item in items:
+            pending[submit(executor, item)] = item
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future, pending.pop(future)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future, pending.pop(future)
+    finally:
+        _cancel_pending(pending)
+        if on_abandoned is not None:
+            for future in pending:
+                if not future.cancelled():
+                    future.add_done_callback(on_abandoned)
+
+def _iter_cpu_stage(cpu_executor, items, encoding_policy, max_pending, cpu_stage, blank_detector=None):
+    """
+    CPU 단계: items(OcrInputItem)를 cpu_executor(보통 프로세스 풀)에서 디코딩·전처리·인코딩하는 제너레이터.
+    인코딩 통계와 빈 페이지 분석 결과는 이 (부모) 프로세스에서 encoding_policy와 blank_detector에 기록합니다.
+
+    Yields:
+        tuple: 완료된 순서대로 (item, 인코딩된 바이트, 인코딩 중 발생한 OCRError 또는 OCR을 생략할 빈 페이지의 PageInkStats)
+    """
+    completed = _submit_bounded(cpu_executor, items,
+                                lambda ex, item: ex.submit(encode_item_in_process, item, encoding_policy, blank_detector),
+                                max_pending, on_abandoned=_discard_encoded_future)
+    for future, item in completed:
+        item.release() # 워커에 복사본이 전달되었으므로 이 프로세스의 픽셀은 더 이상 필요 없음
+        try:
+            result, worker_seconds, ink_stats = future.result()
+            image_data = import_payload(result.data) if result is not None else ink_stats
+        except Exception as exc:
+            app_logger.error(f"이미지 ID '{item.id}' 인코딩 중 오류: {exc}", exc_info=True)
+            yield (item, OCRError(f"이미지 ID '{item.id}' 인코딩 중 오류: {exc}"))
+            continue
+        cpu_stage.add_busy(worker_seconds)
+        if ink_stats is not None:
+            blank_detector.record(item.id, ink_stats)
+        if result is not None:
+            encoding_policy.record(item.id, result)
+        yield (item, image_data)
+
+def _discard_encoded_future(future):
+    """소비되지 않고 버려진 CPU 단계 결과의 공유 메모리를 해제합니다."""
+    if not future.cancelled() and future.exception() is None:
+        result = future.result()[0]
+        if result is not None:
+            discard_payload(result.data)
 
-        extracted_text = detect_text_from_image(image_data)
-        app_logger.info(f"{page_number} 페이지 텍스트 추출 완료.")
-        return (page_number, extracted_text)
+def _call_with_limiter(limiter, func, *args):
+    """limiter가 있으면 동시 실행 슬롯을 점유한 상태에서 func를 호출합니다."""
+    if limiter is None:
+        return func(*args)
+    with limiter.slot():
+        return func(*args)
+
+def _call_vision(limiter, retry_policy, key, func, *args):
+    """
+    Vision API 호출을 수행합니다. retry_policy가 있으면 일시적 오류를 재시도하며,
+    각 시도마다 limiter 슬롯을 점유합니다 (재시도 대기 중에는 슬롯을 점유하지 않음).
+    """
+    if retry_policy is None:
+        return _call_with_limiter(limiter, func, *args)
+    return retry_policy.call(key, _call_with_limiter, limiter, func, *args)
+
+def _detect_text_cached(cache, image_data, limiter, retry_policy, key):
+    """
+    OCR 캐시를 먼저 확인하고, 없을 때만 Vision API를 호출한 뒤 결과를 캐시에 저장합니다.
+    cache가 None이면 캐시 없이 호출합니다.
+    """
+    cache_key = None
+    if cache is not None:
+        cache_key = _cache_key_for(image_data)
+        cached_text = cache.get(cache_key)
+        if cached_text is not None:
+            app_logger.debug(f"'{key}' OCR 캐시 적중.")
+            return cached_text
+    extracted_text = _call_vision(limiter, retry_policy, key, detect_text_from_image, image_data)
+    if cache is not None:
+        cache.put(cache_key, extracted_text)
+    return extracted_text
+
+def _ocr_encoded_item(item, image_data, limiter=None, retry_policy=None, cache=None, io_stage=None):
+    """
+    네트워크 단계 작업 함수: CPU 단계에서 인코딩된 바이트로 (캐시 확인 후) Vision API만 호출합니다.
+
+    Returns:
+        tuple: (item.id, 추출된 텍스트)
+    """
+    if isinstance(image_data, Exception): # CPU 단계에서 인코딩에 실패한 페이지
+        raise image_data
+    if isinstance(image_data, PageInkStats): # CPU 단계에서 빈 페이지로 판정된 페이지는 요청 없이 빈 텍스트
+        return (item.id, "")
+    start_time = time.perf_counter()
+    try:
+        app_logger.info(f"{item.id} 페이지 처리 시작.")
+        extracted_text = _detect_text_cached(cache, image_data, limiter, retry_policy, item.id)
+        app_logger.info(f"{item.id} 페이지 텍스트 추출 완료.")
+        return (item.id, extracted_text)
+    except JOB_ABORT_ERRORS:
+        raise
     except Exception as e:
-        app_logger.error(f"{page_number} 페이지 처리 중 오류: {e}", exc_info=True)
-        # 오류 발생 시 빈 텍스트와 함께 페이지 번호 반환 또는 예외를 다시 발생시켜 상위에서 처리
-        raise OCRError(f"{page_number} 페이지 처리 중 오류: {e}")
-        
-def process_pdf(pdf_path, output_folder):
+        app_logger.error(f"{item.id} 페이지 처리 중 오류: {e}", exc_info=True)
+        raise OCRError(f"{item.id} 페이지 처리 중 오류: {e}")
+    finally:
+        if io_stage is not None:
+            io_stage.add_busy(time.perf_counter() - start_time)
+
+def _run_two_stage_pipeline(items, limiter, retry_policy, cache, encoding_policy, blank_detector=None):
+    """
+    CPU 단계(프로세스 풀: 디코딩·빈 페이지 감지·전처리·인코딩)와 네트워크 단계(스레드 풀: Vision API 호출)를 연결해 items를 OCR합니다.
+    두 단계는 각자의 워커 수(ocr_cpu_workers, max_ocr_workers)로 동작하며, 끝나면 단계별 가동률을 로그에 남깁니다.
+
+    Yields:
+        tuple: 완료된 순서대로 (future, item). future.result()는 (item.id, 추출된 텍스트)
+    """
+    cpu_executor, cpu_workers = create_cpu_executor()
+    cpu_stage = StageUtilization("CPU(디코딩·인코딩)", cpu_workers)
+    io_stage = StageUtilization("네트워크(Vision API)", limiter.max_limit)
+    try:
+        with ThreadPoolExecutor(max_workers=limiter.max_limit) as io_executor: # max_ocr_workers를 상한으로 사용
+            encoded = _iter_cpu_stage(cpu_executor, items, encoding_policy, cpu_workers * 2, cpu_stage, blank_detector)
+            completed = _submit_bounded(
+                io_executor, encoded,
+                lambda ex, entry: ex.submit(_ocr_encoded_item, entry[0], entry[1], limiter, retry_policy, cache, io_stage),
+                max_pending=limiter.max_limit * 2)
+            for future, (item, _) in completed:
+                yield future, item
+    finally:
+        cpu_executor.shutdown(wait=True, cancel_futures=True)
+        cpu_stage.log_summary()
+        io_stage.log_summary()
+
+def process_pdf(pdf_path, output_folder, mode=None, file_transport=None):
     """
     Processes each page in a PDF file and performs OCR.
+    Each page is written to the output file as soon as all earlier pages are done, so partial results are usable during long runs.
     
     Args:
-        pdf_path (str): The path to the PDF file.
+        pdf_path (str): The path to the PDF file (or a TIFF file in "file" mode).
         output_folder (str): The folder where the output text file will be saved.
+        mode (str, optional): "image" rasterizes pages locally and uploads each page as an image.
+            "file" sends the document itself to Vision's file annotation API in chunks of up to 5 pages.
+            PDFs fall back to "image" when poppler's pdfseparate/pdfunite are missing, since they cannot be split.
+            Defaults to the pdf_ocr_mode setting.
+        file_transport (optional): Transport used by "file" mode (e.g. LocalFileTransport for offline runs).
+            Defaults to the ocr_file_transport setting.
     """
-    app_logger.info(f"PDF 처리 시작: {pdf_path}")
+    mode = mode or config_manager.get("pdf_ocr_mode")
+    if mode not in ("image", "file"):
+        raise OCRError(f"알 수 없는 PDF OCR 모드: {mode} (\"image\" 또는 \"file\")")
+    app_logger.info(f"PDF 처리 시작: {pdf_path} (모드: {mode})")
     try:
-        pages = convert_from_path(pdf_path)
-        app_logger.info(f"PDF를 이미지로 변환 완료. 총 {len(pages)} 페이지.")
-
         output_text_file = os.path.join(output_folder, f"{os.path.basename(pdf_path)}.txt")
         
+        limiter = create_ocr_limiter()
+        retry_policy = create_retry_policy()
+        cache = get_ocr_cache()
+        cache_snapshot = cache.snapshot() if cache else None
         with open(output_text_file, 'w', encoding='utf-8') as text_file:
-            with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor: # CPU 코어 수만큼 워커 사용
-                app_logger.debug(f"ThreadPoolExecutor 생성 (max_workers={executor._max_workers}). 페이지 처리 시작.")
-                futures = [executor.submit(process_page, page, page_number)
-                           for page_number, page in enumerate(pages, start=1)]
-                results = sorted([future.result() for future in as_completed(futures)], key=lambda x: x[0])
-            
-            app_logger.info("모든 페이지 처리 완료. 파일에 결과 작성 중...")
-            for page_number, text in results:
-                text_file.write(f"\n--- Page {page_number} ---\n")
-                text_file.write(text)
-                text_file.write("\n\n")
+            if mode == "file" and not can_split_document(pdf_path):
+                # 조각으로 나누지 못하면 요청마다 전체 PDF를 다시 보내야 하므로 페이지 이미지 경로로 전환
+                app_logger.warning(f"pdfseparate/pdfunite가 없어 파일 주석 대신 페이지 이미지로 OCR합니다: {pdf_path}")
+                mode = "image"
+            if mode == "file":
+                results = _ocr_pdf_with_file_annotation(pdf_path, limiter, retry_policy, cache, file_transport)
+            else:
+                results = _ocr_pdf_as_images(pdf_path, limiter, retry_policy, cache)
+            writer = OrderedPageWriter(text_file, flush_seconds=config_manager.get("ocr_output_flush_seconds"))
+            try:
+                for page_number, text in results: # 완료된 순서대로 받아 페이지 순서대로 기록
+                    writer.add(page_number, text)
+            finally:
+                writer.flush() # 중단되더라도 이미 쓴 페이지는 파일에 남김
+            writer.finish()
+
+            app_logger.info(f"모든 페이지 처리 완료 (최종 OCR 동시성 {limiter.limit}).")
+            retry_policy.log_summary()
+            if cache:
+                cache.log_run_summary(cache_snapshot)
         app_logger.info(f"PDF 처리 완료. 결과 저장: {output_text_file}")
     except Exception as e:
         app_logger.error(f"PDF 처리 중 오류 ({pdf_path}): {e}", exc_info=True)
         # GUI에서 이 오류를 잡아서 사용자에게 알릴 수 있도록 raise
         raise OCRError(f"PDF '{pdf_path}' 처리 중 오류: {e}")
         
-def process_images_in_folder(input_folder, output_folder):
+def _ocr_pdf_as_images(pdf_path, limiter, retry_policy, cache):
+    """PDF를 로컬에서 래스터화해 페이지마다 이미지로 OCR합니다. (페이지 번호, 텍스트)를 완료된 순서대로 반환(yield)합니다."""
+    encoding_policy = create_encoding_policy()
+    blank_detector = create_blank_page_detector()
+    render_dpi = config_manager.get("pdf_render_dpi")
+    with tempfile.TemporaryDirectory(prefix="ocr_pdf_") as render_dir:
+        # 래스터화된 페이지 파일 경로만 CPU 단계(프로세스 풀)로 넘기고, 처리 대기 페이지 수를 제한해 메모리 사용량을 일정하게 유지
+        page_items = (
+            OcrInputItem(id=page_number, image=None, original_path=pdf_path,
+                         source=PageDataSource(path=f"pdf_page_{page_number}", original_index=page_number - 1,
+                                               image_path=rendered_path, pdf_path=pdf_path, pdf_page_number=page_number,
+                                               pdf_dpi=render_dpi))
+            for page_number, rendered_path in iter_pdf_pages(pdf_path, output_folder=render_dir, fmt='jpeg', paths_only=True))
+        for future, _ in _run_two_stage_pipeline(page_items, limiter, retry_policy, cache, encoding_policy, blank_detector):
+            yield future.result()
+    encoding_policy.log_summary()
+    if blank_detector:
+        blank_detector.log_summary()
+
+def _ocr_pdf_with_file_annotation(file_path, limiter, retry_policy, cache, transport=None):
+    """
+    문서를 래스터화하지 않고 최대 5페이지씩 Vision 파일 주석(batch_annotate_files)으로 OCR합니다.
+    조각 요청은 이미지 경로와 같은 동시성 제한기/재시도 정책/캐시를 사용하며,
+    (페이지 번호, 텍스트)를 조각이 완료된 순서대로 반환(yield)합니다.
+    """
+    transport = transport or create_file_transport(vision_client_provider)
+    mime_type = mime_type_for(file_path)
+    total_pages = get_file_page_count(file_path, mime_type, get_pdf_page_count)
+    chunk_pages = config_manager.get("ocr_file_chunk_pages")
+    app_logger.info(f"파일 주석 OCR 시작: {file_path} (총 {total_pages} 페이지, 요청당 최대 {chunk_pages} 페이지)")
+    with tempfile.TemporaryDirectory(prefix="ocr_file_chunks_") as work_dir, \
+            ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+        completed = _submit_bounded(
+            executor, iter_file_chunks(file_path, total_pages, chunk_pages, work_dir),
+            lambda ex, chunk: ex.submit(_ocr_file_chunk, transport, chunk, limiter, retry_policy, cache),
+            max_pending=limiter.max_limit * 2)
+        for future, _ in completed:
+            yield from future.result()
+
+def _ocr_file_chunk(transport, chunk, limiter=None, retry_policy=None, cache=None):
+    """파일 조각(FileChunk) 하나를 OCR해 [(원본 페이지 번호, 텍스트)]를 반환합니다. 조각의 모든 페이지가 캐시에 있으면 요청하지 않습니다."""
+    language_hints = config_manager.get("ocr_language_hints")
+    chunk_key = f"pages[{chunk.page_numbers[0]}..{chunk.page_numbers[-1]}]"
+    cache_keys = {}
+    if cache is not None:
+        content_digest = hashlib.sha256(chunk.content).digest()
+        cache_keys = {page_number: OcrResultCache.make_key(content_digest, f"{FILE_ANNOTATION_FEATURE}:{request_page}", language_hints)
+                      for page_number, request_page in zip(chunk.page_numbers, chunk.request_pages)}
+        cached = [(page_number, cache.get(key)) for page_number, key in cache_keys.items()]
+        if all(text is not None for _, text in cached):
+            app_logger.info(f"파일 주석: {chunk_key} 캐시 적중.")
+            return cached
+    pages = _call_vision(limiter, retry_policy, chunk_key, _annotate_file_chunk, transport, chunk, language_hints)
+    for page_number, text in pages:
+        if page_number in cache_keys:
+            cache.put(cache_keys[page_number], text)
+    app_logger.info(f"파일 주석: {chunk_key} 텍스트 추출 완료.")
+    return pages
+
+def _annotate_file_chunk(transport, chunk, language_hints):
+    """
+    파일 조각을 전송하고 [(원본 페이지 번호, 텍스트)]를 반환합니다.
+    페이지 하나라도 오류가 있으면 OCRError를 발생시켜, 일시적 오류라면 재시도 정책이 조각 전체를 다시 요청하게 합니다.
+    """
+    try:
+        file_response = transport.annotate(chunk.content, chunk.mime_type, chunk.request_pages, language_hints)
+    except OCRError:
+        raise
+    except Exception as e:
+        raise OCRError(f"Google Vision API 파일 주석 요청 오류: {e}") from e
+    _raise_for_response_error(file_response.error)
+    if len(file_response.responses) != len(chunk.page_numbers):
+        raise OCRError(f"batch_annotate_files 응답 수 불일치: 요청 {len(chunk.page_numbers)} 페이지, 응답 {len(file_response.responses)} 페이지")
+    # 응답 context의 페이지 번호(조각 기준)를 원본 문서의 페이지 번호로 되돌림
+    to_original_page = dict(zip(chunk.request_pages, chunk.page_numbers))
+    pages = []
+    for fallback_page, response in zip(chunk.page_numbers, file_response.responses):
+        page_number = to_original_page.get(response.context.page_number, fallback_page)
+        pages.append((page_number, _text_from_annotate_response(response)))
+    return pages
+
+def process_images_in_folder(input_folder, output_folder, recursive=None, max_workers=None):
     """
     Processes all image files (png, jpg, jpeg, bmp, tiff, gif) in the input folder
     and stores the results in the output folder.
+    Directory entries are streamed with os.scandir and OCRed in parallel by a bounded worker pool.
+    Images whose output text file is not older than the image are skipped, so re-runs are incremental.
+    A failing image does not stop the run; failures are collected into the returned summary.
     
     Args:
         input_folder (str): The folder containing image files.
         output_folder (str): The folder where the output text files will be saved.
+            In recursive mode the subfolder structure of the input folder is mirrored.
+        recursive (bool, optional): Also process images in subfolders. Defaults to the ocr_folder_recursive setting.
+        max_workers (int, optional): Number of images processed at the same time. Defaults to max_ocr_workers.
+
+    Returns:
+        FolderRunSummary: Counts of processed/skipped images and the list of per-file failures.
+
+    Raises:
+        OCRError: If the folder cannot be read, or the job is aborted (circuit breaker open, job deadline exceeded).
     """
-    app_logger.info(f"폴더 내 이미지 일괄 처리 시작: {input_folder}")
+    if recursive is None:
+        recursive = config_manager.get("ocr_folder_recursive")
+    app_logger.info(f"폴더 내 이미지 일괄 처리 시작: {input_folder} (하위 폴더 포함={bool(recursive)})")
+    summary = FolderRunSummary()
+    start_time = time.monotonic()
     try:
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
             app_logger.info(f"출력 폴더 생성됨: {output_folder}")
 
-        supported_image_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif')
-        image_files_processed = 0
-        for file_name in os.listdir(input_folder):
-            if file_name.lower().endswith(supported_image_extensions):
-                image_path = os.path.join(input_folder, file_name)
-                process_single_image_file(image_path, output_folder)
-                image_files_processed += 1
-        app_logger.info(f"폴더 내 이미지 일괄 처리 완료. 총 {image_files_processed}개 파일 처리됨: {input_folder}")
+        limiter = create_ocr_limiter()
+        retry_policy = create_retry_policy() # 폴더 전체를 하나의 작업으로 보고 기한/서킷 브레이커 공유
+        cache = get_ocr_cache()
+        cache_snapshot = cache.snapshot() if cache else None
+        max_workers = max(1, int(max_workers or limiter.max_limit))
+
+        def iter_pending_images():
+            for image_path, relative_dir in _iter_image_files(input_folder, recursive, exclude=output_folder):
+                target_folder = os.path.join(output_folder, relative_dir)
+                if _is_output_up_to_date(image_path, _output_text_path(image_path, target_folder)):
+                    app_logger.debug(f"최신 출력이 있어 건너뜀: {image_path}")
+                    summary.skipped_files += 1
+                    continue
+                yield image_path, target_folder
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr-folder") as executor:
+            completed = _submit_bounded(
+                executor, iter_pending_images(),
+                lambda ex, entry: ex.submit(process_single_image_file, entry[0], entry[1], retry_policy,
+                                            log_cache_summary=False, limiter=limiter),
+                max_pending=max_workers * 2)
+            for future, (image_path, _) in completed:
+                try:
+                    future.result()
+                    summary.processed_files += 1
+                except JOB_ABORT_ERRORS:
+                    raise # _submit_bounded가 남은 파일을 취소
+                except (OCRError, FileOperationError) as e: # 파일별 실패는 모아서 보고
+                    summary.failures.append((image_path, e.message))
+        retry_policy.log_summary()
+        if cache:
+            cache.log_run_summary(cache_snapshot)
+    except JOB_ABORT_ERRORS:
+        raise
     except Exception as e:
         app_logger.error(f"폴더 내 이미지 일괄 처리 중 오류 ({input_folder}): {e}", exc_info=True)
         raise OCRError(f"이미지 폴더 '{input_folder}' 처리 중 오류: {e}")
-        
-def process_single_image_file(image_path, output_folder):
+    summary.elapsed_seconds = time.monotonic() - start_time
+    app_logger.info(f"폴더 내 이미지 일괄 처리 완료: {input_folder}")
+    for line in summary.summary_lines():
+        app_logger.info(f"폴더 처리 요약: {line}")
+    if summary.failures:
+        app_logger.error(f"폴더 내 이미지 {len(summary.failures)}개 OCR 실패 ({input_folder}): "
+                         f"{', '.join(image_path for image_path, _ in summary.failures)}")
+    return summary
+
+def _iter_image_files(folder, recursive, exclude=None):
+    """
+    os.scandir로 디렉터리 항목을 하나씩 읽어 지원하는 이미지 파일의 (경로, folder 기준 상대 폴더)를 반환(yield)합니다.
+    recursive이면 하위 폴더도 차례로 탐색하며, exclude 폴더(입력 폴더 안의 출력 폴더 등)는 건너뜁니다.
+    """
+    excluded_path = os.path.realpath(exclude) if exclude else None
+    pending_dirs = [""]
+    while pending_dirs:
+        relative_dir = pending_dirs.pop()
+        with os.scandir(os.path.join(folder, relative_dir)) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(SUPPORTED_IMAGE_EXTENSIONS):
+                    yield entry.path, relative_dir
+                elif recursive and entry.is_dir(follow_symlinks=False) and os.path.realpath(entry.path) != excluded_path:
+                    pending_dirs.append(os.path.join(relative_dir, entry.name))
+
+def _output_text_path(image_path, output_folder):
+    """이미지의 OCR 결과를 저장할 텍스트 파일 경로 (확장자를 .txt로 바꾼 같은 이름)."""
+    return os.path.join(output_folder, os.path.splitext(os.path.basename(image_path))[0] + ".txt")
+
+def _is_output_up_to_date(image_path, output_path):
+    """출력 파일이 있고 입력 이미지보다 오래되지 않았으면 True (다시 OCR할 필요 없음)."""
+    try:
+        return os.stat(output_path).st_mtime_ns >= os.stat(image_path).st_mtime_ns
+    except OSError:
+        return False
+
+def process_single_image_file(image_path, output_folder, retry_policy=None, log_cache_summary=True, limiter=None):
     """
     Processes a single image file, performs OCR, and saves the text.
 
     Args:
         image_path (str): The path to the image file.
         output_folder (str): The folder where the output text file will be saved.
+        retry_policy (RetryPolicy, optional): Shared retry policy of the surrounding job. A new one is created if omitted.
+        log_cache_summary (bool): Whether to log the OCR cache hit/miss counts for this file.
+        limiter (AdaptiveConcurrencyLimiter, optional): Shared limiter of the surrounding job (parallel folder processing).
     """
     app_logger.info(f"단일 이미지 파일 처리 시작: {image_path}")
     try:
         if not os.path.exists(output_folder):
-            os.makedirs(output_folder)
+            os.makedirs(output_folder, exist_ok=True) # 병렬 처리 시 다른 스레드가 먼저 만들 수 있음
             app_logger.info(f"출력 폴더 생성됨: {output_folder}")
 
         img = Image.open(image_path)
@@ -179,11 +788,14 @@ def process_single_image_file(image_path, output_folder):
         image_data = buffer.getvalue()
         app_logger.debug(f"이미지를 바이트 데이터로 변환 완료 (포맷: {img_format}).")
 
-        extracted_text = detect_text_from_image(image_data)
+        retry_policy = retry_policy or create_retry_policy()
+        cache = get_ocr_cache()
+        cache_snapshot = cache.snapshot() if cache else None
+        extracted_text = _detect_text_cached(cache, image_data, limiter, retry_policy, image_path)
+        if cache and log_cache_summary:
+            cache.log_run_summary(cache_snapshot)
         
-        base_name = os.path.basename(image_path)
-        text_file_name = os.path.splitext(base_name)[0] + ".txt"
-        output_text_file = os.path.join(output_folder, text_file_name)
+        output_text_file = _output_text_path(image_path, output_folder)
 
         with open(output_text_file, 'w', encoding='utf-8') as text_file:
             text_file.write(extracted_text)
@@ -191,42 +803,510 @@ def process_single_image_file(image_path, output_folder):
     except FileNotFoundError:
         app_logger.error(f"이미지 파일을 찾을 수 없음: {image_path}")
         raise FileOperationError(f"이미지 파일을 찾을 수 없음: {image_path}")
+    except JOB_ABORT_ERRORS: # 작업 중단은 감싸지 않고 그대로 전달
+        raise
     except Exception as e:
         app_logger.error(f"단일 이미지 파일 처리 중 오류 ({image_path}): {e}", exc_info=True)
         raise OCRError(f"단일 이미지 파일 '{image_path}' 처리 중 오류: {e}")
 
-def ocr_pil_images_batch(pil_images_with_identifiers):
+def ocr_pil_images_batch(pil_images_with_identifiers, use_batch_annotate=None, on_result=None):
     """
     여러 PIL 이미지에 대해 OCR을 수행하고, 각 이미지의 식별자와 함께 텍스트 결과를 반환합니다.
     ThreadPoolExecutor를 사용하여 병렬 처리합니다.
+    ocr_mosaic_enabled이면 작은 이미지들은 캔버스 하나에 모아 요청 하나로 OCR합니다 (모자이크 패킹).
+
+    Args:
+        pil_images_with_identifiers (Iterable[OcrInputItem]): OCR을 수행할 OcrInputItem 객체 리스트 또는 제너레이터.
+                                                              id는 페이지 번호, 파일 경로 등이 될 수 있습니다.
+                                                              제너레이터는 처리 속도에 맞춰 필요한 만큼만 소비됩니다.
+        use_batch_annotate (bool, optional): True이면 여러 이미지를 batch_annotate_images 요청 하나로 묶어 전송합니다.
+                                             None이면 설정의 ocr_use_batch_annotate 값을 사용합니다.
+        on_result (callable, optional): 이미지 하나의 결과가 나올 때마다 결과 딕셔너리를 인자로 호출됩니다 (작업 저널 기록 등).
+                                        여러 스레드에서 호출될 수 있습니다.
+
+    Returns:
+        list: 각 요소가 {'id': 식별자, 'text': 추출된 텍스트, 'retries': 재시도 횟수} 형태인 딕셔너리 리스트.
+              재시도 후에도 실패하면 text는 빈 문자열이고 'error': True, 'error_message': 오류 메시지가 추가됩니다 (오류 문구가 책 본문에 들어가지 않도록).
+              빈 페이지로 판정되어 요청을 생략한 이미지는 text가 빈 문자열이고 'blank': True가 추가됩니다.
+              모자이크로 OCR한 이미지에는 'mosaic': 모자이크 요청 번호가 추가됩니다.
+
+    Raises:
+        OCRCircuitOpenError, OCRDeadlineExceededError: 오류율 급증 또는 작업 기한 초과로 작업 전체를 중단할 때.
+    """
+    if use_batch_annotate is None:
+        use_batch_annotate = config_manager.get("ocr_use_batch_annotate")
+    app_logger.info(f"배치 OCR 시작 (batch_annotate_images 사용={bool(use_batch_annotate)}).")
+    if use_batch_annotate:
+        results = _ocr_with_mosaic_stage(pil_images_with_identifiers, _ocr_items_with_batch_annotate, on_result)
+        app_logger.info("배치 OCR 처리 완료.")
+        return results
+    return _ocr_with_mosaic_stage(pil_images_with_identifiers, _ocr_items_with_two_stage_pipeline, on_result)
+
+def _add_result(results, result, on_result=None):
+    """결과 딕셔너리를 results에 추가하고, on_result가 있으면 호출해 호출자가 끝난 페이지를 바로 기록할 수 있게 합니다."""
+    results.append(result)
+    if on_result is not None:
+        on_result(result)
+
+class _OcrJob:
+    """
+    OCR 작업 하나의 모든 요청 경로(이미지별 요청, batch_annotate_images, 모자이크)가 공유하는 자원.
+    동시성 제한기, 재시도 정책(작업 기한, 서킷 브레이커 포함), OCR 캐시, 빈 페이지 감지기를 작업마다 한 번만 만들어,
+    경로가 나뉘어도 동시 요청 수가 상한을 넘지 않고 과부하 감소와 작업 기한이 작업 전체에 적용되게 합니다.
+    """
+    def __init__(self, limiter=None):
+        """
+        Args:
+            limiter (AdaptiveConcurrencyLimiter, optional): 동시성 제한기. None이면 설정(max_ocr_workers)으로 만듭니다.
+        """
+        self.limiter = limiter or create_ocr_limiter()
+        self.retry_policy = create_retry_policy()
+        self.cache = get_ocr_cache()
+        self.blank_detector = create_blank_page_detector()
+        self._cache_snapshot = self.cache.snapshot() if self.cache else None
+
+    def log_summary(self):
+        """작업 전체의 재시도, 빈 페이지 감지, 캐시 적중 통계를 로그에 남깁니다."""
+        self.retry_policy.log_summary()
+        if self.blank_detector:
+            self.blank_detector.log_summary()
+        if self.cache:
+            self.cache.log_run_summary(self._cache_snapshot)
+
+def _ocr_items_with_two_stage_pipeline(items, job, on_result=None):
+    """OcrInputItem들을 CPU 단계(인코딩)와 네트워크 단계(이미지당 요청 하나)로 OCR합니다. ocr_pil_images_batch의 기본 경로."""
+    results = []
+    retry_policy = job.retry_policy
+    encoding_policy = create_encoding_policy()
+    blank_detector = job.blank_detector
+    for future, item in _run_two_stage_pipeline(items, job.limiter, retry_policy, job.cache, encoding_policy, blank_detector):
+        identifier = item.id
+        try:
+            _, text_content = future.result() # _ocr_encoded_item은 (id, text) 반환
+            if blank_detector and blank_detector.was_skipped(identifier):
+                _add_result(results, {'id': identifier, 'text': text_content, 'retries': 0, 'blank': True}, on_result)
+                continue
+            _add_result(results, {'id': identifier, 'text': text_content, 'retries': retry_policy.get_retry_count(identifier)},
+                        on_result)
+            app_logger.debug(f"이미지 ID '{identifier}' OCR 완료.")
+        except JOB_ABORT_ERRORS as abort_exc:
+            app_logger.error(f"이미지 ID '{identifier}' 처리 중 작업 중단 오류: {abort_exc.message}")
+            raise # _submit_bounded가 남은 요청을 취소
+        except Exception as exc:
+            app_logger.error(f"이미지 ID '{identifier}' 처리 중 오류: {exc}", exc_info=True)
+            _add_result(results, {'id': identifier, 'text': "", 'retries': retry_policy.get_retry_count(identifier),
+                                  'error': True, 'error_message': str(exc)}, on_result)
+    app_logger.info(f"배치 OCR 처리 완료: 총 {len(results)}개 이미지 (최종 OCR 동시성 {job.limiter.limit}).")
+    encoding_policy.log_summary()
+    return results
+
+def _ocr_with_mosaic_stage(items, ocr_remaining, on_result=None, job=None):
+    """
+    모자이크 패킹 단계. 설정이 꺼져 있으면 ocr_remaining(items, job, on_result)를 그대로 호출합니다.
+    켜져 있으면 작은 이미지는 빈 페이지 감지와 캐시 확인을 거친 뒤 캔버스에 모아 DOCUMENT_TEXT_DETECTION 요청 하나로 OCR하고
+    (캔버스가 찰 때마다 바로 전송), 나머지 이미지만 ocr_remaining에 스트림으로 넘긴 뒤 결과를 합쳐 반환합니다.
+    두 경로는 job(None이면 새로 만듦)의 동시성 제한기, 재시도 정책, 캐시, 빈 페이지 감지기를 함께 사용합니다.
+    """
+    job = job or _OcrJob()
+    packer = create_mosaic_packer()
+    if packer is None:
+        results = ocr_remaining(items, job, on_result)
+        job.log_summary()
+        return results
+    futures = []
+    screened_results = [] # 모자이크로 보내기 전에 빈 페이지 또는 캐시 적중으로 처리된 작은 이미지
+    tile_cache_keys = {} # {item.id: 캐시 키}. 모자이크 OCR이 성공하면 타일별 텍스트를 캐시에 저장
+    with ThreadPoolExecutor(max_workers=job.limiter.max_limit, thread_name_prefix="ocr-mosaic") as executor:
+        def submit_layout(layout):
+            future = executor.submit(_ocr_mosaic, layout, len(futures) + 1, job, tile_cache_keys)
+            if on_result is not None:
+                future.add_done_callback(notify_tiles)
+            futures.append(future)
+        def notify_tiles(future):
+            if not future.cancelled() and future.exception() is None:
+                for result in future.result():
+                    on_result(result)
+        def add_screened(result):
+            _add_result(screened_results, result, on_result)
+        try:
+            diverted = _iter_mosaic_diverted(items, packer, submit_layout, job, add_screened, tile_cache_keys)
+            results = list(ocr_remaining(diverted, job, on_result))
+            results.extend(screened_results)
+            for future in futures:
+                results.extend(future.result())
+        except BaseException:
+            _cancel_pending(futures)
+            raise
+    tile_count = sum(len(future.result()) for future in futures)
+    if futures:
+        app_logger.info(f"모자이크 OCR: 작은 이미지 {tile_count}개를 요청 {len(futures)}건으로 처리 "
+                        f"(요청 수 {tile_count / len(futures):.1f}배 감소).")
+    job.log_summary()
+    return results
+
+def _iter_mosaic_diverted(items, packer, submit_layout, job, add_screened, tile_cache_keys):
+    """
+    items 중 작은 이미지는 빈 페이지 감지와 캐시 확인을 먼저 하고, 빈 페이지나 캐시에 있는 이미지는 add_screened(결과)로 바로 보고합니다.
+    나머지 작은 이미지는 packer에 배치하고 캔버스가 찰 때마다 submit_layout(layout)을 호출하며,
+    큰 이미지는 그대로 반환(yield)하는 제너레이터. 입력이 끝나면 남은 캔버스도 제출합니다.
+    """
+    for item in items:
+        size = _item_image_size(item)
+        if size is None or not packer.accepts(size):
+            yield item
+            continue
+        try:
+            screened, cache_key = _screen_tile(item, job)
+        except Exception as exc: # 디코딩할 수 없는 이미지는 일반 경로에서 이미지별 오류로 보고
+            app_logger.debug(f"이미지 ID '{item.id}' 모자이크 사전 확인 실패, 일반 경로로 처리: {exc}")
+            item.release()
+            yield item
+            continue
+        if screened is not None:
+            add_screened(screened)
+            continue
+        if cache_key is not None:
+            tile_cache_keys[item.id] = cache_key
+        if not packer.add(item, size):
+            submit_layout(packer.take())
+            packer.add(item, size)
+    layout = packer.take()
+    if layout is not None:
+        submit_layout(layout)
+
+def _screen_tile(item, job):
+    """
+    모자이크로 보낼 작은 이미지를 디코딩해 빈 페이지인지, 캐시에 결과가 있는지 확인합니다.
+    디코딩한 이미지는 캔버스에 붙일 때 다시 쓰도록 남겨 두고, 요청이 필요 없는 이미지만 해제합니다.
+
+    Returns:
+        tuple: (요청 없이 보고할 결과 딕셔너리 또는 None, 모자이크 결과를 저장할 캐시 키 또는 None)
+    """
+    tile = item.load_image()
+    if job.blank_detector is not None:
+        ink_stats = job.blank_detector.analyze(tile)
+        job.blank_detector.record(item.id, ink_stats)
+        if job.blank_detector.skips(ink_stats):
+            item.release()
+            return {'id': item.id, 'text': "", 'retries': 0, 'blank': True}, None
+    if job.cache is None:
+        return None, None
+    cache_key = _tile_cache_key(tile)
+    cached_text = job.cache.get(cache_key)
+    if cached_text is not None:
+        app_logger.debug(f"'{item.id}' OCR 캐시 적중 (모자이크 타일).")
+        item.release()
+        return {'id': item.id, 'text': cached_text, 'retries': 0}, None
+    return None, cache_key
+
+def _tile_cache_key(tile):
+    """모자이크 타일의 캐시 키. 캔버스에 붙는 픽셀(모드, 크기, 픽셀 바이트)과 기능 유형, 언어 힌트로 만듭니다."""
+    pixel_digest = hashlib.sha256(f"{tile.mode}:{tile.size}".encode("ascii") + tile.tobytes()).digest()
+    return OcrResultCache.make_key(pixel_digest, MOSAIC_TILE_FEATURE, config_manager.get("ocr_language_hints"))
+
+def _item_image_size(item):
+    """OcrInputItem 이미지의 (가로, 세로). 파일은 헤더만 읽습니다. 알 수 없으면 None (일반 경로에서 처리)."""
+    if item.image is not None:
+        return item.image.size
+    if item.source is not None and item.source.image_path:
+        try:
+            with Image.open(item.source.image_path) as img:
+                return img.size
+        except Exception:
+            return None
+    return None
+
+def _ocr_mosaic(layout, index, job, tile_cache_keys):
+    """
+    모자이크 캔버스 하나를 렌더링해 OCR하고, 단어 경계 상자로 타일별 텍스트를 나눕니다.
+    성공하면 타일별 텍스트를 tile_cache_keys의 키로 캐시에 저장합니다.
+
+    Returns:
+        list: 타일마다 {'id', 'text', 'retries', 'mosaic'} 딕셔너리.
+    """
+    key = f"mosaic[{index}]"
+    retry_policy = job.retry_policy
+    tile_ids = [placement.item.id for placement in layout.placements]
+    try:
+        image_data = render_mosaic(layout)
+        app_logger.info(f"모자이크 {index}: 이미지 {len(tile_ids)}개, 캔버스 {layout.width}x{layout.height}, {len(image_data)} 바이트.")
+        annotation = _call_vision(job.limiter, retry_policy, key, detect_document_text_from_image, image_data)
+    except JOB_ABORT_ERRORS:
+        raise
+    except Exception as exc:
+        app_logger.error(f"모자이크 {index} OCR 중 오류 (타일 {len(tile_ids)}개 실패 처리): {exc}", exc_info=True)
+        return [{'id': tile_id, 'text': "", 'retries': retry_policy.get_retry_count(key),
+                 'mosaic': index, 'error': True, 'error_message': str(exc)} for tile_id in tile_ids]
+    texts = map_words_to_tiles(annotation, layout)
+    if job.cache is not None:
+        for tile_id in tile_ids:
+            if tile_id in tile_cache_keys:
+                job.cache.put(tile_cache_keys[tile_id], texts[tile_id])
+    return [{'id': tile_id, 'text': texts[tile_id], 'retries': retry_policy.get_retry_count(key), 'mosaic': index}
+            for tile_id in tile_ids]
+
+def _cancel_pending(futures):
+    """아직 시작되지 않은 future들을 취소합니다 (작업 중단 시 남은 요청이 API를 계속 호출하지 않도록)."""
+    for future in futures:
+        future.cancel()
+
+def _ocr_items_with_batch_annotate(items, job, on_result=None):
+    """
+    OcrInputItem들을 인코딩한 뒤 이미지 수/바이트 제한에 맞춰 묶어 batch_annotate_images로 OCR합니다.
+    입력은 스트리밍으로 소비되어, 배치가 채워지는 대로 요청이 전송됩니다.
+    배치 안에서 실패한 페이지는 해당 페이지만 오류로 보고되며, 일시적 오류였다면 그 페이지만 단건 요청으로 재시도합니다.
+    """
+    max_images = config_manager.get("ocr_batch_max_images")
+    max_bytes = config_manager.get("ocr_batch_max_bytes")
+    results = []
+    limiter, retry_policy, cache, blank_detector = job.limiter, job.retry_policy, job.cache, job.blank_detector
+    encoding_policy = create_encoding_policy()
+    cache_keys = {}
+    batch_count = 0
+    cpu_executor, cpu_workers = create_cpu_executor()
+    cpu_stage = StageUtilization("CPU(디코딩·인코딩)", cpu_workers)
+    io_stage = StageUtilization("네트워크(Vision API)", limiter.max_limit)
+
+    def call_vision_measured(key, func, *args):
+        with io_stage.measure():
+            return _call_vision(limiter, retry_policy, key, func, *args)
+
+    try:
+        with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+            # 1단계 (CPU 단계, 프로세스 풀): 페이지 인코딩. 빈 페이지와 캐시에 있는 페이지는 요청 대상에서 제외
+            def iter_encoded_items():
+                for item, image_data in _iter_cpu_stage(cpu_executor, items, encoding_policy, cpu_workers * 2, cpu_stage,
+                                                        blank_detector):
+                    identifier = item.id
+                    if isinstance(image_data, Exception):
+                        _append_ocr_outcome(results, identifier, image_data, 0, on_result=on_result)
+                        continue
+                    if isinstance(image_data, PageInkStats):
+                        _add_result(results, {'id': identifier, 'text': "", 'retries': 0, 'blank': True}, on_result)
+                        continue
+                    if cache is not None:
+                        cache_keys[identifier] = _cache_key_for(image_data)
+                        cached_text = cache.get(cache_keys[identifier])
+                        if cached_text is not None:
+                            _append_ocr_outcome(results, identifier, cached_text, 0, on_result=on_result)
+                            continue
+                    yield (identifier, image_data)
+
+            # 2단계 (네트워크 단계, 스레드 풀): 배치가 채워지는 대로 OCR 요청
+            def submit_batch(ex, batch):
+                batch_key = f"batch[{batch[0][0]}..{batch[-1][0]}]"
+                return ex.submit(call_vision_measured, batch_key, detect_text_from_images_batch,
+                                 [image_data for _, image_data in batch])
+
+            completed_batches = _submit_bounded(executor, split_into_batches(iter_encoded_items(), max_images, max_bytes),
+                                                submit_batch, max_pending=limiter.max_limit)
+
+            # 3단계: 배치 결과를 페이지별로 분배. 배치 안의 일시적 오류는 해당 페이지만 단건으로 재요청
+            future_to_single = {}
+            for future, batch in completed_batches:
+                batch_count += 1
+                batch_key = f"batch[{batch[0][0]}..{batch[-1][0]}]"
+                batch_retries = retry_policy.get_retry_count(batch_key)
+                try:
+                    outcomes = future.result()
+                    batch_failed = False
+                except JOB_ABORT_ERRORS:
+                    _cancel_pending(future_to_single)
+                    raise # _submit_bounded가 남은 배치 요청을 취소
+                except Exception as exc: # 재시도 후에도 요청 자체가 실패하면 배치 내 모든 페이지가 실패로 보고됨
+                    outcomes = [exc] * len(batch)
+                    batch_failed = True
+                for (identifier, image_data), outcome in zip(batch, outcomes):
+                    if isinstance(outcome, Exception) and not batch_failed and is_retryable_error(outcome):
+                        app_logger.warning(f"이미지 ID '{identifier}' 배치 내 일시적 오류, 단건 요청으로 재시도: {outcome}")
+                        single_future = executor.submit(call_vision_measured, identifier, detect_text_from_image, image_data)
+                        future_to_single[single_future] = (identifier, batch_retries + 1)
+                    else:
+                        _append_ocr_outcome(results, identifier, outcome, batch_retries, cache, cache_keys.get(identifier),
+                                            on_result)
+
+            for future in as_completed(future_to_single):
+                identifier, previous_retries = future_to_single[future]
+                try:
+                    outcome = future.result()
+                except JOB_ABORT_ERRORS:
+                    _cancel_pending(future_to_single)
+                    raise
+                except Exception as exc:
+                    outcome = exc
+                _append_ocr_outcome(results, identifier, outcome, previous_retries + retry_policy.get_retry_count(identifier),
+                                    cache, cache_keys.get(identifier), on_result)
+    finally:
+        cpu_executor.shutdown(wait=True, cancel_futures=True)
+    app_logger.info(f"batch_annotate_images 요청 {batch_count}개로 이미지 {len(results)}개 처리 (배치당 최대 {max_images}개, {max_bytes} 바이트). "
+                    f"최종 OCR 동시성 {limiter.limit}.")
+    cpu_stage.log_summary()
+    io_stage.log_summary()
+    encoding_policy.log_summary()
+    return results
+
+def _append_ocr_outcome(results, identifier, outcome, retries, cache=None, cache_key=None, on_result=None):
+    """
+    OCR 결과(텍스트 또는 예외)를 {'id', 'text', 'retries'} 형태로 results에 추가합니다.
+    예외이면 text는 빈 문자열이고 'error': True, 'error_message': 오류 메시지가 추가됩니다.
+    cache와 cache_key가 주어지면 성공한 텍스트를 캐시에 저장하고, on_result가 주어지면 추가한 결과로 호출합니다.
+    """
+    if isinstance(outcome, Exception):
+        app_logger.error(f"이미지 ID '{identifier}' 처리 중 오류: {outcome}")
+        _add_result(results, {'id': identifier, 'text': "", 'retries': retries, 'error': True, 'error_message': str(outcome)},
+                    on_result)
+    else:
+        if cache is not None and cache_key is not None:
+            cache.put(cache_key, outcome)
+        _add_result(results, {'id': identifier, 'text': outcome, 'retries': retries}, on_result)
+        app_logger.debug(f"이미지 ID '{identifier}' OCR 완료.")
+
+def ocr_pil_images_async(pil_images_with_identifiers, max_in_flight=None, on_result=None):
+    """
+    ocr_pil_images_batch와 같은 입력/출력 규약을 가진 asyncio 기반 OCR 엔진입니다.
+    스레드 수 대신 동시에 진행 중인 요청 수(max_in_flight)로 병렬성을 제한합니다.
+    이벤트 루프가 실행 중이지 않은 스레드(예: GUI 작업 스레드)에서 호출해야 합니다.
 
     Args:
         pil_images_with_identifiers (List[OcrInputItem]): OCR을 수행할 OcrInputItem 객체 리스트.
-                                                          id는 페이지 번호, 파일 경로 등이 될 수 있습니다.
+        max_in_flight (int, optional): 동시에 진행할 최대 요청 수. None이면 설정의 max_in_flight_requests 사용.
+        on_result (callable, optional): 이미지 하나의 결과가 나올 때마다 결과 딕셔너리를 인자로 호출됩니다.
 
     Returns:
         list: 각 요소가 {'id': 식별자, 'text': 추출된 텍스트} 형태인 딕셔너리 리스트.
-              오류 발생 시 text 필드에 오류 메시지가 포함될 수 있습니다.
     """
-    app_logger.info(f"총 {len(pil_images_with_identifiers)}개 이미지에 대한 배치 OCR 시작.")
+    max_in_flight = _resolve_max_in_flight(max_in_flight)
+    # 모자이크 요청도 같은 제한기를 쓰므로, 진행 중인 Vision 요청 수는 모두 합쳐 max_in_flight 이하
+    job = _OcrJob(create_ocr_limiter(max_in_flight))
+    return _ocr_with_mosaic_stage(
+        pil_images_with_identifiers,
+        lambda items, job, on_result: asyncio.run(ocr_pil_images_batch_async(items, max_in_flight, on_result, job=job)),
+        on_result, job)
+
+def _resolve_max_in_flight(max_in_flight):
+    """max_in_flight가 None이면 설정의 max_in_flight_requests를 사용합니다."""
+    if max_in_flight is None:
+        max_in_flight = config_manager.get("max_in_flight_requests")
+    return max(1, int(max_in_flight))
+
+async def ocr_pil_images_batch_async(pil_images_with_identifiers, max_in_flight=None, on_result=None, job=None):
+    """
+    ocr_pil_images_async의 코루틴 버전. 이미 실행 중인 이벤트 루프 안에서 사용할 수 있습니다.
+    입력은 리스트 또는 제너레이터일 수 있으며, 진행 중인 요청 슬롯이 빌 때마다 다음 항목을 꺼냅니다.
+    Vision 요청은 job의 동시성 제한기 슬롯을 점유한 상태로 보내므로, 같은 job을 쓰는 다른 경로(모자이크)와 상한을 나눠 씁니다.
+    job이 없으면 max_in_flight를 상한으로 하는 작업 자원을 새로 만들고, 끝나면 통계를 로그에 남깁니다.
+    """
+    max_in_flight = _resolve_max_in_flight(max_in_flight)
+    app_logger.info(f"비동기 OCR 시작 (max_in_flight={max_in_flight}).")
+
+    owns_job = job is None
+    job = job or _OcrJob(create_ocr_limiter(max_in_flight))
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_in_flight)
+    client = vision_client_provider.create_async_client()
+    limiter, retry_policy, cache, blank_detector = job.limiter, job.retry_policy, job.cache, job.blank_detector
+    encoding_policy = create_encoding_policy()
     results = []
-    
-    # process_page 함수는 (identifier, text)를 반환하도록 수정하거나,
-    # 여기서 identifier를 process_page에 전달하고 결과를 매핑해야 합니다.
-    # 현재 process_page는 (page_number, text)를 반환하므로, id를 page_number로 사용합니다.
-    
-    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
-        future_to_id = {executor.submit(process_page, item.image, item.id): item.id for item in pil_images_with_identifiers}
-        for future in as_completed(future_to_id):
-            identifier = future_to_id[future]
+    abort_errors = []
+    cpu_executor, cpu_workers = create_cpu_executor()
+    cpu_stage = StageUtilization("CPU(디코딩·인코딩)", cpu_workers)
+    io_stage = StageUtilization("네트워크(Vision API)", max_in_flight)
+
+    async def encode_in_cpu_stage(item):
+        # CPU 단계(프로세스 풀)에서 디코딩·빈 페이지 감지·인코딩. 취소되면 완료된 결과의 공유 메모리를 정리
+        future = cpu_executor.submit(encode_item_in_process, item, encoding_policy, blank_detector)
+        try:
+            result, worker_seconds, ink_stats = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(_discard_encoded_future)
+            raise
+        finally:
+            item.release()
+        cpu_stage.add_busy(worker_seconds)
+        if ink_stats is not None:
+            blank_detector.record(item.id, ink_stats)
+        if result is None: # 빈 페이지: OCR 요청 생략
+            return ink_stats
+        encoding_policy.record(item.id, result)
+        return import_payload(result.data)
+
+    async def detect_text_async(image_data):
+        try:
+            batch_response = await client.batch_annotate_images(requests=[_build_text_detection_request(image_data)])
+        except Exception as e:
+            raise OCRError(f"Google Vision API 오류: {e}") from e
+        return _text_from_annotate_response(batch_response.responses[0])
+
+    async def detect_text_limited(image_data):
+        async with limiter.slot_async():
+            return await detect_text_async(image_data)
+
+    async def ocr_one(item):
+        # 호출 전에 semaphore 슬롯을 점유한 상태이며, 끝나면 반환한다
+        try:
+            # 인코딩은 CPU 작업이므로 이벤트 루프를 막지 않도록 CPU 단계 실행기(프로세스 풀)에서 수행
+            image_data = await encode_in_cpu_stage(item)
+            if isinstance(image_data, PageInkStats):
+                _add_result(results, {'id': item.id, 'text': "", 'retries': 0, 'blank': True}, on_result)
+                return
+            cache_key = _cache_key_for(image_data) if cache is not None else None
+            text_content = cache.get(cache_key) if cache is not None else None
+            if text_content is None:
+                with io_stage.measure():
+                    text_content = await retry_policy.call_async(item.id, detect_text_limited, image_data)
+                if cache is not None:
+                    cache.put(cache_key, text_content)
+            _add_result(results, {'id': item.id, 'text': text_content, 'retries': retry_policy.get_retry_count(item.id)}, on_result)
+            app_logger.debug(f"이미지 ID '{item.id}' 비동기 OCR 완료.")
+        except JOB_ABORT_ERRORS as abort_exc:
+            abort_errors.append(abort_exc)
+        except Exception as exc:
+            app_logger.error(f"이미지 ID '{item.id}' 비동기 처리 중 오류: {exc}", exc_info=True)
+            _add_result(results, {'id': item.id, 'text': "", 'retries': retry_policy.get_retry_count(item.id),
+                                  'error': True, 'error_message': str(exc)}, on_result)
+        finally:
+            semaphore.release()
+
+    iterator = iter(pil_images_with_identifiers)
+    end_marker = object()
+    tasks = []
+    try:
+        while not abort_errors:
+            await semaphore.acquire()
+            # next()는 래스터화 대기 등으로 블로킹될 수 있으므로 스레드 풀에서 호출
+            try:
+                item = await loop.run_in_executor(None, next, iterator, end_marker)
+            except BaseException:
+                semaphore.release()
+                raise
+            if item is end_marker:
+                semaphore.release()
+                break
+            tasks.append(asyncio.ensure_future(ocr_one(item)))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # 입력 생성 중 오류 등으로 중단되면 진행 중인 작업을 정리
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        cpu_executor.shutdown(wait=False, cancel_futures=True)
+        transport = getattr(client, "transport", None)
+        if transport is not None and hasattr(transport, "close"):
             try:
-                _, text_content = future.result() # process_page는 (id, text) 반환
-                results.append({'id': identifier, 'text': text_content})
-                app_logger.debug(f"이미지 ID '{identifier}' OCR 완료.")
-            except Exception as exc:
-                app_logger.error(f"이미지 ID '{identifier}' 처리 중 오류: {exc}", exc_info=True)
-                results.append({'id': identifier, 'text': f"OCR Error for ID {identifier}: {exc}"}) # 오류 발생 시 텍스트에 명시
-    app_logger.info("배치 OCR 처리 완료.")
+                await transport.close()
+            except Exception as e:
+                app_logger.warning(f"비동기 Vision 클라이언트 종료 중 오류 (무시): {e}")
+    if abort_errors:
+        app_logger.error(f"비동기 OCR 작업 중단: {abort_errors[0].message}")
+        raise abort_errors[0]
+    app_logger.info(f"비동기 OCR 처리 완료: 총 {len(results)}개 이미지 (최종 OCR 동시성 {limiter.limit}).")
+    cpu_stage.log_summary()
+    io_stage.log_summary()
+    encoding_policy.log_summary()
+    if owns_job:
+        job.log_summary()
     return results
 
 if __name__ == "__main__":
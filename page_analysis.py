@@ -0,0 +1,393 @@
+"""
+OCR 전에 페이지 이미지를 가볍게 분석합니다.
+- 빈 페이지(백지, 간지, 거의 비어 있는 페이지) 감지: 축소한 그레이스케일 이미지의 잉크 비율, 밝기 표준편차, 연결 요소 수
+- 중복 페이지 감지: 지각 해시(pHash)의 해밍 거리로 후보를 찾고, 원본 해상도 픽셀 비교로 확인해 같은 페이지의 중복 스캔, 반복되는 판권 페이지 등을 묶음
+- 일러스트 페이지 분류: 채도, 에지 밀도, 텍스트 줄 투영 프로파일로 전면 삽화 페이지를 OCR 전에 골라냄
+"""
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+import cv2
+from PIL import Image
+from logger import app_logger
+from config_manager import config_manager
+
+# 분석용으로 축소할 긴 변의 픽셀 수 (블록 최솟값으로 축소하므로 가는 획의 작은 글자도 남음)
+ANALYSIS_LONGEST_SIDE = 512
+
+# 배경(종이) 밝기보다 이만큼 이상 어두운 픽셀을 잉크로 봄 (누렇게 바랜 종이, 스캔 노이즈 허용)
+INK_CONTRAST = 48
+
+# 이보다 작은 연결 요소는 먼지·스캔 노이즈로 보고 세지 않음 (축소된 이미지 기준 픽셀 수)
+MIN_COMPONENT_AREA = 3
+
+# 지각 해시 한 변의 크기 (hash_size² 비트). 8(64비트)은 본문 페이지끼리 너무 쉽게 겹치므로 16(256비트) 사용
+PERCEPTUAL_HASH_SIZE = 16
+
+# 중복 검사·일러스트 분류용 축소 이미지의 최대 변 길이 (텍스트 줄 사이 간격이 남는 크기)
+ANALYSIS_THUMBNAIL_SIZE = 1024
+
+# 중복 후보를 원본 해상도로 비교할 때 허용하는 어긋남(픽셀). 같은 페이지의 재스캔은 이 안에서 잉크가 겹침
+VERIFY_TOLERANCE_PIXELS = 2
+
+# 페이지 하나의 분석 결과. blank는 감지기 임계치 기준 빈 페이지 여부
+PageInkStats = namedtuple("PageInkStats", ["ink_ratio", "stddev", "components", "blank"])
+
+class BlankPageDetector:
+    """
+    빈 페이지 감지기.
+    잉크 비율이 max_ink_ratio 이하이고, 연결 요소 수가 max_components 이하이며,
+    밝기 표준편차가 max_stddev 이하(잉크로 잡히지 않는 흐린 글씨도 없음)일 때만 빈 페이지로 판정합니다.
+    dry_run이면 판정만 하고 OCR은 그대로 수행하며, 작업이 끝나면 건너뛰었을 페이지 목록을 보고합니다.
+    작업(job) 단위로 생성하며, 프로세스 풀 워커에서는 analyze()만 호출하고 결과는 부모 프로세스에서 record()로 모읍니다.
+    """
+    def __init__(self, max_ink_ratio=0.0003, max_components=2, max_stddev=4.0, dry_run=False):
+        """
+        Args:
+            max_ink_ratio (float): 빈 페이지로 볼 최대 잉크 픽셀 비율 (0.0~1.0).
+            max_components (int): 빈 페이지로 볼 최대 연결 요소(글자·얼룩 덩어리) 수.
+            max_stddev (float): 빈 페이지로 볼 최대 밝기 표준편차. 이보다 크면 흐린 내용이 있다고 보고 OCR.
+            dry_run (bool): True이면 판정 결과를 보고만 하고 페이지를 건너뛰지 않음.
+        """
+        self.max_ink_ratio = max_ink_ratio
+        self.max_components = max_components
+        self.max_stddev = max_stddev
+        self.dry_run = dry_run
+        self._lock = threading.Lock()
+        self.analyzed_pages = 0
+        self.blank_pages = [] # (페이지 식별자, PageInkStats)
+        self._skipped_labels = set()
+
+    def __getstate__(self):
+        # 프로세스 풀 워커로 보낼 때 잠금과 통계는 제외 (통계는 부모 프로세스에서 record()로 모음)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["blank_pages"] = []
+        state["_skipped_labels"] = set()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def analyze(self, page):
+        """
+        페이지 이미지를 분석합니다.
+
+        Args:
+            page (PIL.Image.Image): 페이지 이미지.
+
+        Returns:
+            PageInkStats: 잉크 비율, 밝기 표준편차, 연결 요소 수와 빈 페이지 여부.
+        """
+        gray = np.asarray(page.convert("L"), dtype=np.uint8)
+        factor = max(1, max(gray.shape) // ANALYSIS_LONGEST_SIDE)
+        if factor > 1:
+            # factor×factor 블록마다 가장 어두운 값으로 축소 (평균으로 축소하면 가는 획이 배경에 묻힘)
+            height, width = (gray.shape[0] // factor) * factor, (gray.shape[1] // factor) * factor
+            gray = gray[:height, :width].reshape(height // factor, factor, width // factor, factor).min(axis=(1, 3))
+        stddev = float(gray.std())
+        # 배경 밝기는 밝은 쪽 백분위수로 추정 (글자가 많아도 흔들리지 않음)
+        background = float(np.percentile(gray, 90))
+        ink = gray < (background - INK_CONTRAST)
+        ink_ratio = float(np.count_nonzero(ink)) / ink.size
+        components = 0
+        if ink_ratio:
+            count, _, stats, _ = cv2.connectedComponentsWithStats(ink.view(np.uint8), connectivity=8)
+            components = int(np.count_nonzero(stats[1:count, cv2.CC_STAT_AREA] >= MIN_COMPONENT_AREA))
+        blank = ink_ratio <= self.max_ink_ratio and components <= self.max_components and stddev <= self.max_stddev
+        return PageInkStats(ink_ratio, stddev, components, blank)
+
+    def skips(self, stats):
+        """분석 결과에 따라 OCR 요청을 생략할지 반환합니다 (드라이런이면 항상 False)."""
+        return stats.blank and not self.dry_run
+
+    def record(self, label, stats):
+        """분석 결과를 작업 통계에 반영합니다."""
+        with self._lock:
+            self.analyzed_pages += 1
+            if stats.blank:
+                self.blank_pages.append((label, stats))
+            if self.skips(stats):
+                self._skipped_labels.add(label)
+        if stats.blank:
+            action = "드라이런: OCR은 그대로 수행" if self.dry_run else "OCR 요청 생략"
+            app_logger.info(f"{label} 빈 페이지 감지 (잉크 {stats.ink_ratio * 100:.3f}%, 표준편차 {stats.stddev:.1f}, "
+                            f"연결 요소 {stats.components}개) - {action}")
+
+    def was_skipped(self, label):
+        """label 페이지가 빈 페이지로 판정되어 OCR 요청이 생략되었는지 반환합니다."""
+        with self._lock:
+            return label in self._skipped_labels
+
+    def log_summary(self):
+        """작업 전체의 빈 페이지 감지 결과를 로그에 남깁니다. 드라이런이면 건너뛰었을 페이지 목록을 보고합니다."""
+        with self._lock:
+            if not self.analyzed_pages:
+                return
+            labels = [label for label, _ in self.blank_pages]
+            analyzed_pages = self.analyzed_pages
+        try:
+            labels = sorted(labels) # 완료 순서가 아니라 페이지 순서로 보고
+        except TypeError:
+            pass
+        labels = [str(label) for label in labels]
+        if self.dry_run:
+            app_logger.info(f"빈 페이지 감지 드라이런 보고: {analyzed_pages}페이지 중 {len(labels)}페이지를 건너뛰었을 것 "
+                            f"(잉크 ≤ {self.max_ink_ratio * 100:.3f}%, 연결 요소 ≤ {self.max_components}개, "
+                            f"표준편차 ≤ {self.max_stddev}): {', '.join(labels) or '없음'}")
+        else:
+            app_logger.info(f"빈 페이지 감지 요약: {analyzed_pages}페이지 중 {len(labels)}페이지 OCR 요청 생략: "
+                            f"{', '.join(labels) or '없음'}")
+
+def create_blank_page_detector():
+    """설정을 바탕으로 작업 하나에 사용할 빈 페이지 감지기를 만듭니다. blank_page_detection이 False이면 None."""
+    if not config_manager.get("blank_page_detection"):
+        return None
+    return BlankPageDetector(
+        max_ink_ratio=config_manager.get("blank_page_max_ink_ratio"),
+        max_components=config_manager.get("blank_page_max_components"),
+        max_stddev=config_manager.get("blank_page_max_stddev"),
+        dry_run=config_manager.get("blank_page_dry_run"),
+    )
+
+def perceptual_hash(page, hash_size=PERCEPTUAL_HASH_SIZE):
+    """
+    페이지의 pHash를 계산합니다. 그레이스케일로 (hash_size*4)² 크기로 축소한 뒤 DCT의 저주파 hash_size×hash_size 계수를
+    중앙값과 비교한 비트열입니다. 재압축, 밝기 변화, 몇 픽셀의 어긋남에는 거의 변하지 않습니다.
+
+    Returns:
+        int: hash_size² 비트 해시.
+    """
+    sample_size = hash_size * 4
+    gray = np.asarray(page.convert("L").resize((sample_size, sample_size), Image.BILINEAR), dtype=np.float32)
+    low_frequencies = cv2.dct(gray)[:hash_size, :hash_size].ravel()
+    bits = low_frequencies > np.median(low_frequencies[1:]) # 직류 성분(평균 밝기)은 중앙값 계산에서 제외
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming_distance(hash_a, hash_b):
+    """두 해시의 서로 다른 비트 수."""
+    return bin(hash_a ^ hash_b).count("1")
+
+def load_analysis_thumbnail(image_path, size=ANALYSIS_THUMBNAIL_SIZE):
+    """
+    중복 검사·일러스트 분류용 축소 RGB 이미지를 불러옵니다.
+    JPEG은 draft 모드로 축소된 해상도에서 바로 디코딩하므로 전체 디코딩보다 훨씬 빠릅니다.
+    """
+    with Image.open(image_path) as img:
+        img.draft("RGB", (size, size))
+        thumbnail = img.convert("RGB")
+    thumbnail.thumbnail((size, size))
+    return thumbnail
+
+def _ink_mask(image_path, size=None):
+    """픽셀 비교용 잉크 마스크를 원본 해상도로 만듭니다 (size가 주어지면 그 크기로 맞춤)."""
+    with Image.open(image_path) as img:
+        gray = img.convert("L")
+    if size is not None and gray.size != size:
+        gray = gray.resize(size, Image.BILINEAR)
+    gray = np.asarray(gray, dtype=np.uint8)
+    background = float(np.percentile(gray, 90))
+    return gray < (background - INK_CONTRAST)
+
+def ink_mismatch_ratio(image_path_a, image_path_b, tolerance=VERIFY_TOLERANCE_PIXELS):
+    """
+    두 페이지 이미지를 원본 해상도에서 잉크 마스크로 비교해, 상대 페이지의 잉크 근처(tolerance 픽셀 이내)에 없는 잉크 픽셀의 비율을 반환합니다.
+    같은 페이지의 재스캔·재압축은 0에 가깝고, 배치만 비슷한 다른 페이지(다른 글자)는 크게 나옵니다.
+    가로세로 비율이 크게 다르면 1.0 (다른 페이지).
+    """
+    with Image.open(image_path_a) as img:
+        size = img.size
+    with Image.open(image_path_b) as img:
+        other_size = img.size
+    if abs(size[0] / size[1] - other_size[0] / other_size[1]) > 0.02:
+        return 1.0
+    ink_a = _ink_mask(image_path_a)
+    ink_b = _ink_mask(image_path_b, size)
+    total_ink = int(np.count_nonzero(ink_a)) + int(np.count_nonzero(ink_b))
+    if not total_ink:
+        return 0.0
+    kernel = np.ones((2 * tolerance + 1, 2 * tolerance + 1), np.uint8)
+    near_a = cv2.dilate(ink_a.view(np.uint8), kernel).astype(bool)
+    near_b = cv2.dilate(ink_b.view(np.uint8), kernel).astype(bool)
+    unmatched = int(np.count_nonzero(ink_a & ~near_b)) + int(np.count_nonzero(ink_b & ~near_a))
+    return unmatched / total_ink
+
+class PageDeduplicator:
+    """
+    작업(job) 안의 중복 페이지를 찾는 도구.
+    페이지마다 pHash를 계산해, 해밍 거리가 max_distance 이하인 대표 페이지 후보를 해시 밴드 색인으로 찾습니다
+    (해시를 max_distance + 1개 밴드로 나누면 거리가 max_distance 이하인 두 해시는 적어도 한 밴드가 같음 - 비둘기집 원리).
+    후보는 원본 해상도 잉크 마스크 비교(ink_mismatch_ratio)로 같은 페이지인지 확인한 뒤에만 대표의 식별자를 반환합니다
+    (대표의 OCR 결과를 재사용). 확인된 후보가 없으면 이 페이지가 새 그룹의 대표가 됩니다.
+    짧은 장 끝 페이지처럼 해시가 거의 같은 다른 페이지가 다른 페이지의 텍스트를 받지 않도록, 픽셀 확인 없이는 중복으로 보지 않습니다.
+    """
+    def __init__(self, max_distance=12, hash_size=PERCEPTUAL_HASH_SIZE, max_mismatch=0.02, max_verifications=3):
+        """
+        Args:
+            max_distance (int): 후보로 볼 최대 해밍 거리 (hash_size² 비트 중). 0이면 해시가 완전히 같은 페이지만.
+            hash_size (int): 지각 해시 한 변의 크기.
+            max_mismatch (float): 같은 페이지로 볼 최대 잉크 불일치 비율 (ink_mismatch_ratio 기준).
+            max_verifications (int): 페이지 하나에 대해 픽셀 비교할 최대 후보 수 (가까운 후보부터).
+        """
+        self.max_distance = max(0, int(max_distance))
+        self.hash_size = hash_size
+        self.max_mismatch = max_mismatch
+        self.max_verifications = max(1, int(max_verifications))
+        hash_bits = hash_size * hash_size
+        band_count = min(self.max_distance + 1, hash_bits)
+        # (시프트, 마스크) 밴드 목록. 비트를 최대한 고르게 나눔
+        self._bands = []
+        position = 0
+        for index in range(band_count):
+            width = hash_bits // band_count + (1 if index < hash_bits % band_count else 0)
+            self._bands.append((position, (1 << width) - 1))
+            position += width
+        self._band_index = [{} for _ in self._bands] # 밴드별 {밴드 값: [대표 번호]}
+        self._representatives = [] # (해시, 대표 페이지 식별자, 이미지 경로)
+        self.group_sizes = {} # 대표 페이지 식별자 -> 그룹의 페이지 수
+        self.hash_seconds = 0.0
+        self.verify_seconds = 0.0
+        self.rejected_candidates = 0 # 해시는 가까웠지만 픽셀 비교에서 다른 페이지로 확인된 후보 수
+
+    def _candidates(self, page_hash):
+        """밴드 색인에서 해밍 거리가 max_distance 이하인 대표 번호를 가까운 순서로 반환합니다."""
+        indices = set()
+        for (shift, mask), index in zip(self._bands, self._band_index):
+            indices.update(index.get((page_hash >> shift) & mask, ()))
+        candidates = []
+        for number in indices:
+            distance = hamming_distance(page_hash, self._representatives[number][0])
+            if distance <= self.max_distance:
+                candidates.append((distance, number))
+        candidates.sort()
+        return [number for _, number in candidates]
+
+    def _same_page(self, image_path, representative_path):
+        if not image_path or not representative_path:
+            return False
+        start_time = time.perf_counter()
+        try:
+            return ink_mismatch_ratio(image_path, representative_path) <= self.max_mismatch
+        except Exception as e:
+            app_logger.warning(f"중복 페이지 픽셀 비교 실패 '{image_path}' / '{representative_path}' (중복 아님으로 처리): {e}")
+            return False
+        finally:
+            self.verify_seconds += time.perf_counter() - start_time
+
+    def find_representative(self, label, page, image_path=None):
+        """
+        page와 같은 대표 페이지의 식별자를 반환합니다. 없으면 label을 새 대표로 등록하고 None을 반환합니다.
+        해시를 계산할 수 없는 페이지는 중복 검사 없이 None을 반환합니다.
+
+        Args:
+            label: 페이지 식별자.
+            page (PIL.Image.Image): 페이지 이미지 (load_analysis_thumbnail()의 축소 이미지면 충분).
+            image_path (str, optional): 픽셀 비교에 쓸 원본 해상도 이미지 파일. 없으면 중복으로 판정하지 않음.
+        """
+        start_time = time.perf_counter()
+        try:
+            page_hash = perceptual_hash(page, self.hash_size)
+        except Exception as e:
+            app_logger.warning(f"{label} 페이지 해시 계산 실패, 중복 검사 생략: {e}")
+            return None
+        finally:
+            self.hash_seconds += time.perf_counter() - start_time
+        for number in self._candidates(page_hash)[:self.max_verifications]:
+            _, representative, representative_path = self._representatives[number]
+            if self._same_page(image_path, representative_path):
+                self.group_sizes[representative] += 1
+                return representative
+            self.rejected_candidates += 1
+            app_logger.info(f"{label} 페이지는 {representative} 페이지와 해시가 비슷하지만 픽셀 비교 결과 다른 페이지 (OCR 수행)")
+        number = len(self._representatives)
+        self._representatives.append((page_hash, label, image_path))
+        for (shift, mask), index in zip(self._bands, self._band_index):
+            index.setdefault((page_hash >> shift) & mask, []).append(number)
+        self.group_sizes[label] = 1
+        return None
+
+    def duplicate_groups(self):
+        """페이지가 둘 이상인 그룹 수."""
+        return sum(1 for size in self.group_sizes.values() if size > 1)
+
+def create_page_deduplicator():
+    """설정을 바탕으로 작업 하나에 사용할 중복 페이지 감지기를 만듭니다. page_dedup_enabled가 False이면 None."""
+    if not config_manager.get("page_dedup_enabled"):
+        return None
+    return PageDeduplicator(max_distance=config_manager.get("page_dedup_max_distance"),
+                            max_mismatch=config_manager.get("page_dedup_max_mismatch"))
+
+# 일러스트 분류 결과. confidence는 일러스트일 가능성(0.0~1.0), 나머지는 판단에 쓴 특징값
+IllustrationScore = namedtuple("IllustrationScore", ["confidence", "saturation", "coverage", "edge_density", "text_likeness"])
+
+class IllustrationClassifier:
+    """
+    OCR 전에 전면 삽화 페이지를 골라내는 가벼운 분류기.
+    시각적 내용의 양(채도 높은 픽셀 비율, 어두운 면적 비율, 에지 밀도 중 가장 강한 신호)에,
+    텍스트 줄 모양(가로·세로 투영 프로파일에서 짧은 잉크 구간이 규칙적으로 반복되는 정도)이 아닐수록 높은 점수를 줍니다.
+    confidence가 min_confidence 이상이면 일러스트로 판정합니다.
+    """
+    def __init__(self, min_confidence=0.75):
+        """
+        Args:
+            min_confidence (float): 일러스트로 판정할 최소 confidence (0.0~1.0).
+        """
+        self.min_confidence = min_confidence
+        self.seconds = 0.0
+
+    def score(self, page):
+        """
+        페이지 이미지의 일러스트 점수를 계산합니다.
+
+        Args:
+            page (PIL.Image.Image): 페이지 이미지 (load_analysis_thumbnail()의 축소 이미지면 충분).
+
+        Returns:
+            IllustrationScore: confidence와 특징값.
+        """
+        rgb = np.asarray(page.convert("RGB"), dtype=np.uint8)
+        hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)
+        saturation = float(np.count_nonzero((hsv[..., 1] > 64) & (hsv[..., 2] > 48))) / hsv[..., 0].size
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        background = float(np.percentile(gray, 90))
+        ink = gray < (background - INK_CONTRAST)
+        coverage = float(np.count_nonzero(ink)) / ink.size
+        edge_density = float(np.count_nonzero(cv2.Canny(gray, 80, 160))) / gray.size
+        text_likeness = max(_text_line_likeness(ink.mean(axis=1)), _text_line_likeness(ink.mean(axis=0)))
+        visual_mass = max(min(1.0, saturation / 0.10), min(1.0, coverage / 0.30), min(1.0, edge_density / 0.10))
+        return IllustrationScore(visual_mass * (1.0 - text_likeness), saturation, coverage, edge_density, text_likeness)
+
+    def classify(self, label, page):
+        """페이지를 분류하고 로그에 남깁니다. 일러스트로 판정되면 True."""
+        start_time = time.perf_counter()
+        result = self.score(page)
+        self.seconds += time.perf_counter() - start_time
+        is_illustration = result.confidence >= self.min_confidence
+        app_logger.debug(f"{label} 일러스트 분류: 점수 {result.confidence:.2f} (채도 {result.saturation:.3f}, 면적 {result.coverage:.3f}, "
+                         f"에지 {result.edge_density:.3f}, 텍스트 줄 {result.text_likeness:.2f}) -> "
+                         f"{'일러스트' if is_illustration else '본문'}")
+        return is_illustration
+
+def _text_line_likeness(profile):
+    """
+    한 축의 잉크 투영 프로파일이 텍스트 줄처럼 보이는 정도 (0.0~1.0).
+    잉크가 있는 구간(줄)과 빈 구간(줄 간격)이 번갈아 나타나고, 각 잉크 구간이 내용 범위에 비해 짧을수록 텍스트에 가깝습니다.
+    """
+    filled = profile > 0.005
+    filled_indices = np.flatnonzero(filled)
+    if filled_indices.size == 0:
+        return 0.0
+    content = filled[filled_indices[0]:filled_indices[-1] + 1]
+    # 잉크 구간의 시작/끝 위치로 구간 길이 계산
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], content.view(np.int8), [0]))))
+    run_lengths = edges[1::2] - edges[::2]
+    short_runs = int(np.count_nonzero(run_lengths < max(2, content.size * 0.08)))
+    return min(1.0, short_runs / 8.0) * (short_runs / float(run_lengths.size))
+
+def create_illustration_classifier():
+    """설정을 바탕으로 일러스트 자동 분류기를 만듭니다. illustration_auto_detect가 False이면 None."""
+    if not config_manager.get("illustration_auto_detect"):
+        return None
+    return IllustrationClassifier(min_confidence=config_manager.get("illustration_min_confidence"))
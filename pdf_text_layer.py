@@ -0,0 +1,82 @@
+"""
+PDF에 이미 들어 있는 텍스트 레이어를 poppler의 pdftotext로 읽고 품질을 평가해, OCR이 필요 없는 페이지를 골라냅니다.
+"""
+import shutil
+import subprocess
+import unicodedata
+from logger import app_logger
+from config_manager import config_manager
+from exceptions import OCRError
+
+# 텍스트 레이어 품질을 떨어뜨리는 문자: 대체 문자(깨진 인코딩), 제어 문자, 사용자 정의 영역(매핑 없는 글꼴)
+_GARBLED_CATEGORIES = ("Cc", "Co", "Cs", "Cn")
+
+def is_pdftotext_available():
+    return shutil.which("pdftotext") is not None
+
+def run_pdftotext(pdf_path, first_page=None, last_page=None):
+    """
+    pdftotext로 PDF의 텍스트 레이어를 읽어 반환합니다 (레이아웃 유지). 페이지는 폼 피드(\\f)로 구분됩니다.
+
+    Raises:
+        OCRError: pdftotext가 없거나 실행에 실패한 경우.
+    """
+    if not is_pdftotext_available():
+        raise OCRError("pdftotext(poppler)를 찾을 수 없습니다.")
+    command = ["pdftotext", "-layout", "-enc", "UTF-8"]
+    if first_page:
+        command += ["-f", str(first_page)]
+    if last_page:
+        command += ["-l", str(last_page)]
+    try:
+        completed = subprocess.run(command + [pdf_path, "-"], capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise OCRError(f"pdftotext 실행 실패 ({pdf_path}): {e.stderr.decode('utf-8', errors='replace')}")
+    return completed.stdout.decode("utf-8", errors="replace")
+
+def score_text_quality(text, min_chars):
+    """
+    텍스트 레이어의 품질 점수(0.0~1.0)를 계산합니다.
+    공백을 제외한 문자 중 정상 문자(글자, 숫자, 문장 부호, 기호)의 비율에,
+    글자 수가 min_chars보다 적으면 그 비율만큼 감점한 값입니다 (스캔 페이지의 쪽번호/머리글만 있는 경우 등).
+    """
+    characters = [ch for ch in text if not ch.isspace()]
+    if not characters:
+        return 0.0
+    garbled = sum(1 for ch in characters if ch == "�" or unicodedata.category(ch) in _GARBLED_CATEGORIES)
+    valid_ratio = 1.0 - garbled / len(characters)
+    length_factor = min(1.0, len(characters) / float(max(1, min_chars)))
+    return valid_ratio * length_factor
+
+def find_text_layer_pages(pdf_path, min_score=None, min_chars=None):
+    """
+    텍스트 레이어가 OCR을 대신할 만큼 쓸 만한 페이지를 찾습니다.
+
+    Args:
+        pdf_path (str): PDF 파일 경로.
+        min_score (float, optional): 이 점수 이상인 페이지만 사용. None이면 설정의 pdf_text_layer_min_score.
+        min_chars (int, optional): 품질 점수 계산 시 기준 글자 수. None이면 설정의 pdf_text_layer_min_chars.
+
+    Returns:
+        dict: {페이지 번호(1부터 시작): 텍스트}. pdftotext를 쓸 수 없거나 실패하면 빈 딕셔너리 (모든 페이지 OCR).
+    """
+    min_score = config_manager.get("pdf_text_layer_min_score") if min_score is None else min_score
+    min_chars = config_manager.get("pdf_text_layer_min_chars") if min_chars is None else min_chars
+    if not is_pdftotext_available():
+        app_logger.info("pdftotext(poppler)를 찾을 수 없어 텍스트 레이어 사전 확인을 건너뜁니다.")
+        return {}
+    try:
+        document_text = run_pdftotext(pdf_path)
+    except OCRError as e:
+        app_logger.warning(f"텍스트 레이어 사전 확인 실패, 모든 페이지를 OCR합니다: {e}")
+        return {}
+    usable_pages = {}
+    # pdftotext는 각 페이지 끝에 폼 피드를 붙이므로 마지막 조각은 비어 있음
+    for page_number, page_text in enumerate(document_text.split("\f")[:-1] or [document_text], start=1):
+        score = score_text_quality(page_text, min_chars)
+        if score >= min_score:
+            usable_pages[page_number] = page_text.strip("\n")
+        app_logger.debug(f"{page_number} 페이지 텍스트 레이어 품질 점수 {score:.2f} ({'사용' if score >= min_score else 'OCR 필요'})")
+    app_logger.info(f"텍스트 레이어 사전 확인: '{pdf_path}'에서 {len(usable_pages)}개 페이지는 OCR 없이 텍스트 레이어 사용 "
+                    f"(기준 점수 {min_score}).")
+    return usable_pages
@@ -0,0 +1,258 @@
+"""
+OCR 파이프라인을 CPU 단계(이미지 디코딩·전처리·인코딩, 프로세스 풀)와 네트워크 단계(Vision API 호출, 스레드)로 나누는 데 필요한 도구를 정의합니다.
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from logger import app_logger
+from config_manager import config_manager
+
+# 이 크기 이상인 인코딩 결과는 파이프 대신 공유 메모리로 부모 프로세스에 전달
+SHARED_MEMORY_MIN_BYTES = 64 * 1024
+
+class SharedPayload:
+    """공유 메모리 블록에 담긴 인코딩 결과에 대한 핸들. 부모 프로세스에서 import_payload()로 바이트를 꺼내고 블록을 해제합니다."""
+    __slots__ = ('name', 'size')
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+    def __getstate__(self):
+        return (self.name, self.size)
+
+    def __setstate__(self, state):
+        self.name, self.size = state
+
+def export_payload(data):
+    """
+    워커 프로세스에서 인코딩된 바이트를 부모에게 넘길 형태로 바꿉니다.
+    큰 결과는 공유 메모리 블록에 쓰고 핸들만 반환하며, 작은 결과나 공유 메모리를 쓸 수 없는 경우에는 바이트를 그대로 반환합니다.
+    """
+    # Windows의 공유 메모리는 마지막 핸들이 닫히면 사라지므로 POSIX에서만 사용
+    if os.name != "posix" or len(data) < SHARED_MEMORY_MIN_BYTES:
+        return data
+    try:
+        block = _create_untracked_block(len(data))
+    except OSError:
+        return data
+    block.buf[:len(data)] = data
+    name = block.name
+    block.close()
+    return SharedPayload(name, len(data))
+
+def _create_untracked_block(size):
+    """
+    워커의 리소스 추적기에 등록되지 않은 공유 메모리 블록을 만듭니다.
+    추적기에 남아 있으면 워커 프로세스가 끝날 때 부모가 아직 읽지 않은 블록을 unlink하고 경고를 남기므로,
+    블록의 해제 책임을 부모 프로세스(import_payload/discard_payload)에 넘기기 위해 추적에서 제외합니다.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    # 추적기는 POSIX 이름(앞에 '/'가 붙은 이름)으로 등록하며, block.name은 '/'를 뗀 이름을 반환
+    resource_tracker.unregister("/" + block.name, "shared_memory")
+    return block
+
+def import_payload(payload):
+    """export_payload()의 결과를 바이트로 되돌립니다. 공유 메모리 블록은 읽은 뒤 바로 해제합니다."""
+    if not isinstance(payload, SharedPayload):
+        return payload
+    block = shared_memory.SharedMemory(name=payload.name)
+    try:
+        return bytes(block.buf[:payload.size])
+    finally:
+        block.close()
+        block.unlink()
+
+def discard_payload(payload):
+    """소비되지 않은 인코딩 결과의 공유 메모리 블록을 해제합니다 (작업이 중단된 경우)."""
+    if isinstance(payload, SharedPayload):
+        try:
+            block = shared_memory.SharedMemory(name=payload.name)
+            block.close()
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+def encode_item_in_process(item, encoding_policy, blank_detector=None):
+    """
+    CPU 단계 작업 함수 (프로세스 풀 워커에서 실행).
+    OcrInputItem의 이미지를 디코딩하고 인코딩 정책에 따라 전처리·인코딩한 뒤,
+    data를 export_payload()로 바꾼 EncodeResult를 반환합니다. 통계 기록은 부모 프로세스에서 합니다.
+    blank_detector가 주어지면 인코딩 전에 빈 페이지인지 분석하고, OCR을 생략할 페이지는 인코딩하지 않습니다.
+
+    Returns:
+        tuple: (EncodeResult 또는 인코딩을 생략한 경우 None, 디코딩을 포함한 워커 작업 시간(초), PageInkStats 또는 None)
+    """
+    start_time = time.perf_counter()
+    ink_stats = None
+    try:
+        page = item.load_image()
+        if blank_detector is not None:
+            ink_stats = blank_detector.analyze(page)
+            if blank_detector.skips(ink_stats):
+                return None, time.perf_counter() - start_time, ink_stats
+        result = encoding_policy.encode_page(page)
+    finally:
+        item.release()
+    return result._replace(data=export_payload(result.data)), time.perf_counter() - start_time, ink_stats
+
+class StageUtilization:
+    """
+    파이프라인 단계 하나의 가동률을 측정합니다.
+    가동률 = 워커들이 작업에 쓴 시간의 합 / (단계 경과 시간 × 워커 수).
+    """
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self._lock = threading.Lock()
+        self._start_time = time.monotonic()
+        self.busy_seconds = 0.0
+        self.tasks = 0
+
+    def add_busy(self, seconds):
+        """작업 하나에 걸린 시간을 더합니다."""
+        with self._lock:
+            self.busy_seconds += seconds
+            self.tasks += 1
+
+    @contextmanager
+    def measure(self):
+        """블록 실행 시간을 작업 시간으로 더하는 컨텍스트 관리자."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_busy(time.perf_counter() - start_time)
+
+    def log_summary(self):
+        """단계의 작업 수, 워커 수, 가동률을 로그에 남깁니다."""
+        elapsed = time.monotonic() - self._start_time
+        with self._lock:
+            utilization = self.busy_seconds / (elapsed * self.workers) * 100 if elapsed > 0 else 0.0
+            app_logger.info(f"{self.name} 단계 요약: 작업 {self.tasks}개, 워커 {self.workers}개, "
+                            f"작업 시간 {self.busy_seconds:.2f}초 / 경과 {elapsed:.2f}초 (가동률 {utilization:.1f}%)")
+
+class OrderedPageWriter:
+    """
+    출력 단계의 재정렬 버퍼. 페이지 결과를 완료된 순서대로 받아, 앞선 페이지가 모두 준비된 만큼만 페이지 순서대로 파일에 씁니다.
+    아직 쓸 수 없는 페이지만 메모리에 보관하며, flush_seconds마다 파일을 flush해 긴 작업 중에도 부분 결과를 읽을 수 있게 합니다.
+    """
+    def __init__(self, text_file, first_page=1, flush_seconds=2.0):
+        """
+        Args:
+            text_file: 텍스트 모드로 열린 출력 파일.
+            first_page (int): 처음 쓸 페이지 번호.
+            flush_seconds (float): flush 간격(초). 0이면 페이지를 쓸 때마다 flush.
+        """
+        self.text_file = text_file
+        self.next_page = first_page
+        self.flush_seconds = flush_seconds
+        self._buffer = {}
+        self._last_flush = time.monotonic()
+        self.pages_written = 0
+        self.peak_buffered = 0
+
+    def add(self, page_number, text):
+        """완료된 페이지 결과를 받아, 이어서 쓸 수 있는 페이지를 모두 씁니다."""
+        self._buffer[page_number] = text
+        self.peak_buffered = max(self.peak_buffered, len(self._buffer))
+        wrote = False
+        while self.next_page in self._buffer:
+            self._write(self.next_page, self._buffer.pop(self.next_page))
+            self.next_page += 1
+            wrote = True
+        if wrote and time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def _write(self, page_number, text):
+        self.text_file.write(f"\n--- Page {page_number} ---\n")
+        self.text_file.write(text)
+        self.text_file.write("\n\n")
+        self.pages_written += 1
+
+    def flush(self):
+        self.text_file.flush()
+        self._last_flush = time.monotonic()
+
+    def finish(self):
+        """남은 페이지를 페이지 순서대로 모두 쓰고 (빠진 페이지가 있으면 경고) flush한 뒤, 버퍼 사용량을 로그에 남깁니다."""
+        if self._buffer:
+            app_logger.warning(f"출력 재정렬: {self.next_page} 페이지 결과가 없어 남은 {len(self._buffer)}개 페이지를 순서대로 씁니다.")
+            for page_number in sorted(self._buffer):
+                self._write(page_number, self._buffer.pop(page_number))
+        self.flush()
+        app_logger.info(f"출력 재정렬 버퍼 요약: {self.pages_written}개 페이지 기록, 최대 {self.peak_buffered}개 페이지 대기.")
+
+class PageReorderBuffer:
+    """
+    여러 스레드가 페이지 번호 자리에 넣은 아이템을, 앞선 페이지가 모두 준비되는 대로 페이지 순서로 꺼내 주는 스레드 안전 재정렬 버퍼.
+    생산자는 buffer[페이지 번호] = 아이템으로 넣고 끝나면 close()를, 실패하면 fail(예외)를 호출합니다.
+    소비자는 버퍼를 순회하며, close() 이후에는 비어 있는 번호를 건너뜁니다.
+    """
+    def __init__(self, first_page=1):
+        self._condition = threading.Condition()
+        self._items = {}
+        self._next_page = first_page
+        self._closed = False
+        self._error = None
+        self.peak_buffered = 0
+
+    def __setitem__(self, page_number, item):
+        with self._condition:
+            self._items[page_number] = item
+            self.peak_buffered = max(self.peak_buffered, len(self._items))
+            if page_number == self._next_page:
+                self._condition.notify_all()
+
+    def close(self):
+        """더 넣을 아이템이 없음을 알립니다. 남은 아이템은 비어 있는 번호를 건너뛰며 꺼낼 수 있습니다."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def fail(self, error):
+        """생산자 쪽 오류를 소비자에게 전달합니다 (순회 중인 소비자에서 error가 발생)."""
+        with self._condition:
+            self._error = error
+            self._condition.notify_all()
+
+    def __iter__(self):
+        while True:
+            with self._condition:
+                while self._error is None and self._next_page not in self._items and not self._closed:
+                    self._condition.wait()
+                if self._error is not None:
+                    raise self._error
+                if self._next_page not in self._items:
+                    if not self._items: # 닫혔고 남은 아이템 없음
+                        return
+                    self._next_page = min(self._items) # 닫힌 뒤 비어 있는 번호 건너뜀
+                page_number = self._next_page
+                item = self._items.pop(page_number)
+                self._next_page = page_number + 1
+            yield item
+
+def get_cpu_worker_count():
+    """CPU 단계 워커 수. 설정의 ocr_cpu_workers가 없으면 CPU 코어 수를 사용합니다."""
+    return max(1, int(config_manager.get("ocr_cpu_workers") or os.cpu_count() or 1))
+
+def create_cpu_executor():
+    """
+    CPU 단계용 실행기를 만듭니다. ocr_use_process_pool이 False이면 (프로세스를 만들 수 없는 환경 등) 스레드 풀을 사용합니다.
+
+    Returns:
+        tuple: (Executor, 워커 수)
+    """
+    workers = get_cpu_worker_count()
+    if config_manager.get("ocr_use_process_pool"):
+        try:
+            return ProcessPoolExecutor(max_workers=workers), workers
+        except (OSError, NotImplementedError) as e:
+            app_logger.warning(f"프로세스 풀을 만들 수 없어 CPU 단계를 스레드 풀로 실행합니다: {e}")
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-cpu"), workers
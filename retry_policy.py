@@ -0,0 +1,244 @@
+"""
+일시적인 Google Vision API 오류에 대한 재시도(지수 백오프 + 지터)와 서킷 브레이커를 정의합니다.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from google.api_core import exceptions as google_exceptions
+from logger import app_logger
+from config_manager import config_manager
+from exceptions import OCRCircuitOpenError, OCRDeadlineExceededError
+from concurrency_limiter import iter_exception_chain
+
+# 다시 시도하면 성공할 수 있는 일시적 오류 (UNAVAILABLE, RESOURCE_EXHAUSTED 등)
+RETRYABLE_ERROR_TYPES = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.Aborted,
+    ConnectionError,
+    TimeoutError,
+)
+
+def is_retryable_error(exc):
+    """예외 체인에 일시적 오류가 포함되어 있으면 True, 그 외(인증 실패, 잘못된 요청 등)는 치명적 오류로 보고 False."""
+    if isinstance(exc, (OCRCircuitOpenError, OCRDeadlineExceededError)):
+        return False
+    return any(isinstance(e, RETRYABLE_ERROR_TYPES) for e in iter_exception_chain(exc))
+
+class CircuitBreaker:
+    """
+    최근 호출들의 오류율이 임계치를 넘으면 열려(open) 대기 시간 동안 호출을 멈추게 하는 서킷 브레이커.
+    대기 시간이 지나면 시험 호출 하나를 허용(half-open)하고, 성공하면 다시 닫힙니다.
+    시험 호출이 max_failed_trials회 연속 실패하면 API가 회복되지 않는 것으로 보고 호출을 거부해 작업을 중단시킵니다.
+    """
+    def __init__(self, window_size=20, failure_rate_threshold=0.5, cooldown_seconds=30.0, min_calls=5,
+                 max_failed_trials=3, trial_poll_seconds=0.5):
+        self.window_size = window_size
+        self.failure_rate_threshold = failure_rate_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.min_calls = min_calls
+        self.max_failed_trials = max(1, int(max_failed_trials))
+        self.trial_poll_seconds = trial_poll_seconds # 다른 호출의 시험 결과를 기다릴 때 상태를 다시 확인하는 간격
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size) # True=성공, False=실패
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._failed_trials = 0
+
+    def before_call(self):
+        """
+        호출 전에 확인합니다.
+
+        Returns:
+            tuple: (대기 시간(초), 시험 호출 여부). 대기 시간이 0보다 크면 그만큼 기다린 뒤 다시 확인해야 합니다.
+                   시험 호출 여부는 호출 결과를 record_success/record_failure/abandon_trial에 넘길 때 사용합니다.
+
+        Raises:
+            OCRCircuitOpenError: 시험 호출이 연속으로 실패해 더 이상 호출하지 않을 때.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0, False
+            if self._failed_trials >= self.max_failed_trials:
+                raise OCRCircuitOpenError(f"서킷 브레이커 시험 호출이 {self._failed_trials}회 연속 실패해 Vision API 호출을 중단했습니다.")
+            remaining = self.cooldown_seconds - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                return remaining, False
+            if self._trial_in_progress:
+                return self.trial_poll_seconds, False
+            self._trial_in_progress = True # half-open: 시험 호출 하나만 허용
+            app_logger.info("서킷 브레이커 half-open: 시험 호출 허용.")
+            return 0.0, True
+
+    def record_success(self, trial=False):
+        with self._lock:
+            if self._opened_at is not None:
+                if trial:
+                    app_logger.info("서킷 브레이커 닫힘: 시험 호출 성공.")
+                    self._opened_at = None
+                    self._trial_in_progress = False
+                    self._failed_trials = 0
+                    self._outcomes.clear()
+                return # 열리기 전에 시작된 호출의 결과는 반영하지 않음
+            self._outcomes.append(True)
+
+    def record_failure(self, trial=False):
+        """일시적 오류로 실패한 호출을 기록합니다. 치명적 오류(잘못된 요청 등)는 API 상태와 무관하므로 기록하지 않습니다."""
+        with self._lock:
+            if self._opened_at is not None:
+                if trial:
+                    # half-open 시험 호출 실패 → 다시 열림
+                    self._opened_at = time.monotonic()
+                    self._trial_in_progress = False
+                    self._failed_trials += 1
+                    app_logger.warning(f"서킷 브레이커 다시 열림: 시험 호출 실패 ({self._failed_trials}/{self.max_failed_trials}).")
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate_threshold:
+                self._opened_at = time.monotonic()
+                app_logger.error(f"서킷 브레이커 열림: 최근 {len(self._outcomes)}회 호출 중 {failures}회 실패. "
+                                 f"{self.cooldown_seconds}초 동안 호출을 멈춘 뒤 시험 호출합니다.")
+
+    def abandon_trial(self):
+        """시험 호출이 API 상태를 판단할 수 없는 오류(치명적 오류)로 끝났을 때, 다른 호출이 다시 시험하도록 합니다."""
+        with self._lock:
+            self._trial_in_progress = False
+
+class RetryPolicy:
+    """
+    일시적 오류를 지수 백오프와 지터(full jitter)로 재시도하는 정책.
+    하나의 작업(job) 단위로 생성하며, 작업 전체 기한과 서킷 브레이커, 페이지(키)별 재시도 횟수를 함께 관리합니다.
+    """
+    def __init__(self, max_attempts=5, initial_delay=1.0, max_delay=30.0, multiplier=2.0,
+                 job_deadline_seconds=None, circuit_breaker=None):
+        """
+        Args:
+            max_attempts (int): 최초 시도를 포함한 최대 시도 횟수.
+            initial_delay (float): 첫 재시도 전 최대 대기 시간(초).
+            max_delay (float): 재시도 간 최대 대기 시간(초).
+            multiplier (float): 재시도마다 대기 시간 상한에 곱할 배수.
+            job_deadline_seconds (float, optional): 작업 전체 기한(초). 지나면 더 이상 재시도하지 않음. None이면 제한 없음.
+            circuit_breaker (CircuitBreaker, optional): 오류율 급증 시 호출을 차단할 서킷 브레이커.
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.deadline = time.monotonic() + job_deadline_seconds if job_deadline_seconds else None
+        self.circuit_breaker = circuit_breaker
+        self._lock = threading.Lock()
+        self.retry_counts = {} # 키(페이지 ID 등)별 재시도 횟수
+
+    def call(self, key, func, *args):
+        """
+        func(*args)를 호출하고, 일시적 오류가 발생하면 정책에 따라 재시도합니다.
+        서킷 브레이커가 열려 있으면 대기 시간이 지날 때까지 기다린 뒤 호출합니다 (기다리는 동안은 시도 횟수에 포함되지 않음).
+        """
+        attempt = 1
+        while True:
+            wait, trial = self._before_attempt(key)
+            if wait:
+                time.sleep(wait)
+                continue
+            try:
+                result = func(*args)
+            except Exception as exc:
+                delay = self._after_failure(key, attempt, exc, trial)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._after_success(trial)
+            return result
+
+    async def call_async(self, key, coro_func, *args):
+        """call()의 비동기 버전. await coro_func(*args)를 재시도합니다."""
+        attempt = 1
+        while True:
+            wait, trial = self._before_attempt(key)
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                result = await coro_func(*args)
+            except Exception as exc:
+                delay = self._after_failure(key, attempt, exc, trial)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._after_success(trial)
+            return result
+
+    def get_retry_count(self, key):
+        with self._lock:
+            return self.retry_counts.get(key, 0)
+
+    def log_summary(self):
+        """재시도가 발생한 키들과 재시도 횟수를 로그에 남깁니다."""
+        with self._lock:
+            retried = {key: count for key, count in self.retry_counts.items() if count}
+        if retried:
+            app_logger.info(f"재시도 요약: {len(retried)}개 항목에서 총 {sum(retried.values())}회 재시도. 항목별: {retried}")
+        else:
+            app_logger.info("재시도 요약: 재시도 없음.")
+
+    def _before_attempt(self, key):
+        """시도 전에 작업 기한과 서킷 브레이커를 확인합니다. (대기 시간, 시험 호출 여부)를 반환합니다."""
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise OCRDeadlineExceededError("OCR 작업 기한을 초과했습니다.")
+        if not self.circuit_breaker:
+            return 0.0, False
+        wait, trial = self.circuit_breaker.before_call()
+        if wait and self.deadline is not None and time.monotonic() + wait >= self.deadline:
+            raise OCRDeadlineExceededError(f"서킷 브레이커가 OCR 작업 기한 내에 닫히지 않아 '{key}'를 처리할 수 없습니다.")
+        return wait, trial
+
+    def _after_success(self, trial=False):
+        if self.circuit_breaker:
+            self.circuit_breaker.record_success(trial)
+
+    def _after_failure(self, key, attempt, exc, trial=False):
+        """실패를 기록하고 다음 재시도까지 대기할 시간을 반환합니다. 재시도하지 않을 경우 예외를 다시 발생시킵니다."""
+        if isinstance(exc, (OCRCircuitOpenError, OCRDeadlineExceededError)):
+            raise exc
+        if not is_retryable_error(exc):
+            # 잘못된 요청 등 치명적 오류는 API 상태와 무관하므로 서킷 브레이커의 오류율에 넣지 않음
+            if trial and self.circuit_breaker:
+                self.circuit_breaker.abandon_trial()
+            raise exc
+        if self.circuit_breaker:
+            self.circuit_breaker.record_failure(trial)
+        if attempt >= self.max_attempts:
+            app_logger.error(f"'{key}' 재시도 한도 초과 ({attempt}회 시도): {exc}")
+            raise exc
+        # full jitter: [0, min(max_delay, initial_delay * multiplier^(attempt-1))] 범위에서 무작위 대기
+        delay = random.uniform(0, min(self.max_delay, self.initial_delay * (self.multiplier ** (attempt - 1))))
+        if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+            raise OCRDeadlineExceededError(f"OCR 작업 기한 내에 '{key}' 재시도를 마칠 수 없습니다: {exc}") from exc
+        with self._lock:
+            self.retry_counts[key] = self.retry_counts.get(key, 0) + 1
+        app_logger.warning(f"'{key}' 일시적 오류, {delay:.2f}초 후 재시도 ({attempt}/{self.max_attempts - 1}): {exc}")
+        return delay
+
+def create_retry_policy():
+    """설정을 바탕으로 작업 하나에 사용할 재시도 정책(서킷 브레이커 포함)을 만듭니다."""
+    circuit_breaker = CircuitBreaker(
+        window_size=config_manager.get("ocr_circuit_breaker_window"),
+        failure_rate_threshold=config_manager.get("ocr_circuit_breaker_failure_rate"),
+        cooldown_seconds=config_manager.get("ocr_circuit_breaker_cooldown_seconds"),
+        max_failed_trials=config_manager.get("ocr_circuit_breaker_max_failed_trials"),
+    )
+    return RetryPolicy(
+        max_attempts=config_manager.get("ocr_retry_max_attempts"),
+        initial_delay=config_manager.get("ocr_retry_initial_delay"),
+        max_delay=config_manager.get("ocr_retry_max_delay"),
+        job_deadline_seconds=config_manager.get("ocr_job_deadline_seconds"),
+        circuit_breaker=circuit_breaker,
+    )
@@ -0,0 +1,87 @@
+import os
+import sys
+import pytest
+
+# 저장소 루트의 모듈(ocr_service 등)을 가져올 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud import vision
+from PIL import Image, ImageDraw
+from config_manager import config_manager
+from ocr_service import vision_client_provider
+
+class FakeTransport:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeVisionClient:
+    """
+    네트워크 없이 응답하는 Vision 클라이언트 대역.
+    text_for(image_bytes)가 돌려주는 텍스트로 응답하며, 받은 요청을 calls에 기록합니다.
+    document_text_detection은 document_for(image_bytes)가 돌려주는 vision.TextAnnotation으로 응답합니다.
+    """
+    def __init__(self, text_for=None, error_for=None, document_for=None):
+        self.text_for = text_for or (lambda image_data: "text")
+        self.error_for = error_for or (lambda image_data: None)
+        self.document_for = document_for or (lambda image_data: vision.TextAnnotation())
+        self.transport = FakeTransport()
+        self.calls = [] # (메서드 이름, 이미지 수)
+
+    def _response(self, image_data):
+        error = self.error_for(image_data)
+        if error is not None:
+            return vision.AnnotateImageResponse(error=error)
+        return vision.AnnotateImageResponse(text_annotations=[vision.EntityAnnotation(description=self.text_for(image_data))])
+
+    def text_detection(self, image, **kwargs):
+        self.calls.append(("text_detection", 1))
+        return self._response(image.content)
+
+    def document_text_detection(self, image, **kwargs):
+        self.calls.append(("document_text_detection", 1))
+        error = self.error_for(image.content)
+        if error is not None:
+            return vision.AnnotateImageResponse(error=error)
+        return vision.AnnotateImageResponse(full_text_annotation=self.document_for(image.content))
+
+    def batch_annotate_images(self, requests):
+        self.calls.append(("batch_annotate_images", len(requests)))
+        return vision.BatchAnnotateImagesResponse(responses=[self._response(request.image.content) for request in requests])
+
+class FakeAsyncVisionClient:
+    """asyncio 엔진용 비동기 클라이언트 대역. 응답과 호출 기록은 동기 대역(sync_client)과 공유합니다."""
+    def __init__(self, sync_client):
+        self.sync_client = sync_client
+
+    async def batch_annotate_images(self, requests):
+        return self.sync_client.batch_annotate_images(requests)
+
+def text_page(label, size=(400, 600)):
+    """빈 페이지로 판정되지 않도록 글자 줄을 채운 페이지 이미지."""
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    for line in range(20):
+        draw.text((20, 20 + line * 25), f"{label} line {line} of sample text", fill="black")
+    return img
+
+@pytest.fixture(autouse=True)
+def offline_config(monkeypatch):
+    """Vision API, 디스크 캐시, 작업 저널, 프로세스 풀 없이 실행되도록 설정을 바꿉니다 (테스트가 끝나면 복원)."""
+    for key, value in {"ocr_cache_enabled": False, "ocr_use_process_pool": False, "job_journal_enabled": False,
+                       "ocr_retry_initial_delay": 0.0, "ocr_mosaic_enabled": False}.items():
+        monkeypatch.setitem(config_manager.config, key, value)
+
+@pytest.fixture
+def fake_vision():
+    """공유 Vision 클라이언트 풀과 asyncio 엔진이 FakeVisionClient 하나를 쓰게 합니다."""
+    client = FakeVisionClient()
+    vision_client_provider.set_client_factory(lambda: client)
+    vision_client_provider.set_async_client_factory(lambda: FakeAsyncVisionClient(client))
+    try:
+        yield client
+    finally:
+        vision_client_provider.set_client_factory(None)
+        vision_client_provider.set_async_client_factory(None)
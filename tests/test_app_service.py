@@ -0,0 +1,35 @@
+import io
+from google.rpc import status_pb2
+from PIL import Image
+from conftest import text_page
+from app_service import ApplicationService
+
+def _fail_width_401(image_data):
+    if Image.open(io.BytesIO(image_data)).width == 401:
+        return status_pb2.Status(code=3, message="bad image")
+    return None
+
+def test_folder_ocr_reports_failed_images(tmp_path, fake_vision):
+    folder = tmp_path / "scans"
+    folder.mkdir()
+    text_page("good").save(folder / "good.png")
+    text_page("bad", size=(401, 600)).save(folder / "bad.png")
+    fake_vision.error_for = _fail_width_401
+
+    summary = ApplicationService().ocr_images_in_folder(str(folder), str(tmp_path / "out"))
+
+    assert summary.processed_files == 1
+    assert [path for path, _ in summary.failures] == [str(folder / "bad.png")]
+
+def test_epub_creation_exposes_failed_pages(tmp_path, fake_vision):
+    paths = []
+    for index, width in enumerate([400, 401, 400]):
+        path = tmp_path / f"{index:02d}.png"
+        text_page(f"page {index}", size=(width, 600)).save(path)
+        paths.append(str(path))
+    fake_vision.error_for = _fail_width_401
+    service = ApplicationService()
+
+    success = service.create_epub_from_source(paths, str(tmp_path / "book.epub"), "t", "a", [], [], is_image_folder_mode=True)
+
+    assert success and service.last_run_summary.failed_pages == [2]
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+from google.api_core import exceptions as google_exceptions
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+from exceptions import OCRError
+
+def _finish(limiter, latency, error=None):
+    """지연 시간이 latency초였던 요청 하나를 끝낸 것으로 처리합니다."""
+    limiter.acquire()
+    limiter.release(time.monotonic() - latency, error=error)
+
+def _quota_error():
+    # ocr_service처럼 OCRError로 감싼 원본 예외도 과부하로 인식해야 함
+    try:
+        raise google_exceptions.ResourceExhausted("quota")
+    except google_exceptions.ResourceExhausted as exc:
+        try:
+            raise OCRError("wrapped") from exc
+        except OCRError as wrapped:
+            return wrapped
+
+def test_starts_at_max_limit():
+    assert AdaptiveConcurrencyLimiter(max_limit=8).limit == 8
+    assert AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=3).limit == 3
+    assert AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=3, adaptive=False).limit == 8
+
+def test_overload_halves_once_then_grows_back_additively():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8)
+    started_before_decrease = limiter.acquire()
+
+    _finish(limiter, 0.1, error=_quota_error())
+    assert limiter.limit == 4
+    # 감소 이전에 보낸 요청의 과부하 오류는 같은 구간으로 보고 다시 줄이지 않음
+    limiter.release(started_before_decrease, error=_quota_error())
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        _finish(limiter, 0.1)
+    assert limiter.limit == 5 # 현재 동시성만큼 안정적으로 끝나면 1 증가
+
+def test_growing_latency_holds_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=2)
+    _finish(limiter, 0.1)
+    for _ in range(10):
+        _finish(limiter, 1.0)
+    assert limiter.limit == 2
+
+def test_non_overload_errors_do_not_change_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+    _finish(limiter, 0.1, error=OCRError("bad image"))
+    assert limiter.limit == 4
+
+def test_thread_and_async_callers_share_slots():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=1, adaptive=False)
+    start_time = limiter.acquire()
+    acquired = threading.Event()
+
+    async def wait_for_slot():
+        async with limiter.slot_async():
+            acquired.set()
+
+    worker = threading.Thread(target=asyncio.run, args=(wait_for_slot(),))
+    worker.start()
+    assert not acquired.wait(0.2) # 스레드 쪽이 슬롯을 쥐고 있는 동안은 대기
+    limiter.release(start_time)
+    worker.join(timeout=5)
+    assert acquired.is_set()
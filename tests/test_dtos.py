@@ -0,0 +1,44 @@
+import pdf2image
+import pytest
+from PIL import Image
+from dtos import OcrInputItem, PageDataSource
+
+def test_page_source_decodes_only_when_loaded(tmp_path):
+    path = tmp_path / "page.png"
+    source = PageDataSource(path=str(path), original_index=0, image_path=str(path)) # 파일이 없어도 만들 때는 열지 않음
+    Image.new("RGB", (20, 30), "white").save(path)
+
+    image = source.load_image()
+
+    assert image.size == (20, 30) and image.format == "PNG"
+    assert source.load_image() is image # release() 전까지 재사용
+    source.release()
+    assert source.load_image() is not image # 해제 후에는 다시 디코딩
+
+def test_pdf_page_is_rasterized_at_the_configured_dpi(monkeypatch):
+    calls = []
+    def fake_convert(pdf_path, **kwargs):
+        calls.append((pdf_path, kwargs))
+        return [Image.new("RGB", (10, 10))]
+    monkeypatch.setattr(pdf2image, "convert_from_path", fake_convert)
+
+    PageDataSource(path="pdf_page_3", original_index=2, pdf_path="book.pdf", pdf_page_number=3, pdf_dpi=150).load_image()
+    PageDataSource(path="pdf_page_4", original_index=3, pdf_path="book.pdf", pdf_page_number=4).load_image()
+
+    assert calls == [("book.pdf", {'first_page': 3, 'last_page': 3, 'dpi': 150}),
+                     ("book.pdf", {'first_page': 4, 'last_page': 4})]
+
+def test_page_source_without_image_raises():
+    with pytest.raises(ValueError):
+        PageDataSource(path="missing", original_index=0).load_image()
+
+def test_ocr_item_release_drops_the_decoded_image(tmp_path):
+    path = tmp_path / "page.png"
+    Image.new("RGB", (20, 30), "white").save(path)
+    source = PageDataSource(path=str(path), original_index=0, image_path=str(path))
+    item = OcrInputItem(id=1, image=None, original_path=str(path), source=source)
+    image = item.load_image()
+
+    item.release()
+
+    assert item.load_image() is not image
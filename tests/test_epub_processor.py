@@ -0,0 +1,258 @@
+import io
+import re
+import threading
+import time
+import zipfile
+import pytest
+from google.rpc import status_pb2
+from PIL import Image, ImageDraw
+from conftest import text_page
+from config_manager import config_manager
+import epub_processor
+from epub_processor import EpubProcessor
+from exceptions import OCRError
+
+def _write_pages(tmp_path, pages):
+    paths = []
+    for index, page in enumerate(pages):
+        path = tmp_path / f"{index:02d}.png"
+        page.save(path)
+        paths.append(str(path))
+    return paths
+
+def _chapters(epub_path):
+    with zipfile.ZipFile(epub_path) as book:
+        return {name.rsplit("/", 1)[-1]: book.read(name).decode("utf-8") for name in book.namelist() if name.endswith(".xhtml")}
+
+def test_failed_page_is_left_empty_instead_of_embedding_the_error(tmp_path, fake_vision):
+    # 3번 페이지만 폭을 달리해, 가짜 클라이언트가 그 이미지에만 치명적 오류 응답을 돌려주게 함
+    paths = _write_pages(tmp_path, [text_page(f"page {index}", size=(401 if index == 3 else 400, 600)) for index in range(5)])
+    fake_vision.text_for = lambda image_data: "body text"
+    fake_vision.error_for = lambda image_data: (status_pb2.Status(code=3, message="bad image")
+                                                if Image.open(io.BytesIO(image_data)).width == 401 else None)
+    output_path = tmp_path / "book.epub"
+
+    processor = EpubProcessor(paths, str(output_path), is_image_folder=True, ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    assert processor.run_summary.failed_pages == [4] # 이미지 폴더 모드의 페이지 번호는 1부터
+    chapters = "".join(_chapters(output_path).values())
+    assert chapters.count("body text") == 4
+    assert "bad image" not in chapters and "OCR Error" not in chapters
+
+def test_pages_are_not_reencoded_before_ocr_or_packaging(tmp_path, fake_vision):
+    pages = [text_page("page 0"), Image.new("RGB", (300, 200), "red"), text_page("page 2"), Image.new("RGB", (300, 200), "blue")]
+    paths = _write_pages(tmp_path, pages[:3])
+    bmp_path = str(tmp_path / "03.bmp") # EPUB에 바로 넣을 수 없는 형식만 한 번 인코딩
+    pages[3].save(bmp_path)
+    paths.append(bmp_path)
+    output_path = tmp_path / "book.epub"
+
+    processor = EpubProcessor(paths, str(output_path), illustration_images=[paths[1], bmp_path], is_image_folder=True,
+                              ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    summary = processor.run_summary
+    assert (summary.ocr_pages, summary.illustration_pages) == (2, 2)
+    assert summary.reencodes_skipped == 3 # OCR 페이지 2개 + PNG 일러스트 1개
+    assert summary.materialized_files == 1
+    with zipfile.ZipFile(output_path) as book:
+        stored = [book.read(name) for name in book.namelist()]
+    with open(paths[1], "rb") as png_file:
+        assert png_file.read() in stored # PNG 일러스트는 원본 바이트 그대로
+
+def _blank_page_book(tmp_path):
+    pages = [Image.new("RGB", (400, 600), "white") if index == 5 else text_page(f"page {index}") for index in range(11)]
+    return _write_pages(tmp_path, pages), tmp_path / "book.epub"
+
+def test_blank_page_detection_is_off_by_default(tmp_path, fake_vision):
+    paths, output_path = _blank_page_book(tmp_path)
+
+    processor = EpubProcessor(paths, str(output_path), is_image_folder=True, ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    assert len(fake_vision.calls) == 11
+    assert processor.run_summary.blank_pages == 0
+
+@pytest.mark.parametrize("engine", ["thread", "asyncio"])
+def test_blank_pages_skip_vision_when_enabled(tmp_path, monkeypatch, fake_vision, engine):
+    monkeypatch.setitem(config_manager.config, "blank_page_detection", True)
+    paths, output_path = _blank_page_book(tmp_path)
+
+    processor = EpubProcessor(paths, str(output_path), is_image_folder=True, ocr_engine=engine)
+    processor.create_epub(title="t", author="a")
+
+    assert len(fake_vision.calls) == 10 # 빈 페이지는 요청하지 않음
+    assert (processor.run_summary.ocr_pages, processor.run_summary.blank_pages) == (11, 1)
+
+def test_duplicate_page_reuses_the_representative_text(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "page_dedup_enabled", True)
+    paths = _write_pages(tmp_path, [text_page("first"), text_page("second", size=(420, 600)), text_page("first")])
+    fake_vision.text_for = lambda image_data: ("first page text" if Image.open(io.BytesIO(image_data)).width == 400
+                                               else "second page text")
+    output_path = tmp_path / "book.epub"
+
+    processor = EpubProcessor(paths, str(output_path), is_image_folder=True, ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    assert len(fake_vision.calls) == 2
+    assert (processor.run_summary.duplicate_pages, processor.run_summary.duplicate_groups) == (1, 1)
+    chapters = "".join(_chapters(output_path).values())
+    assert chapters.count("first page text") == 2 and chapters.count("second page text") == 1
+
+def test_auto_detected_illustration_is_not_sent_to_ocr(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "illustration_auto_detect", True)
+    artwork = Image.new("RGB", (400, 600))
+    ImageDraw.Draw(artwork).rectangle((0, 0, 400, 300), fill="orange")
+    ImageDraw.Draw(artwork).ellipse((50, 320, 350, 580), fill="teal")
+    paths = _write_pages(tmp_path, [text_page("page 0"), artwork, text_page("page 2")])
+    output_path = tmp_path / "book.epub"
+
+    processor = EpubProcessor(paths, str(output_path), is_image_folder=True, ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    assert len(fake_vision.calls) == 2
+    assert (processor.run_summary.ocr_pages, processor.run_summary.auto_illustration_pages) == (2, 1)
+
+def _spine(epub_path):
+    """읽기 순서대로 나열한 문서 파일 이름 (목차 nav 제외)."""
+    with zipfile.ZipFile(epub_path) as book:
+        opf_name = next(name for name in book.namelist() if name.endswith(".opf"))
+        opf = book.read(opf_name).decode("utf-8")
+    hrefs = {item_id: href for href, item_id in re.findall(r'<item href="([^"]+)" id="([^"]+)"', opf)}
+    return [hrefs[idref] for idref in re.findall(r'<itemref idref="([^"]+)"', opf) if idref != "nav"]
+
+def _page_order(text):
+    return [int(page) for page in re.findall(r"body of page (\d+)", text)]
+
+def _slow_early_pages(completed):
+    """앞 페이지일수록 늦게 끝나도록 지연하는 text_for. 페이지 n의 이미지 폭은 400 + n."""
+    def text_for(image_data):
+        page = Image.open(io.BytesIO(image_data)).width - 400
+        time.sleep(0.02 * (10 - page))
+        completed.append(page)
+        return f"body of page {page}"
+    return text_for
+
+def test_out_of_order_ocr_results_are_assembled_in_page_order(tmp_path, fake_vision):
+    paths = _write_pages(tmp_path, [text_page(f"page {index}", size=(401 + index, 600)) for index in range(8)])
+    external = str(tmp_path / "cover.png")
+    Image.new("RGB", (300, 200), "green").save(external)
+    completed = []
+    fake_vision.text_for = _slow_early_pages(completed)
+    output_path = tmp_path / "book.epub"
+
+    # 4번 페이지는 폴더 내 일러스트, cover.png는 외부 일러스트 (맨 뒤)
+    processor = EpubProcessor(paths, str(output_path), illustration_images=[paths[3], external], is_image_folder=True,
+                              ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    assert completed != sorted(completed) # OCR은 실제로 순서 없이 끝남
+    chapters = _chapters(output_path)
+    assert _page_order(chapters["page_1.xhtml"]) == [1, 2, 3]
+    assert _page_order(chapters["page_5.xhtml"]) == [5, 6, 7, 8]
+    assert _spine(output_path) == ["page_1.xhtml", "img_page_img_folder_designated_4.xhtml",
+                                   "page_5.xhtml", "img_page_img_ext_1.xhtml"]
+
+def test_chapters_are_written_while_later_pages_are_still_in_ocr(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "epub_chapter_max_pages", 1) # 페이지마다 챕터를 바로 내보냄
+    paths = _write_pages(tmp_path, [text_page(f"page {index}", size=(401 + index, 600)) for index in range(6)])
+    ocr_finished = []
+    def text_for(image_data):
+        page = Image.open(io.BytesIO(image_data)).width - 400
+        if page == 6:
+            time.sleep(0.3) # 마지막 페이지만 느림
+        ocr_finished.append(time.monotonic())
+        return f"body of page {page}"
+    fake_vision.text_for = text_for
+    chapter_written = []
+    real_create_writer = epub_processor.create_epub_writer
+    def recording_writer(name, book):
+        writer = real_create_writer(name, book)
+        add_item = writer.add_item
+        def add_and_record(item):
+            chapter_written.append(time.monotonic())
+            add_item(item)
+        writer.add_item = add_and_record
+        return writer
+    monkeypatch.setattr(epub_processor, "create_epub_writer", recording_writer)
+
+    processor = EpubProcessor(paths, str(tmp_path / "book.epub"), is_image_folder=True, ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    assert len(chapter_written) == 6
+    assert chapter_written[0] < max(ocr_finished) # 첫 챕터는 마지막 페이지의 OCR이 끝나기 전에 씀
+    assert processor.run_summary.overlapped_pages >= 1
+
+def test_ocr_failure_during_assembly_leaves_existing_output_untouched(tmp_path, monkeypatch, fake_vision):
+    paths = _write_pages(tmp_path, [text_page(f"page {index}") for index in range(4)])
+    output_path = tmp_path / "book.epub"
+    output_path.write_bytes(b"previous book")
+    def failing_ocr_stage(self, ocr_input_items, on_result):
+        for item in ocr_input_items:
+            if item.id == 3:
+                raise OCRError("Vision API unavailable")
+            on_result({'id': item.id, 'text': "text", 'retries': 0})
+    monkeypatch.setattr(EpubProcessor, "_run_ocr_stage", failing_ocr_stage)
+
+    processor = EpubProcessor(paths, str(output_path), is_image_folder=True, ocr_engine="thread")
+    with pytest.raises(OCRError):
+        processor.create_epub(title="t", author="a")
+
+    assert output_path.read_bytes() == b"previous book"
+    assert not [name for name in tmp_path.iterdir() if name.name.startswith("book.epub.") or name.suffix == ".tmp"]
+    assert not [thread for thread in threading.enumerate() if thread.name == "epub-ocr"] # OCR 스레드도 끝남
+
+def _book_with_texts(tmp_path, fake_vision, texts, illustration_index=None):
+    """페이지 n(1부터)의 OCR 텍스트가 texts[n - 1]인 책을 만들고 {파일 이름: XHTML}과 목차 제목을 반환합니다."""
+    pages = [Image.new("RGB", (300, 200), "red") if index == illustration_index
+             else text_page(f"page {index}", size=(401 + index, 600)) for index in range(len(texts))]
+    paths = _write_pages(tmp_path, pages)
+    fake_vision.text_for = lambda image_data: texts[Image.open(io.BytesIO(image_data)).width - 401]
+    output_path = tmp_path / "book.epub"
+    illustrations = [paths[illustration_index]] if illustration_index is not None else None
+    processor = EpubProcessor(paths, str(output_path), illustration_images=illustrations, is_image_folder=True,
+                              ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+    chapters = _chapters(output_path)
+    toc = re.findall(r'<a href="([^"]+)">([^<]+)</a>', chapters.pop("nav.xhtml"))
+    return chapters, toc
+
+def _page_headings(chapter):
+    return [int(page) for page in re.findall(r"<h2>Page (\d+)</h2>", chapter)]
+
+def test_text_pages_are_merged_into_one_chapter_by_default(tmp_path, fake_vision):
+    chapters, toc = _book_with_texts(tmp_path, fake_vision, [f"text {n}" for n in range(1, 6)])
+
+    assert list(chapters) == ["page_1.xhtml"]
+    assert "<h1>Page 1</h1>" in chapters["page_1.xhtml"]
+    assert _page_headings(chapters["page_1.xhtml"]) == [1, 2, 3, 4, 5]
+    assert toc == [("page_1.xhtml", "Page 1")]
+
+def test_chapters_split_at_the_page_limit_and_at_illustrations(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "epub_chapter_max_pages", 2)
+
+    chapters, toc = _book_with_texts(tmp_path, fake_vision, [f"text {n}" for n in range(1, 8)], illustration_index=3)
+
+    assert {name: _page_headings(chapter) for name, chapter in chapters.items() if name.startswith("page_")} == {
+        "page_1.xhtml": [1, 2], "page_3.xhtml": [3], "page_5.xhtml": [5, 6], "page_7.xhtml": [7]}
+    assert [title for _, title in toc] == ["Page 1", "Page 3", "Illustration (Page 4)", "Page 5", "Page 7"]
+
+def test_chapters_split_at_the_size_limit(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "epub_chapter_max_kb", 1)
+    # 페이지 HTML이 약 440바이트라 1KB 챕터에 두 페이지씩. 3번 페이지는 혼자서도 한도를 넘음
+    texts = ["x" * 400, "y" * 400, "z" * 2000, "w" * 400, "v" * 400]
+
+    chapters, toc = _book_with_texts(tmp_path, fake_vision, texts)
+
+    assert {name: _page_headings(chapter) for name, chapter in chapters.items()} == {
+        "page_1.xhtml": [1, 2], "page_3.xhtml": [3], "page_4.xhtml": [4, 5]}
+    assert [title for _, title in toc] == ["Page 1", "Page 3", "Page 4"]
+    assert "z" * 2000 in chapters["page_3.xhtml"] # 큰 페이지도 자르지 않고 통째로 넣음
+
+def test_ocr_text_is_escaped_in_chapter_html(tmp_path, fake_vision):
+    chapters, _ = _book_with_texts(tmp_path, fake_vision, ["a < b & c", "<script>alert(1)</script>"])
+
+    chapter = chapters["page_1.xhtml"]
+    assert "<pre>a &lt; b &amp; c</pre>" in chapter
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in chapter and "<script>" not in chapter
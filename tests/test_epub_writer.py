@@ -0,0 +1,60 @@
+import re
+import zipfile
+import ebooklib
+from ebooklib import epub
+from PIL import Image
+from conftest import text_page
+from config_manager import config_manager
+from epub_processor import EpubProcessor
+from epub_writer import BufferedEpubWriter, StreamingEpubWriter, create_epub_writer
+
+def _archive(epub_path):
+    """{압축 파일 안 이름: 내용}. content.opf의 수정 시각은 실행 시각이라 비교에서 뺍니다."""
+    with zipfile.ZipFile(epub_path) as book:
+        names = book.namelist()
+        contents = {name: book.read(name) for name in names}
+    for name in contents:
+        if name.endswith(".opf"):
+            contents[name] = re.sub(rb'<meta property="dcterms:modified">[^<]*</meta>', b"", contents[name])
+    return names, contents
+
+def _build_book(tmp_path, writer_name, monkeypatch):
+    monkeypatch.setitem(config_manager.config, "epub_writer", writer_name)
+    monkeypatch.setitem(config_manager.config, "epub_chapter_max_pages", 2)
+    folder = tmp_path / writer_name
+    folder.mkdir()
+    paths = []
+    for index in range(5):
+        path = folder / f"{index:02d}.png"
+        (Image.new("RGB", (300, 200), "red") if index == 2 else text_page(f"page {index}")).save(path)
+        paths.append(str(path))
+    output_path = folder / "book.epub"
+    processor = EpubProcessor(paths, str(output_path), illustration_images=[paths[2]], is_image_folder=True,
+                              ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+    return output_path
+
+def test_default_writer_is_ebooklib(tmp_path):
+    book = epub.EpubBook()
+
+    assert isinstance(create_epub_writer(str(tmp_path / "book.epub"), book), BufferedEpubWriter)
+
+def test_streaming_writer_only_runs_on_tested_ebooklib_versions(tmp_path, monkeypatch):
+    monkeypatch.setitem(config_manager.config, "epub_writer", "streaming")
+    monkeypatch.setattr(ebooklib, "VERSION", (0, 20, 0))
+    writer = create_epub_writer(str(tmp_path / "book.epub"), epub.EpubBook())
+    assert isinstance(writer, StreamingEpubWriter)
+    writer.abort()
+
+    monkeypatch.setattr(ebooklib, "VERSION", (0, 21, 0))
+    assert isinstance(create_epub_writer(str(tmp_path / "book.epub"), epub.EpubBook()), BufferedEpubWriter)
+
+def test_streaming_output_matches_write_epub(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setattr(ebooklib, "VERSION", (0, 20, 0))
+    streaming_names, streaming = _archive(_build_book(tmp_path, "streaming", monkeypatch))
+    buffered_names, buffered = _archive(_build_book(tmp_path, "ebooklib", monkeypatch))
+
+    assert streaming_names[0] == buffered_names[0] == "mimetype"
+    # write_epub은 content.opf를 본문보다 먼저 쓰고 스트리밍 백엔드는 마지막에 씀. 순서 외에는 같아야 함
+    assert sorted(streaming_names) == sorted(buffered_names)
+    assert streaming == buffered
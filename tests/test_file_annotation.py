@@ -0,0 +1,67 @@
+import io
+import re
+import shutil
+from PIL import Image
+import ocr_service
+from file_annotation import FileChunk, LocalFileTransport, PDF_MIME_TYPE, TIFF_MIME_TYPE, iter_file_chunks
+from ocr_service import _annotate_file_chunk, process_pdf
+
+def _page_text(content, mime_type, page):
+    return f"text of request page {page}"
+
+def _frame_text(content, mime_type, page):
+    # 조각 TIFF의 page번째 프레임 폭으로 원본 페이지를 알아냄 (원본 n페이지의 폭은 100 + n)
+    with Image.open(io.BytesIO(content)) as img:
+        img.seek(page - 1)
+        return f"document page {img.width - 100}"
+
+def _write_tiff(path, page_count):
+    frames = [Image.new("L", (100 + page, 64), 255) for page in range(1, page_count + 1)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+def test_chunk_response_pages_map_back_to_document_pages():
+    # 분할된 PDF 조각: 요청 기준 1~3 페이지가 원본 문서의 6~8 페이지
+    chunk = FileChunk(page_numbers=[6, 7, 8], content=b"%PDF", mime_type=PDF_MIME_TYPE, request_pages=[1, 2, 3])
+    transport = LocalFileTransport(text_provider=_page_text)
+
+    pages = _annotate_file_chunk(transport, chunk, language_hints=None)
+
+    assert pages == [(6, "text of request page 1"), (7, "text of request page 2"), (8, "text of request page 3")]
+    assert transport.calls == 1
+
+def test_tiff_is_split_into_per_chunk_frames(tmp_path):
+    tiff_path = str(tmp_path / "scan.tiff")
+    _write_tiff(tiff_path, 7)
+
+    chunks = list(iter_file_chunks(tiff_path, total_pages=7, chunk_pages=5, work_dir=str(tmp_path)))
+
+    assert [chunk.page_numbers for chunk in chunks] == [[1, 2, 3, 4, 5], [6, 7]]
+    assert [chunk.request_pages for chunk in chunks] == [[1, 2, 3, 4, 5], [1, 2]] # 조각 파일 기준 페이지 번호
+    assert all(chunk.mime_type == TIFF_MIME_TYPE for chunk in chunks)
+    with Image.open(io.BytesIO(chunks[1].content)) as second:
+        assert second.n_frames == 2 and second.width == 106 # 전체 파일이 아니라 6~7 페이지만 보냄
+
+def test_process_pdf_file_mode_writes_pages_in_order(tmp_path):
+    tiff_path = str(tmp_path / "scan.tiff")
+    _write_tiff(tiff_path, 12)
+    transport = LocalFileTransport(text_provider=_frame_text)
+
+    process_pdf(tiff_path, str(tmp_path), mode="file", file_transport=transport)
+
+    assert transport.calls == 3 # 5페이지씩 3개 조각
+    output = (tmp_path / "scan.tiff.txt").read_text(encoding="utf-8")
+    assert re.findall(r"--- Page (\d+) ---\ndocument page (\d+)", output) == [(str(n), str(n)) for n in range(1, 13)]
+
+def test_pdf_without_split_tools_falls_back_to_image_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    image_mode_calls = []
+    def fake_image_mode(pdf_path, limiter, retry_policy, cache):
+        image_mode_calls.append(pdf_path)
+        yield (1, "page text")
+    monkeypatch.setattr(ocr_service, "_ocr_pdf_as_images", fake_image_mode)
+    transport = LocalFileTransport(text_provider=_page_text)
+    pdf_path = str(tmp_path / "book.pdf")
+
+    process_pdf(pdf_path, str(tmp_path), mode="file", file_transport=transport)
+
+    assert image_mode_calls == [pdf_path] and transport.calls == 0
@@ -0,0 +1,91 @@
+import os
+import zipfile
+import numpy as np
+import pytest
+from PIL import Image
+from conftest import text_page
+from config_manager import config_manager
+from epub_processor import EpubProcessor
+from illustration_encoding import IllustrationEncoder
+
+def _photo(size):
+    """재압축으로 크기가 줄어드는 사진 같은 이미지 (잡음 위의 그라데이션)."""
+    width, height = size
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None].repeat(height, axis=0).repeat(3, axis=2)
+    noise = np.random.default_rng(0).normal(0, 20, (height, width, 3))
+    return Image.fromarray(np.clip(gradient + noise, 0, 255).astype(np.uint8))
+
+def test_large_illustration_is_resized_and_reencoded(tmp_path):
+    source = tmp_path / "art.png"
+    _photo((1200, 800)).save(source)
+    encoder = IllustrationEncoder(quality=80, max_longest_side=600)
+
+    result = encoder.encode_file(str(source), str(tmp_path / "art_out"))
+
+    assert result.recompressed and result.path.endswith(".jpg")
+    assert (result.width, result.height) == (600, 400)
+    assert result.output_bytes < result.source_bytes
+    with Image.open(result.path) as encoded:
+        assert encoded.format == "JPEG" and encoded.info.get("progressive")
+    assert (encoder.files, encoder.recompressed_files, encoder.resized_files) == (1, 1, 1)
+
+def test_original_is_kept_when_reencoding_does_not_shrink_it(tmp_path):
+    source = tmp_path / "flat.png"
+    Image.new("RGB", (200, 100), "white").save(source, optimize=True) # 이미 아주 작은 PNG
+
+    result = IllustrationEncoder(quality=95).encode_file(str(source), str(tmp_path / "flat_out"))
+
+    assert not result.recompressed and result.path == str(source)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("flat_out")]
+
+def test_transparent_illustration_is_written_as_png(tmp_path):
+    source = tmp_path / "logo.png"
+    image = _photo((800, 800)).convert("RGBA")
+    image.putalpha(128)
+    image.save(source)
+
+    result = IllustrationEncoder(max_longest_side=400).encode_file(str(source), str(tmp_path / "logo_out"))
+
+    assert result.path.endswith(".png")
+    with Image.open(result.path) as encoded:
+        assert encoded.mode == "RGBA"
+
+def test_metadata_is_stripped_after_applying_rotation(tmp_path):
+    source = tmp_path / "camera.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6 # 시계 방향 90도 회전해서 보여야 하는 사진
+    exif[0x010F] = "Camera maker"
+    _photo((800, 400)).save(source, quality=98, exif=exif)
+
+    result = IllustrationEncoder(quality=70).encode_file(str(source), str(tmp_path / "camera_out"))
+
+    with Image.open(result.path) as encoded:
+        assert encoded.size == (400, 800) # 회전 정보를 픽셀에 적용
+        assert not encoded.getexif()
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        IllustrationEncoder(image_format="gif")
+
+def test_epub_packages_recompressed_illustrations(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "illustration_recompress", True)
+    monkeypatch.setitem(config_manager.config, "illustration_max_longest_side", 500)
+    paths = []
+    for index, page in enumerate([text_page("page 0"), _photo((1500, 1000)), text_page("page 2")]):
+        path = tmp_path / f"{index:02d}.png"
+        page.save(path)
+        paths.append(str(path))
+    output_path = tmp_path / "book.epub"
+
+    processor = EpubProcessor(paths, str(output_path), illustration_images=[paths[1]], is_image_folder=True,
+                              ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    summary = processor.run_summary
+    assert summary.recompressed_illustrations == 1
+    assert summary.illustration_output_bytes < summary.illustration_source_bytes
+    with zipfile.ZipFile(output_path) as book:
+        images = [name for name in book.namelist() if "/images/" in name]
+        assert len(images) == 1 and images[0].endswith(".jpg")
+        with book.open(images[0]) as image_file, Image.open(image_file) as packaged:
+            assert packaged.size == (500, 333)
@@ -0,0 +1,99 @@
+import io
+import json
+import os
+import zipfile
+from google.rpc import status_pb2
+from PIL import Image
+from conftest import text_page
+from config_manager import config_manager
+from epub_processor import EpubProcessor
+from job_journal import JOURNAL_SUFFIX, JobJournal
+
+def _journal_with_pages(path, fingerprint, pages):
+    journal = JobJournal(path, fingerprint)
+    for page, text in pages.items():
+        journal.record(page, text)
+    journal.close()
+
+def _record_lines(path):
+    with open(path, encoding="utf-8") as journal_file:
+        return [json.loads(line) for line in journal_file.read().splitlines()[1:]]
+
+def test_journal_restores_recorded_pages(tmp_path):
+    path = str(tmp_path / "book.epub.journal")
+    _journal_with_pages(path, "job-a", {1: "first", 2: "둘째 < & >"})
+
+    journal = JobJournal(path, "job-a")
+
+    assert journal.completed_pages == {1: "first", 2: "둘째 < & >"}
+
+def test_fingerprint_mismatch_starts_a_new_journal(tmp_path):
+    path = str(tmp_path / "book.epub.journal")
+    _journal_with_pages(path, "job-a", {1: "first"})
+
+    journal = JobJournal(path, "job-b")
+    journal.close()
+
+    assert journal.completed_pages == {}
+    assert _record_lines(path) == []
+    with open(path, encoding="utf-8") as journal_file:
+        assert json.loads(journal_file.readline())["fingerprint"] == "job-b"
+
+def test_truncated_last_line_is_dropped_and_journal_rewritten(tmp_path):
+    path = str(tmp_path / "book.epub.journal")
+    _journal_with_pages(path, "job-a", {1: "first", 2: "second"})
+    with open(path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"page": 3, "text": "thi') # 기록 도중 프로세스가 죽은 경우
+
+    journal = JobJournal(path, "job-a")
+    journal.record(3, "third")
+    journal.close()
+
+    assert journal.completed_pages == {1: "first", 2: "second"}
+    assert [record["page"] for record in _record_lines(path)] == [1, 2, 3] # 잘린 줄 뒤에 새 기록이 이어 붙지 않음
+
+def test_record_with_wrong_checksum_is_rejected(tmp_path):
+    path = str(tmp_path / "book.epub.journal")
+    _journal_with_pages(path, "job-a", {1: "first", 2: "second"})
+    with open(path, encoding="utf-8") as journal_file:
+        content = journal_file.read()
+    with open(path, "w", encoding="utf-8") as journal_file:
+        journal_file.write(content.replace('"text": "second"', '"text": "tampered"'))
+
+    journal = JobJournal(path, "job-a")
+
+    assert journal.completed_pages == {1: "first"}
+
+def test_resumed_run_does_not_ocr_journaled_pages(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "job_journal_enabled", True)
+    paths = []
+    for index in range(6):
+        path = tmp_path / f"{index:02d}.png"
+        text_page(f"page {index}", size=(400 + index, 600)).save(path)
+        paths.append(str(path))
+    output_path = str(tmp_path / "book.epub")
+    sent_widths = []
+    def text_for(image_data):
+        width = Image.open(io.BytesIO(image_data)).width
+        sent_widths.append(width)
+        return f"body of page {width - 400 + 1}"
+    fake_vision.text_for = text_for
+    # 첫 실행: 4번 페이지(폭 403)가 실패해 저널이 남음
+    fake_vision.error_for = lambda image_data: (status_pb2.Status(code=3, message="bad image")
+                                                if Image.open(io.BytesIO(image_data)).width == 403 else None)
+    first = EpubProcessor(paths, output_path, is_image_folder=True, ocr_engine="thread")
+    first.create_epub(title="t", author="a")
+    assert first.run_summary.failed_pages == [4]
+    assert os.path.exists(output_path + JOURNAL_SUFFIX)
+
+    sent_widths.clear()
+    fake_vision.error_for = lambda image_data: None
+    second = EpubProcessor(paths, output_path, is_image_folder=True, ocr_engine="thread")
+    second.create_epub(title="t", author="a")
+
+    assert sent_widths == [403] # 저널에 있는 페이지는 Vision에 보내지 않음
+    assert second.run_summary.resumed_pages == 5 and not second.run_summary.failed_pages
+    assert not os.path.exists(output_path + JOURNAL_SUFFIX) # 모두 성공하면 저널 삭제
+    with zipfile.ZipFile(output_path) as book:
+        chapters = "".join(book.read(name).decode("utf-8") for name in book.namelist() if name.endswith(".xhtml"))
+    assert all(f"body of page {page}" in chapters for page in range(1, 7))
@@ -0,0 +1,127 @@
+import io
+import numpy as np
+from google.cloud import vision
+from PIL import Image
+from config_manager import config_manager
+from dtos import OcrInputItem
+from mosaic_packing import MosaicLayout, MosaicPacker, MosaicPlacement, map_words_to_tiles, render_mosaic
+from ocr_service import ocr_pil_images_batch
+
+_BreakType = vision.TextAnnotation.DetectedBreak.BreakType
+
+class _Tile:
+    def __init__(self, item_id, image=None):
+        self.id = item_id
+        self.image = image
+        self.released = False
+
+    def load_image(self):
+        return self.image
+
+    def release(self):
+        self.released = True
+
+def _layout(*boxes):
+    """(id, x, y, 가로, 세로) 목록으로 MosaicLayout을 만듭니다."""
+    placements = tuple(MosaicPlacement(_Tile(item_id), x, y, width, height) for item_id, x, y, width, height in boxes)
+    return MosaicLayout(placements, 1000, 1000)
+
+def _word(text, box, last_break=_BreakType.SPACE):
+    """box=(왼쪽, 위, 오른쪽, 아래) 경계 상자를 가진 단어. 마지막 글자에 last_break 구분을 붙입니다."""
+    left, top, right, bottom = box
+    vertices = [vision.Vertex(x=left, y=top), vision.Vertex(x=right, y=top),
+                vision.Vertex(x=right, y=bottom), vision.Vertex(x=left, y=bottom)]
+    symbols = [vision.Symbol(text=char) for char in text]
+    symbols[-1].property = vision.TextAnnotation.TextProperty(
+        detected_break=vision.TextAnnotation.DetectedBreak(type_=last_break))
+    return vision.Word(bounding_box=vision.BoundingPoly(vertices=vertices), symbols=symbols)
+
+def _annotation(*paragraphs):
+    return vision.TextAnnotation(pages=[vision.Page(blocks=[
+        vision.Block(paragraphs=[vision.Paragraph(words=list(words)) for words in paragraphs])])])
+
+def test_packer_places_tiles_on_shelves_with_gaps():
+    packer = MosaicPacker(canvas_size=300, gap=10, max_tile_side=200, max_tiles=10)
+
+    assert packer.add("a", (100, 50))
+    assert packer.add("b", (100, 80))
+    assert packer.add("c", (100, 40)) # 같은 선반에 자리가 없어 다음 선반으로
+    layout = packer.take()
+
+    assert [(p.item, p.x, p.y) for p in layout.placements] == [("a", 10, 10), ("b", 120, 10), ("c", 10, 100)]
+    assert (layout.width, layout.height) == (230, 150)
+    assert len(packer) == 0 and packer.take() is None # take()는 캔버스를 비움
+
+def test_packer_rejects_large_images_and_reports_full_canvas():
+    packer = MosaicPacker(canvas_size=300, gap=10, max_tile_side=200, max_tiles=2)
+
+    assert packer.accepts((200, 200)) and not packer.accepts((201, 50)) and not packer.accepts((0, 10))
+    assert packer.add("a", (50, 50)) and packer.add("b", (50, 50))
+    assert not packer.add("c", (50, 50)) # max_tiles
+    packer.take()
+    assert packer.add("d", (200, 200))
+    assert not packer.add("e", (200, 200)) # 캔버스 높이 초과
+    assert len(packer) == 1
+
+def test_render_mosaic_pastes_tiles_and_flattens_transparency():
+    tiles = [_Tile("dark", Image.new("L", (20, 10), 0)), _Tile("clear", Image.new("RGBA", (20, 10), (0, 0, 0, 0)))]
+    layout = MosaicLayout((MosaicPlacement(tiles[0], 5, 5, 20, 10), MosaicPlacement(tiles[1], 30, 5, 20, 10)), 55, 20)
+
+    canvas = Image.open(io.BytesIO(render_mosaic(layout)))
+
+    assert canvas.size == (55, 20) and canvas.mode == "L"
+    assert canvas.getpixel((10, 10)) == 0
+    assert canvas.getpixel((35, 10)) == 255 # 투명 배경은 흰색
+    assert canvas.getpixel((2, 2)) == 255 # 여백
+    assert all(tile.released for tile in tiles)
+
+def test_words_are_assigned_to_tiles_by_box_center():
+    layout = _layout(("left", 0, 0, 100, 100), ("right", 140, 0, 100, 100))
+    annotation = _annotation(
+        [_word("Hello", (10, 10, 60, 30)), _word("world", (10, 40, 60, 60), _BreakType.LINE_BREAK),
+         _word("right", (150, 10, 200, 30), _BreakType.EOL_SURE_SPACE)],
+        [_word("stray", (90, 10, 150, 30))], # 중심 (120, 20)이 여백에 있음
+        [_word("again", (10, 70, 60, 90))])
+
+    texts = map_words_to_tiles(annotation, layout)
+
+    assert texts == {"left": "Hello world\nagain", "right": "right"}
+
+def test_new_paragraph_in_same_tile_starts_on_new_line():
+    layout = _layout((1, 0, 0, 100, 100))
+    annotation = _annotation([_word("first", (0, 0, 40, 10))],
+                             [_word("second", (0, 20, 40, 30)), _word("part", (50, 20, 90, 30), _BreakType.HYPHEN),
+                              _word("two", (0, 40, 40, 50))])
+
+    assert map_words_to_tiles(annotation, layout) == {1: "first\nsecond part-\ntwo"}
+
+def _tile_words(image_data):
+    """캔버스에서 회색 값이 같은 사각형마다 'tile<값>' 단어 하나를 그 위치에 돌려주는 가짜 OCR."""
+    canvas = np.asarray(Image.open(io.BytesIO(image_data)))
+    words = []
+    for value in np.unique(canvas):
+        if value == 255:
+            continue
+        ys, xs = np.nonzero(canvas == value)
+        words.append(_word(f"tile{value}", (xs.min(), ys.min(), xs.max(), ys.max())))
+    return _annotation(*[[word] for word in words])
+
+def test_mosaic_batch_maps_each_canvas_word_back_to_its_page(monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "ocr_mosaic_enabled", True)
+    monkeypatch.setitem(config_manager.config, "ocr_mosaic_canvas_size", 400)
+    monkeypatch.setitem(config_manager.config, "ocr_mosaic_gap", 20)
+    monkeypatch.setitem(config_manager.config, "ocr_mosaic_max_tile_side", 150)
+    monkeypatch.setitem(config_manager.config, "ocr_mosaic_max_tiles", 4)
+    fake_vision.document_for = _tile_words
+    # 페이지 n은 회색 값 10*n으로 칠한 작은 사각형. 7번만 모자이크 한도보다 큼
+    items = [OcrInputItem(id=n, image=Image.new("L", (400 if n == 7 else 60 + 5 * n, 80), 10 * n),
+                          original_path=f"page_{n}") for n in range(1, 11)]
+
+    results = ocr_pil_images_batch(items, use_batch_annotate=False)
+
+    by_id = {result['id']: result for result in results}
+    assert sorted(by_id) == list(range(1, 11))
+    assert all(by_id[n]['text'] == f"tile{10 * n}" for n in by_id if n != 7)
+    assert 'mosaic' not in by_id[7] and by_id[7]['text'] == "text"
+    assert fake_vision.calls.count(("text_detection", 1)) == 1
+    assert fake_vision.calls.count(("document_text_detection", 1)) == 3 # 작은 이미지 9개를 캔버스당 최대 4개씩
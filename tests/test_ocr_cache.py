@@ -0,0 +1,49 @@
+import logging
+import time
+from logger import app_logger
+from ocr_cache import OcrResultCache
+
+def test_make_key_depends_on_bytes_feature_and_hints():
+    key = OcrResultCache.make_key(b"image", "TEXT_DETECTION", ["ko"])
+
+    assert key == OcrResultCache.make_key(b"image", "TEXT_DETECTION", ["ko"])
+    assert key != OcrResultCache.make_key(b"image2", "TEXT_DETECTION", ["ko"])
+    assert key != OcrResultCache.make_key(b"image", "DOCUMENT_TEXT_DETECTION", ["ko"])
+    assert key != OcrResultCache.make_key(b"image", "TEXT_DETECTION", ["ko", "en"])
+    assert OcrResultCache.make_key(b"image", "TEXT_DETECTION", None) == OcrResultCache.make_key(b"image", "TEXT_DETECTION", [])
+
+def test_lru_eviction_removes_least_recently_used(tmp_path):
+    cache = OcrResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.put(key, "x" * 10)
+        time.sleep(0.01)
+    cache.get("a") # a를 최근 사용으로 갱신 → 가장 오래된 항목은 b
+
+    cache.put("d", "x" * 10)
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["x" * 10] * 3
+
+def test_cache_persists_across_instances(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    OcrResultCache(db_path, max_bytes=1024).put("page", "text")
+
+    assert OcrResultCache(db_path, max_bytes=1024).get("page") == "text"
+
+def test_run_summary_reports_hits_and_misses_since_snapshot(tmp_path, caplog):
+    cache = OcrResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+    cache.put("page", "text")
+    cache.get("missing") # 스냅샷 이전의 조회는 요약에 넣지 않음
+    snapshot = cache.snapshot()
+    cache.get("page")
+    cache.get("page")
+    cache.get("other")
+
+    app_logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger=app_logger.name):
+            cache.log_run_summary(snapshot)
+    finally:
+        app_logger.removeHandler(caplog.handler)
+
+    assert "적중 2회, 미스 1회 (적중률 66.7%)" in caplog.text
@@ -0,0 +1,59 @@
+import io
+import pickle
+import numpy as np
+import pytest
+from PIL import Image
+from ocr_encoding import EncodingPolicy
+
+def _noise_page(size=(1200, 1600)):
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8))
+
+def _decode(data):
+    return Image.open(io.BytesIO(data))
+
+def test_encodes_grayscale_in_the_configured_format():
+    decoded = _decode(EncodingPolicy(image_format="jpg", quality=70).encode(Image.new("RGB", (100, 80), "red")))
+
+    assert (decoded.format, decoded.mode, decoded.size) == ("JPEG", "L", (100, 80))
+    with pytest.raises(ValueError):
+        EncodingPolicy(image_format="gif")
+
+def test_downscales_to_target_dpi_and_longest_side():
+    page = Image.new("RGB", (1000, 2000), "white")
+    page.info["dpi"] = (300, 300)
+
+    assert _decode(EncodingPolicy(target_dpi=150).encode(page)).size == (500, 1000)
+    assert _decode(EncodingPolicy(target_dpi=100, source_dpi=200).encode(Image.new("RGB", (1000, 2000)))).size == (500, 1000)
+    assert _decode(EncodingPolicy(max_longest_side=1000).encode(page)).size == (500, 1000)
+    assert _decode(EncodingPolicy(target_dpi=600).encode(page)).size == (1000, 2000) # 확대하지 않음
+
+def test_binarize_leaves_only_black_and_white():
+    gradient = Image.fromarray(np.tile(np.arange(256, dtype=np.uint8), (50, 1)))
+
+    values = set(np.unique(np.array(_decode(EncodingPolicy(binarize=True).encode(gradient)))))
+
+    assert values <= {0, 255}
+
+def test_steps_down_quality_then_resolution_to_fit_payload_limit():
+    policy = EncodingPolicy(image_format="jpeg", quality=85, max_payload_bytes=150 * 1024, min_quality=40,
+                            quality_step=15, min_longest_side=400)
+
+    result = policy.encode_page(_noise_page())
+
+    assert result.quality == 40 # 품질을 먼저 최저치까지 낮춘 뒤
+    assert result.width < 1200 and max(result.width, result.height) >= 400 # 해상도를 줄임
+    assert result.size <= 150 * 1024 and result.step_downs >= 4
+
+def test_reports_pages_that_cannot_fit_the_limit():
+    policy = EncodingPolicy(image_format="png", max_payload_bytes=1024, min_longest_side=1600)
+
+    policy.encode(_noise_page(), label="page 1")
+
+    assert (policy.pages, policy.oversized_pages) == (1, 1)
+
+def test_policy_survives_pickling_for_process_pool_workers():
+    policy = pickle.loads(pickle.dumps(EncodingPolicy(image_format="webp", quality=60)))
+
+    assert _decode(policy.encode(Image.new("RGB", (50, 50)))).format == "WEBP"
+    assert policy.pages == 1
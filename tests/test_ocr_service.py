@@ -0,0 +1,250 @@
+import asyncio
+import io
+import os
+import threading
+import time
+import pytest
+from google.rpc import status_pb2
+from PIL import Image
+import ocr_service
+from conftest import FakeVisionClient, text_page
+from config_manager import config_manager
+from dtos import OcrInputItem
+from ocr_service import (VisionClientProvider, iter_pdf_pages, ocr_pil_images_async, ocr_pil_images_batch,
+                         process_images_in_folder, split_into_batches, vision_client_provider)
+
+def test_provider_reuses_pooled_clients(monkeypatch):
+    created = []
+    def factory():
+        created.append(FakeVisionClient())
+        return created[-1]
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "a.json")
+    provider = VisionClientProvider(pool_size=2, client_factory=factory)
+
+    clients = [provider.get_client() for _ in range(5)]
+
+    assert len(created) == 2
+    assert clients == [created[0], created[1], created[0], created[1], created[0]]
+
+def test_provider_rebuilds_pool_when_credentials_change(monkeypatch):
+    created = []
+    def factory():
+        created.append(FakeVisionClient())
+        return created[-1]
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "a.json")
+    provider = VisionClientProvider(pool_size=1, client_factory=factory)
+    first = provider.get_client()
+    assert provider.get_client() is first
+
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "b.json")
+    second = provider.get_client()
+
+    assert second is not first
+    assert first.transport.closed
+    assert provider.get_client() is second
+
+def test_set_client_factory_replaces_pooled_clients():
+    provider = VisionClientProvider(pool_size=1, client_factory=FakeVisionClient)
+    old_client = provider.get_client()
+    replacement = FakeVisionClient()
+
+    provider.set_client_factory(lambda: replacement)
+
+    assert old_client.transport.closed
+    assert provider.get_client() is replacement
+
+def test_split_into_batches_limits_images_and_bytes():
+    items = [(index, b"x" * size) for index, size in enumerate([3, 3, 3, 3, 9, 2])]
+
+    by_count = [[identifier for identifier, _ in batch] for batch in split_into_batches(items, max_images=2, max_bytes=100)]
+    by_bytes = [[identifier for identifier, _ in batch] for batch in split_into_batches(items, max_images=16, max_bytes=8)]
+
+    assert by_count == [[0, 1], [2, 3], [4, 5]]
+    assert by_bytes == [[0, 1], [2, 3], [4], [5]] # 혼자 한도를 넘는 항목은 단독 배치
+
+def test_batch_annotate_splits_requests_and_isolates_failures(monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "ocr_batch_max_images", 4)
+    # 7번 페이지만 폭을 달리해, 가짜 클라이언트가 그 이미지에만 오류 응답을 돌려주게 함
+    items = [OcrInputItem(id=index, image=text_page(f"page {index}", size=(401 if index == 7 else 400, 600)),
+                          original_path=f"page_{index}") for index in range(10)]
+    def error_for(image_data):
+        if Image.open(io.BytesIO(image_data)).width == 401:
+            return status_pb2.Status(code=3, message="bad image")
+        return None
+    fake_vision.error_for = error_for
+
+    results = ocr_pil_images_batch(items, use_batch_annotate=True)
+
+    assert [count for _, count in fake_vision.calls] == [4, 4, 2]
+    by_id = {result['id']: result for result in results}
+    assert sorted(by_id) == list(range(10))
+    assert by_id[7].get('error') and "bad image" in by_id[7]['error_message']
+    assert by_id[7]['text'] == "" # 오류 문구는 본문 텍스트에 넣지 않음
+    assert all(result['text'] == "text" and not result.get('error') for identifier, result in by_id.items() if identifier != 7)
+
+def _image_folder(tmp_path):
+    """a.png, b.png, 폭이 401인 bad.png, 하위 폴더의 sub/c.png가 있는 이미지 폴더."""
+    folder = tmp_path / "scans"
+    (folder / "sub").mkdir(parents=True)
+    for name, width in [("a.png", 400), ("b.png", 400), ("bad.png", 401), ("sub/c.png", 400)]:
+        text_page(name, size=(width, 600)).save(folder / name)
+    (folder / "notes.txt").write_text("not an image")
+    return folder
+
+def _fail_width_401(image_data):
+    if Image.open(io.BytesIO(image_data)).width == 401:
+        return status_pb2.Status(code=3, message="bad image")
+    return None
+
+def test_folder_run_collects_failures_and_mirrors_subfolders(tmp_path, fake_vision, caplog):
+    folder = _image_folder(tmp_path)
+    output = tmp_path / "out"
+    fake_vision.error_for = _fail_width_401
+
+    summary = process_images_in_folder(str(folder), str(output), recursive=True)
+
+    assert (summary.processed_files, summary.skipped_files) == (3, 0)
+    assert [os.path.basename(path) for path, _ in summary.failures] == ["bad.png"]
+    assert "bad image" in summary.failures[0][1]
+    assert sorted(os.path.relpath(os.path.join(root, name), output)
+                  for root, _, names in os.walk(output) for name in names) == ["a.txt", "b.txt", os.path.join("sub", "c.txt")]
+    assert any(record.levelname == "ERROR" and "OCR 실패" in record.getMessage() and "bad.png" in record.getMessage()
+               for record in caplog.records)
+
+def test_folder_run_without_recursion_ignores_subfolders(tmp_path, fake_vision):
+    folder = _image_folder(tmp_path)
+
+    summary = process_images_in_folder(str(folder), str(tmp_path / "out"), recursive=False)
+
+    assert (summary.processed_files, len(summary.failures)) == (3, 0)
+    assert not (tmp_path / "out" / "sub").exists()
+
+def test_folder_rerun_only_processes_new_or_changed_images(tmp_path, fake_vision):
+    folder = _image_folder(tmp_path)
+    output = tmp_path / "out"
+    fake_vision.error_for = _fail_width_401
+    process_images_in_folder(str(folder), str(output), recursive=True)
+    newer = os.stat(output / "a.txt").st_mtime_ns + 10**9
+    os.utime(folder / "a.png", ns=(newer, newer)) # 출력보다 새로 바뀐 이미지
+    fake_vision.calls.clear()
+
+    summary = process_images_in_folder(str(folder), str(output), recursive=True)
+
+    assert (summary.processed_files, summary.skipped_files, len(summary.failures)) == (1, 2, 1) # a.png만 다시, bad.png는 재시도
+    assert len(fake_vision.calls) == 2
+
+def test_folder_images_are_processed_in_parallel(tmp_path, fake_vision):
+    folder = tmp_path / "scans"
+    folder.mkdir()
+    for index in range(6):
+        text_page(f"page {index}").save(folder / f"{index}.png")
+    lock = threading.Lock()
+    active = [0, 0] # [현재 처리 중, 최대 동시 처리]
+    def slow_text(image_data):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return "text"
+    fake_vision.text_for = slow_text
+
+    summary = process_images_in_folder(str(folder), str(tmp_path / "out"), max_workers=3)
+
+    assert summary.processed_files == 6
+    assert 1 < active[1] <= 3
+
+def _fake_renderer(monkeypatch, page_count, fail_at=None):
+    """pdf2image 대역: 페이지 n을 폭 n인 이미지로 래스터화하고 (첫 페이지, 마지막 페이지) 요청을 기록합니다."""
+    windows = []
+    def convert_from_path(pdf_path, first_page, last_page, **kwargs):
+        windows.append((first_page, last_page))
+        if fail_at is not None and first_page <= fail_at <= last_page:
+            raise RuntimeError("render failed")
+        return [Image.new("L", (page, 10), 255) for page in range(first_page, last_page + 1)]
+    monkeypatch.setattr(ocr_service, "pdfinfo_from_path", lambda pdf_path: {"Pages": page_count})
+    monkeypatch.setattr(ocr_service, "convert_from_path", convert_from_path)
+    return windows
+
+def test_pdf_pages_are_rendered_in_windows(monkeypatch):
+    windows = _fake_renderer(monkeypatch, page_count=7)
+
+    pages = [(number, image.width) for number, image in iter_pdf_pages("book.pdf", window_size=3, queue_size=2)]
+
+    assert pages == [(n, n) for n in range(1, 8)]
+    assert windows == [(1, 3), (4, 6), (7, 7)]
+
+def test_pdf_page_subset_renders_only_contiguous_runs(monkeypatch):
+    windows = _fake_renderer(monkeypatch, page_count=7)
+
+    pages = [number for number, _ in iter_pdf_pages("book.pdf", window_size=3, queue_size=2, pages=[6, 2, 3, 9])]
+
+    assert pages == [2, 3, 6] # 범위를 벗어난 9페이지는 무시
+    assert windows == [(2, 3), (6, 6)]
+
+def test_pdf_rendering_waits_for_the_consumer(monkeypatch):
+    windows = _fake_renderer(monkeypatch, page_count=20)
+
+    pages = iter_pdf_pages("book.pdf", window_size=1, queue_size=1)
+    next(pages)
+    time.sleep(0.2)
+    rendered_while_waiting = len(windows)
+    pages.close() # 소비자가 중단하면 래스터화도 멈춤
+    time.sleep(0.2)
+
+    assert rendered_while_waiting <= 3 # 소비한 1페이지 + 큐 1페이지 + 넣기를 기다리는 1페이지
+    assert len(windows) == rendered_while_waiting
+
+def test_pdf_rendering_error_reaches_the_consumer(monkeypatch):
+    _fake_renderer(monkeypatch, page_count=6, fail_at=5)
+    pages = []
+
+    with pytest.raises(RuntimeError, match="render failed"):
+        for number, _ in iter_pdf_pages("book.pdf", window_size=2, queue_size=4):
+            pages.append(number)
+
+    assert pages == [1, 2, 3, 4]
+
+class _CountingAsyncClient:
+    """응답을 잠시 기다렸다 돌려주며 동시에 진행 중인 요청 수의 최댓값을 기록하는 비동기 클라이언트 대역."""
+    def __init__(self, sync_client):
+        self.sync_client = sync_client
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def batch_annotate_images(self, requests):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.02)
+            return self.sync_client.batch_annotate_images(requests)
+        finally:
+            self.in_flight -= 1
+
+def test_async_engine_bounds_in_flight_requests(fake_vision):
+    client = _CountingAsyncClient(fake_vision)
+    vision_client_provider.set_async_client_factory(lambda: client)
+    items = [OcrInputItem(id=index, image=text_page(f"page {index}"), original_path=f"page_{index}") for index in range(12)]
+    reported = []
+
+    results = ocr_pil_images_async(items, max_in_flight=3, on_result=reported.append)
+
+    assert sorted(result['id'] for result in results) == list(range(12))
+    assert sorted(result['id'] for result in reported) == list(range(12))
+    assert 1 < client.peak_in_flight <= 3
+
+def test_async_engine_isolates_failed_images(fake_vision):
+    items = [OcrInputItem(id=index, image=text_page(f"page {index}", size=(401 if index == 2 else 400, 600)),
+                          original_path=f"page_{index}") for index in range(5)]
+    def error_for(image_data):
+        if Image.open(io.BytesIO(image_data)).width == 401:
+            return status_pb2.Status(code=3, message="bad image")
+        return None
+    fake_vision.error_for = error_for
+
+    by_id = {result['id']: result for result in ocr_pil_images_async(items, max_in_flight=2)}
+
+    assert sorted(by_id) == list(range(5))
+    assert by_id[2].get('error') and by_id[2]['text'] == "" and "bad image" in by_id[2]['error_message']
+    assert all(by_id[index]['text'] == "text" for index in (0, 1, 3, 4))
@@ -0,0 +1,122 @@
+import random
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from page_analysis import (BlankPageDetector, IllustrationClassifier, PageDeduplicator, hamming_distance,
+                           load_analysis_thumbnail)
+
+def _page(background=255):
+    return Image.new("L", (1240, 1754), background) # A4 150dpi
+
+def _with_text(page, lines, position=(100, 100), fill=0, size=24):
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=size)
+    for index, line in enumerate(lines):
+        draw.text((position[0], position[1] + index * 50), line, fill=fill, font=font)
+    return page
+
+def _scanner_noise():
+    rng = np.random.default_rng(1)
+    return Image.fromarray(np.clip(255 - np.abs(rng.normal(0, 1.5, (1754, 1240))), 0, 255).astype(np.uint8))
+
+def _speck():
+    page = _page()
+    ImageDraw.Draw(page).ellipse((600, 900, 606, 906), fill=0)
+    return page
+
+@pytest.mark.parametrize("page", [
+    _page(), _scanner_noise(), _page(200), _speck(),
+    _with_text(_page(), ["12"], position=(600, 1650)), # 쪽 번호만 있는 간지
+], ids=["white", "scanner-noise", "gray-stock", "speck", "page-number-only"])
+def test_blank_fixtures_are_skipped(page):
+    assert BlankPageDetector().analyze(page).blank
+
+@pytest.mark.parametrize("page", [
+    _with_text(_page(), ["Chapter One"], position=(400, 800)),
+    _with_text(_page(250), ["faint pencil text on this line here"] * 30, fill=230), # 잉크로 잡히지 않는 흐린 글씨
+    _with_text(_page(), ["body text line of the page"] * 30),
+], ids=["heading", "faint-text", "body-text"])
+def test_pages_with_content_are_kept(page):
+    assert not BlankPageDetector().analyze(page).blank
+
+def test_dry_run_reports_but_does_not_skip():
+    detector = BlankPageDetector(dry_run=True)
+    stats = detector.analyze(_page())
+
+    detector.record("page 1", stats)
+
+    assert stats.blank and not detector.skips(stats)
+    assert not detector.was_skipped("page 1")
+    assert [label for label, _ in detector.blank_pages] == ["page 1"]
+
+def _scan(tmp_path, name, lines, shift=0):
+    """페이지를 파일로 저장하고 find_representative()에 넘길 (축소 이미지, 원본 경로)를 반환합니다."""
+    path = str(tmp_path / f"{name}.png")
+    _with_text(_page(), lines, position=(100 + shift, 100 + shift)).save(path)
+    return load_analysis_thumbnail(path), path
+
+def test_rescanned_page_reuses_the_representative(tmp_path):
+    lines = [f"line {index} of the first chapter text" for index in range(30)]
+    deduplicator = PageDeduplicator()
+
+    assert deduplicator.find_representative(1, *_scan(tmp_path, "first", lines)) is None
+    assert deduplicator.find_representative(2, *_scan(tmp_path, "rescan", lines, shift=1)) == 1
+    other = [f"another page {index} with other words" for index in range(30)]
+    assert deduplicator.find_representative(3, *_scan(tmp_path, "other", other)) is None
+    assert deduplicator.group_sizes == {1: 2, 3: 1} and deduplicator.duplicate_groups() == 1
+
+def test_similar_hash_with_different_ink_is_not_a_duplicate(tmp_path):
+    # 짧은 장 끝 페이지들은 해시가 거의 같지만 픽셀 비교로 걸러져야 함
+    deduplicator = PageDeduplicator()
+    deduplicator.find_representative(1, *_scan(tmp_path, "end1", ["The end of chapter one."]))
+
+    assert deduplicator.find_representative(2, *_scan(tmp_path, "end2", ["Then, the story goes on."])) is None
+    assert deduplicator.rejected_candidates == 1
+
+def test_band_index_finds_every_hash_within_max_distance():
+    rng = random.Random(0)
+    deduplicator = PageDeduplicator(max_distance=12)
+    hashes = [rng.getrandbits(256) for _ in range(50)]
+    for number, page_hash in enumerate(hashes):
+        deduplicator._representatives.append((page_hash, number, None))
+        for (shift, mask), index in zip(deduplicator._bands, deduplicator._band_index):
+            index.setdefault((page_hash >> shift) & mask, []).append(number)
+
+    for number, page_hash in enumerate(hashes):
+        flipped = page_hash
+        for bit in rng.sample(range(256), 12): # 거리 12인 해시도 후보로 찾아야 함 (비둘기집 원리)
+            flipped ^= 1 << bit
+        assert deduplicator._candidates(flipped)[0] == number
+        assert all(hamming_distance(flipped, hashes[found]) <= 12 for found in deduplicator._candidates(flipped))
+
+def _photo():
+    y, x = np.mgrid[0:1754, 0:1240]
+    page = Image.fromarray(np.stack([x * 255 // 1240, y * 255 // 1754, (x + y) % 256], -1).astype(np.uint8))
+    draw = ImageDraw.Draw(page)
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        left, top = rng.integers(0, 1100), rng.integers(0, 1600)
+        draw.ellipse((left, top, left + 140, top + 140), fill=tuple(int(v) for v in rng.integers(0, 255, 3)))
+    return page
+
+def _line_art():
+    page = Image.new("RGB", (1240, 1754), "white")
+    draw = ImageDraw.Draw(page)
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        draw.line(tuple(int(v) for v in rng.integers(0, 1240, 4)), fill="black", width=3)
+    return page
+
+def _thumbnail(page):
+    page.thumbnail((1024, 1024)) # load_analysis_thumbnail과 같은 크기
+    return page
+
+@pytest.mark.parametrize("page, expected", [
+    (_photo(), True),
+    (_line_art(), True),
+    (_with_text(_page(), ["body text line of the page"] * 30), False),
+    (_with_text(_page(), ["The end of chapter one.", "Afterword"]), False),
+    (_page(), False),
+], ids=["color-photo", "line-art", "body-text", "short-text", "blank"])
+def test_illustration_classifier_fixtures(page, expected):
+    assert IllustrationClassifier().classify("page", _thumbnail(page)) is expected
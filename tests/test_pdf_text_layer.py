@@ -0,0 +1,72 @@
+import io
+import os
+import zipfile
+from PIL import Image
+import ocr_service
+import pdf_text_layer
+from conftest import text_page
+from config_manager import config_manager
+from epub_processor import EpubProcessor
+from exceptions import OCRError
+from pdf_text_layer import find_text_layer_pages, score_text_quality
+
+GOOD_TEXT = "이 페이지는 텍스트 레이어가 온전한 본문입니다. Plain text layer page."
+GARBLED_TEXT = " ���  text"
+
+def _pdftotext_output(monkeypatch, pages):
+    monkeypatch.setattr(pdf_text_layer, "is_pdftotext_available", lambda: True)
+    monkeypatch.setattr(pdf_text_layer, "run_pdftotext", lambda pdf_path: "".join(page + "\f" for page in pages))
+
+def test_quality_score_penalizes_garbled_and_short_text():
+    assert score_text_quality(GOOD_TEXT, min_chars=20) == 1.0
+    assert score_text_quality(GARBLED_TEXT, min_chars=20) < 0.5
+    assert score_text_quality("12", min_chars=20) == 0.1 # 쪽번호만 있는 페이지
+    assert score_text_quality(" \n ", min_chars=20) == 0.0
+
+def test_only_usable_pages_are_taken_from_the_text_layer(monkeypatch):
+    _pdftotext_output(monkeypatch, [GOOD_TEXT, GARBLED_TEXT, "\n12\n", "\n" + GOOD_TEXT + "\n"])
+
+    pages = find_text_layer_pages("book.pdf", min_score=0.9, min_chars=20)
+
+    assert pages == {1: GOOD_TEXT, 4: GOOD_TEXT}
+
+def test_text_layer_check_falls_back_to_ocr_when_pdftotext_fails(monkeypatch):
+    monkeypatch.setattr(pdf_text_layer, "is_pdftotext_available", lambda: True)
+    def failing_pdftotext(pdf_path):
+        raise OCRError("pdftotext failed")
+    monkeypatch.setattr(pdf_text_layer, "run_pdftotext", failing_pdftotext)
+
+    assert find_text_layer_pages("book.pdf") == {}
+
+    monkeypatch.setattr(pdf_text_layer, "is_pdftotext_available", lambda: False)
+    assert find_text_layer_pages("book.pdf") == {}
+
+def test_epub_uses_the_text_layer_instead_of_rendering_and_ocr(tmp_path, monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "pdf_text_layer_check", True)
+    _pdftotext_output(monkeypatch, [GOOD_TEXT, GARBLED_TEXT, GOOD_TEXT, "12"])
+    rendered = []
+    def convert_from_path(pdf_path, first_page, last_page, output_folder, fmt, paths_only, **kwargs):
+        paths = []
+        for page in range(first_page, last_page + 1):
+            rendered.append(page)
+            path = os.path.join(output_folder, f"render_{page}.{fmt}")
+            text_page(f"page {page}", size=(400 + page, 600)).save(path, "JPEG")
+            paths.append(path)
+        return paths
+    monkeypatch.setattr(ocr_service, "pdfinfo_from_path", lambda pdf_path: {"Pages": 4})
+    monkeypatch.setattr(ocr_service, "convert_from_path", convert_from_path)
+    fake_vision.text_for = lambda image_data: f"ocr of page {Image.open(io.BytesIO(image_data)).width - 400}"
+    pdf_path = tmp_path / "book.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4")
+    output_path = tmp_path / "book.epub"
+
+    # 3페이지는 텍스트 레이어가 온전해도 일러스트로 지정했으므로 래스터화
+    processor = EpubProcessor(str(pdf_path), str(output_path), illustration_pages=[3], ocr_engine="thread")
+    processor.create_epub(title="t", author="a")
+
+    assert sorted(rendered) == [2, 3, 4]
+    assert processor.run_summary.text_layer_pages == 1 and processor.run_summary.ocr_pages == 2
+    with zipfile.ZipFile(output_path) as book:
+        chapters = "".join(book.read(name).decode("utf-8") for name in book.namelist() if name.endswith(".xhtml"))
+    assert GOOD_TEXT in chapters and "ocr of page 1" not in chapters
+    assert "ocr of page 2" in chapters and "ocr of page 4" in chapters
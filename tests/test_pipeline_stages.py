@@ -0,0 +1,139 @@
+import random
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from PIL import Image
+import ocr_service
+from conftest import text_page
+from config_manager import config_manager
+from dtos import OcrInputItem
+from ocr_encoding import EncodingPolicy
+from exceptions import OCRError
+from ocr_service import ocr_pil_images_batch, process_pdf
+from pipeline_stages import (SHARED_MEMORY_MIN_BYTES, OrderedPageWriter, PageReorderBuffer, SharedPayload,
+                             discard_payload, encode_item_in_process, export_payload, import_payload)
+
+def test_large_payloads_travel_through_shared_memory():
+    small = b"x" * 10
+    large = bytes(range(256)) * (SHARED_MEMORY_MIN_BYTES // 256 + 1)
+
+    assert export_payload(small) == small
+    payload = export_payload(large)
+    assert isinstance(payload, SharedPayload)
+    assert import_payload(payload) == large
+    discard_payload(export_payload(large)) # 소비되지 않은 블록도 오류 없이 해제
+
+def test_encoding_in_a_worker_process_returns_the_bytes_to_the_parent(tmp_path):
+    path = tmp_path / "page.png"
+    text_page("page 1", size=(1200, 1600)).save(path)
+    item = OcrInputItem(id=1, image=Image.open(path), original_path=str(path))
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        result, seconds, ink_stats = executor.submit(encode_item_in_process, item, EncodingPolicy()).result()
+
+    data = import_payload(result.data)
+    assert len(data) == result.size and data.startswith(b"\x89PNG")
+    assert ink_stats is None and seconds > 0
+
+def test_batch_ocr_with_the_process_pool(monkeypatch, fake_vision):
+    monkeypatch.setitem(config_manager.config, "ocr_use_process_pool", True)
+    monkeypatch.setitem(config_manager.config, "ocr_cpu_workers", 2)
+    items = [OcrInputItem(id=index, image=text_page(f"page {index}"), original_path=f"page_{index}") for index in range(4)]
+
+    results = ocr_pil_images_batch(items, use_batch_annotate=False)
+
+    assert sorted(result['id'] for result in results) == [0, 1, 2, 3]
+    assert len(fake_vision.calls) == 4
+
+def _written_pages(path):
+    with open(path, encoding="utf-8") as text_file:
+        return [int(page) for page in re.findall(r"--- Page (\d+) ---", text_file.read())]
+
+def test_ordered_writer_writes_each_page_once_earlier_pages_are_done(tmp_path):
+    path = tmp_path / "out.txt"
+    with open(path, "w", encoding="utf-8") as text_file:
+        writer = OrderedPageWriter(text_file, flush_seconds=0)
+        writer.add(2, "two")
+        writer.add(3, "three")
+        assert _written_pages(path) == [] # 1페이지가 끝나기 전에는 쓰지 않음
+        writer.add(1, "one")
+        assert _written_pages(path) == [1, 2, 3] # 닫기 전에도 파일에서 읽을 수 있음
+        writer.add(5, "five")
+        writer.finish() # 4페이지 결과가 없으면 남은 페이지를 순서대로 씀
+
+    assert _written_pages(path) == [1, 2, 3, 5]
+    assert (writer.pages_written, writer.peak_buffered) == (4, 3) # 1페이지가 들어온 순간 1~3페이지가 대기
+
+def test_ordered_writer_flushes_at_the_configured_interval(tmp_path):
+    path = tmp_path / "out.txt"
+    with open(path, "w", encoding="utf-8") as text_file:
+        writer = OrderedPageWriter(text_file, flush_seconds=3600)
+        writer.add(1, "one")
+        assert _written_pages(path) == [] # 아직 파일 버퍼에만 있음
+        writer.flush()
+        assert _written_pages(path) == [1]
+
+def test_process_pdf_writes_out_of_order_results_in_page_order(tmp_path, monkeypatch):
+    def pages_completing_out_of_order(pdf_path, limiter, retry_policy, cache):
+        yield from [(3, "three"), (1, "one"), (2, "two"), (5, "five"), (4, "four")]
+    monkeypatch.setattr(ocr_service, "_ocr_pdf_as_images", pages_completing_out_of_order)
+
+    process_pdf(str(tmp_path / "book.pdf"), str(tmp_path), mode="image")
+
+    assert _written_pages(tmp_path / "book.pdf.txt") == [1, 2, 3, 4, 5]
+
+def test_process_pdf_keeps_written_pages_when_ocr_stops(tmp_path, monkeypatch):
+    def pages_then_failure(pdf_path, limiter, retry_policy, cache):
+        yield from [(2, "two"), (1, "one"), (4, "four")]
+        raise RuntimeError("render failed")
+    monkeypatch.setattr(ocr_service, "_ocr_pdf_as_images", pages_then_failure)
+
+    with pytest.raises(OCRError):
+        process_pdf(str(tmp_path / "book.pdf"), str(tmp_path), mode="image")
+
+    assert _written_pages(tmp_path / "book.pdf.txt") == [1, 2] # 3페이지를 기다리던 4페이지는 쓰지 않음
+
+def test_reorder_buffer_yields_pages_from_many_threads_in_order():
+    slots = PageReorderBuffer()
+    pages = list(range(1, 51))
+    random.Random(0).shuffle(pages)
+    def produce(chunk):
+        for page in chunk:
+            time.sleep(0.001)
+            slots[page] = f"item {page}"
+    producers = [threading.Thread(target=produce, args=(pages[index::4],)) for index in range(4)]
+    for producer in producers:
+        producer.start()
+    def close_when_done():
+        for producer in producers:
+            producer.join()
+        slots.close()
+    threading.Thread(target=close_when_done).start()
+
+    assert list(slots) == [f"item {page}" for page in range(1, 51)]
+    assert 1 <= slots.peak_buffered <= 50
+
+def test_reorder_buffer_skips_missing_pages_after_close():
+    slots = PageReorderBuffer()
+    slots[4] = "four"
+    slots[2] = "two"
+    slots[1] = "one"
+    slots.close()
+
+    assert list(slots) == ["one", "two", "four"]
+    assert slots.peak_buffered == 3
+
+def test_reorder_buffer_raises_the_producer_error():
+    slots = PageReorderBuffer()
+    slots[1] = "one"
+    slots[3] = "three"
+    consumed = []
+
+    threading.Timer(0.05, slots.fail, args=(OCRError("stopped"),)).start()
+    with pytest.raises(OCRError):
+        for item in slots:
+            consumed.append(item)
+
+    assert consumed == ["one"] # 2페이지를 기다리다 오류를 받음
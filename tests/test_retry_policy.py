@@ -0,0 +1,114 @@
+import time
+import pytest
+from google.api_core import exceptions as google_exceptions
+import retry_policy
+from exceptions import OCRCircuitOpenError, OCRDeadlineExceededError, OCRError
+from retry_policy import CircuitBreaker, RetryPolicy, is_retryable_error
+
+def _wrapped(error):
+    # ocr_service처럼 원본 예외를 OCRError로 감싼 형태
+    try:
+        raise error
+    except Exception as exc:
+        try:
+            raise OCRError("Vision API 요청 오류") from exc
+        except OCRError as wrapped:
+            return wrapped
+
+class _Flaky:
+    """처음 failures번은 error를 발생시키고 그 뒤에는 "ok"를 반환하는 호출 대상."""
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+def test_error_classification():
+    assert is_retryable_error(_wrapped(google_exceptions.ServiceUnavailable("unavailable")))
+    assert is_retryable_error(_wrapped(google_exceptions.ResourceExhausted("quota")))
+    assert not is_retryable_error(_wrapped(google_exceptions.InvalidArgument("bad image")))
+    assert not is_retryable_error(_wrapped(google_exceptions.PermissionDenied("no access")))
+    assert not is_retryable_error(OCRCircuitOpenError())
+    assert not is_retryable_error(OCRDeadlineExceededError("late"))
+
+def test_backoff_upper_bound_grows_and_is_capped(monkeypatch):
+    bounds = []
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda low, high: bounds.append((low, high)) or 0.0)
+    policy = RetryPolicy(max_attempts=5, initial_delay=1.0, max_delay=3.0)
+    flaky = _Flaky(4, _wrapped(google_exceptions.ServiceUnavailable("unavailable")))
+
+    assert policy.call("page 1", flaky) == "ok"
+
+    assert bounds == [(0, 1.0), (0, 2.0), (0, 3.0), (0, 3.0)]
+    assert policy.get_retry_count("page 1") == 4
+
+def test_gives_up_after_max_attempts():
+    policy = RetryPolicy(max_attempts=3, initial_delay=0.0)
+    flaky = _Flaky(10, _wrapped(google_exceptions.ServiceUnavailable("unavailable")))
+
+    with pytest.raises(OCRError):
+        policy.call("page 1", flaky)
+    assert flaky.calls == 3
+
+def test_fatal_errors_are_not_retried_or_counted_by_the_breaker():
+    breaker = CircuitBreaker(min_calls=1)
+    policy = RetryPolicy(initial_delay=0.0, circuit_breaker=breaker)
+    flaky = _Flaky(1, _wrapped(google_exceptions.InvalidArgument("bad image")))
+
+    with pytest.raises(OCRError):
+        policy.call("page 1", flaky)
+    assert flaky.calls == 1
+    assert policy.call("page 2", _Flaky(0, None)) == "ok" # 브레이커가 열리지 않음
+
+def test_job_deadline_stops_retries(monkeypatch):
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda low, high: high)
+    policy = RetryPolicy(initial_delay=10.0, job_deadline_seconds=1.0)
+    flaky = _Flaky(1, _wrapped(google_exceptions.ServiceUnavailable("unavailable")))
+
+    with pytest.raises(OCRDeadlineExceededError): # 10초 대기는 1초 기한을 넘기므로 재시도하지 않음
+        policy.call("page 1", flaky)
+
+    expired = RetryPolicy(job_deadline_seconds=0.01)
+    time.sleep(0.02)
+    with pytest.raises(OCRDeadlineExceededError):
+        expired.call("page 2", _Flaky(0, None))
+
+def test_breaker_opens_then_recovers_through_a_half_open_trial():
+    breaker = CircuitBreaker(window_size=4, failure_rate_threshold=0.5, cooldown_seconds=0.05, min_calls=2)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    wait, trial = breaker.before_call()
+    assert wait > 0 and not trial # 대기 시간 동안은 호출하지 않음
+    time.sleep(0.06)
+    assert breaker.before_call() == (0.0, True) # 대기 후 시험 호출 하나만 허용
+    assert breaker.before_call() == (breaker.trial_poll_seconds, False)
+    breaker.record_success(trial=True)
+
+    assert breaker.before_call() == (0.0, False)
+
+def test_breaker_aborts_after_repeated_failed_trials():
+    breaker = CircuitBreaker(cooldown_seconds=0.0, min_calls=1, max_failed_trials=2)
+    breaker.record_failure()
+    for _ in range(2):
+        assert breaker.before_call() == (0.0, True)
+        breaker.record_failure(trial=True)
+
+    with pytest.raises(OCRCircuitOpenError):
+        breaker.before_call()
+
+def test_policy_waits_out_the_cooldown_instead_of_aborting():
+    breaker = CircuitBreaker(cooldown_seconds=0.1, min_calls=2)
+    policy = RetryPolicy(max_attempts=5, initial_delay=0.0, circuit_breaker=breaker)
+    flaky = _Flaky(2, _wrapped(google_exceptions.ServiceUnavailable("unavailable")))
+
+    start_time = time.monotonic()
+    assert policy.call("page 1", flaky) == "ok"
+
+    assert time.monotonic() - start_time >= 0.1 # 두 번째 실패로 열린 뒤 대기하고 시험 호출로 성공
+    assert breaker.before_call() == (0.0, False)